@@ -7,7 +7,7 @@ import logging.handlers
 import os
 import sys
 from time import monotonic
-from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set
 
 import voluptuous as vol
 import yarl
@@ -20,6 +20,7 @@ from homeassistant.const import (
     REQUIRED_NEXT_PYTHON_VER,
 )
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import template
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.setup import (
     DATA_SETUP,
@@ -200,6 +201,7 @@ async def async_from_config_dict(
 
     hass.config_entries = config_entries.ConfigEntries(hass, config)
     await hass.config_entries.async_initialize()
+    await template.async_setup_bytecode_cache(hass)
 
     # Set up core.
     _LOGGER.debug("Setting up %s", CORE_INTEGRATIONS)
@@ -413,6 +415,44 @@ async def async_setup_multi_components(
         )
 
 
+def _can_import_ahead(
+    integration: loader.Integration, integration_cache: Dict[str, loader.Integration]
+) -> bool:
+    """Return if an integration can be imported before its setup.
+
+    Importing an integration or a dependency whose requirements are still
+    to be installed or upgraded could import an outdated library.
+    """
+    if integration.requirements:
+        return False
+    for domain in integration.all_dependencies:
+        dependency = integration_cache.get(domain)
+        if dependency is None or dependency.requirements:
+            return False
+    for domain in integration.after_dependencies:
+        dependency = integration_cache.get(domain)
+        if dependency is not None and dependency.requirements:
+            return False
+    return True
+
+
+@core.callback
+def _async_import_integrations(
+    hass: core.HomeAssistant, integrations: Iterable[loader.Integration]
+) -> None:
+    """Start importing integrations in the executor."""
+
+    async def _async_import(integration: loader.Integration) -> None:
+        """Import an integration, errors are reported when it is set up."""
+        try:
+            await integration.async_get_component()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Unable to import %s ahead of setup: %s", integration, err)
+
+    for integration in integrations:
+        hass.async_create_task(_async_import(integration))
+
+
 async def _async_set_up_integrations(
     hass: core.HomeAssistant, config: Dict[str, Any]
 ) -> None:
@@ -499,6 +539,20 @@ async def _async_set_up_integrations(
 
     stage_2_domains = domains_to_setup - logging_domains - debuggers - stage_1_domains
 
+    # Import the integrations in the executor, so the imports overlap with
+    # setting up the integrations of the earlier stages. Integrations with
+    # requirements are imported by their setup, after installing them.
+    _async_import_integrations(
+        hass,
+        [
+            integration_cache[domain]
+            for domains in (stage_1_domains, stage_2_domains)
+            for domain in domains
+            if domain in integration_cache
+            and _can_import_ahead(integration_cache[domain], integration_cache)
+        ],
+    )
+
     # Kick off loading the registries. They don't need to be awaited.
     asyncio.create_task(hass.helpers.device_registry.async_get_registry())
     asyncio.create_task(hass.helpers.entity_registry.async_get_registry())
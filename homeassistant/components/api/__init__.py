@@ -3,8 +3,8 @@ import asyncio
 import json
 import logging
 
-from aiohttp import web
-from aiohttp.web_exceptions import HTTPBadRequest
+from aiohttp import hdrs, web
+from aiohttp.web_exceptions import HTTPBadRequest, HTTPNotModified
 import async_timeout
 import voluptuous as vol
 
@@ -49,6 +49,8 @@ ATTR_REQUIRES_API_PASSWORD = "requires_api_password"
 ATTR_UUID = "uuid"
 ATTR_VERSION = "version"
 
+HEADER_HA_REVISION = "X-HA-Revision"
+
 DOMAIN = "api"
 STREAM_PING_PAYLOAD = "ping"
 STREAM_PING_INTERVAL = 50  # seconds
@@ -217,15 +219,59 @@ class APIStatesView(HomeAssistantView):
 
     @ha.callback
     def get(self, request):
-        """Get current states."""
+        """Get current states.
+
+        With since, only the states changed and the entity ids removed after
+        that revision of the state machine are returned.
+        """
+        hass = request.app["hass"]
+        since = None
+        if "since" in request.query:
+            try:
+                since = int(request.query["since"])
+            except ValueError:
+                return self.json_message("Invalid since revision.", HTTP_BAD_REQUEST)
+
+        revision = hass.states.revision
+        # The changes since a revision are another representation
+        etag = f'"{revision}"' if since is None else f'"{revision}-{since}"'
+        headers = {hdrs.ETAG: etag, HEADER_HA_REVISION: str(revision)}
+
+        if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+        if if_none_match is not None and etag in (
+            tag.strip() for tag in if_none_match.split(",")
+        ):
+            raise HTTPNotModified(headers=headers)
+
         user = request["hass_user"]
         entity_perm = user.permissions.check_entity
-        states = [
-            state
-            for state in request.app["hass"].states.async_all()
-            if entity_perm(state.entity_id, "read")
-        ]
-        return self.json(states)
+
+        if since is None:
+            states = [
+                state
+                for state in hass.states.async_all()
+                if entity_perm(state.entity_id, "read")
+            ]
+            return self.json(states, headers=headers)
+
+        changes = hass.states.async_changed_since(since)
+        # Changes are not known, the client has to replace all its states
+        full = changes is None
+        changed, removed = (hass.states.async_all(), []) if full else changes
+
+        return self.json(
+            {
+                "revision": revision,
+                "full": full,
+                "changed": [
+                    state for state in changed if entity_perm(state.entity_id, "read")
+                ],
+                "removed": [
+                    entity_id for entity_id in removed if entity_perm(entity_id, "read")
+                ],
+            },
+            headers=headers,
+        )
 
 
 class APIEntityStateView(HomeAssistantView):
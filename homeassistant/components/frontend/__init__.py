@@ -271,15 +271,17 @@ async def async_setup(hass, config):
     is_dev = repo_path is not None
     root_path = _frontend_root(repo_path)
 
-    for path, should_cache in (
-        ("service_worker.js", False),
-        ("robots.txt", False),
-        ("onboarding.html", True),
-        ("static", True),
-        ("frontend_latest", True),
-        ("frontend_es5", True),
+    for path, should_cache, precompressed in (
+        ("service_worker.js", False, False),
+        ("robots.txt", False, False),
+        ("onboarding.html", True, False),
+        ("static", True, not is_dev),
+        ("frontend_latest", True, not is_dev),
+        ("frontend_es5", True, not is_dev),
     ):
-        hass.http.register_static_path(f"/{path}", str(root_path / path), should_cache)
+        hass.http.register_static_path(
+            f"/{path}", str(root_path / path), should_cache, precompressed
+        )
 
     hass.http.register_static_path(
         "/auth/authorize", str(root_path / "authorize.html"), False
@@ -1,7 +1,8 @@
 """Provide the functionality to group entities."""
 import asyncio
+from collections import Counter
 import logging
-from typing import Any, Iterable, List, Optional, cast
+from typing import Any, Dict, Iterable, List, Optional, cast
 
 import voluptuous as vol
 
@@ -40,6 +41,7 @@ from homeassistant.loader import bind_hass
 
 DOMAIN = "group"
 GROUP_ORDER = "group_order"
+GROUP_MEMBERSHIP = "group_membership"
 
 ENTITY_ID_FORMAT = DOMAIN + ".{}"
 
@@ -186,16 +188,9 @@ def groups_with_entity(hass: HomeAssistantType, entity_id: str) -> List[str]:
 
     Async friendly.
     """
-    if DOMAIN not in hass.data:
-        return []
-
-    groups = []
-
-    for group in hass.data[DOMAIN].entities:
-        if entity_id in group.tracking:
-            groups.append(group.entity_id)
+    membership: Dict[str, List[str]] = hass.data.get(GROUP_MEMBERSHIP, {})
 
-    return groups
+    return list(membership.get(entity_id, ()))
 
 
 async def async_setup(hass, config):
@@ -375,6 +370,11 @@ class Group(Entity):
         self._order = order
         self._assumed_state = False
         self._async_unsub_state_changed = None
+        # Current state of each tracked member and counters over them, so a
+        # member change updates the group without looking up every member.
+        self._member_states: Dict[str, ha.State] = {}
+        self._member_state_counts: Counter = Counter()
+        self._member_assumed_count = 0
 
     @staticmethod
     def create_group(
@@ -511,14 +511,35 @@ class Group(Entity):
                 self.hass, self.tracking, self._async_state_changed_listener
             )
 
+            membership = self.hass.data.setdefault(GROUP_MEMBERSHIP, {})
+            for entity_id in set(self.tracking):
+                membership.setdefault(entity_id, []).append(self.entity_id)
+
     async def async_stop(self):
         """Unregister the group from Home Assistant.
 
         This method must be run in the event loop.
         """
-        if self._async_unsub_state_changed:
-            self._async_unsub_state_changed()
-            self._async_unsub_state_changed = None
+        self._async_stop_tracking()
+
+    @callback
+    def _async_stop_tracking(self):
+        """Stop tracking members.
+
+        This method must be run in the event loop.
+        """
+        if self._async_unsub_state_changed is None:
+            return
+
+        self._async_unsub_state_changed()
+        self._async_unsub_state_changed = None
+
+        membership = self.hass.data[GROUP_MEMBERSHIP]
+        for entity_id in set(self.tracking):
+            groups = membership[entity_id]
+            groups.remove(self.entity_id)
+            if not groups:
+                del membership[entity_id]
 
     async def async_update(self):
         """Query all members and determine current group state."""
@@ -532,9 +553,7 @@ class Group(Entity):
 
     async def async_will_remove_from_hass(self):
         """Handle removal from Home Assistant."""
-        if self._async_unsub_state_changed:
-            self._async_unsub_state_changed()
-            self._async_unsub_state_changed = None
+        self._async_stop_tracking()
 
     async def _async_state_changed_listener(self, event):
         """Respond to a member state changing.
@@ -545,43 +564,77 @@ class Group(Entity):
         if self._async_unsub_state_changed is None:
             return
 
-        self._async_update_group_state(event.data.get("new_state"))
+        new_state = event.data.get("new_state")
+        self._async_update_member(event.data["entity_id"], new_state)
+        self._async_update_group_state_from_members(new_state)
         self.async_write_ha_state()
 
-    @property
-    def _tracking_states(self):
-        """Return the states that the group is tracking."""
-        states = []
+    @callback
+    def _async_update_member(self, entity_id, new_state):
+        """Update the member counters with the new state of a member."""
+        old_state = self._member_states.pop(entity_id, None)
 
-        for entity_id in self.tracking:
-            state = self.hass.states.get(entity_id)
+        if old_state is not None:
+            self._member_state_counts[old_state.state] -= 1
+            if old_state.attributes.get(ATTR_ASSUMED_STATE):
+                self._member_assumed_count -= 1
 
-            if state is not None:
-                states.append(state)
+        if new_state is not None:
+            self._member_states[entity_id] = new_state
+            self._member_state_counts[new_state.state] += 1
+            if new_state.attributes.get(ATTR_ASSUMED_STATE):
+                self._member_assumed_count += 1
 
-        return states
+    @callback
+    def _async_reset_members(self):
+        """Look up the state of every member and rebuild the counters."""
+        self._member_states = {}
+        self._member_state_counts = Counter()
+        self._member_assumed_count = 0
+
+        for entity_id in self.tracking:
+            if entity_id not in self._member_states:
+                self._async_update_member(entity_id, self.hass.states.get(entity_id))
+
+    def _mode_matches(self, count):
+        """Return if the group mode holds when count members match."""
+        if self.mode is all:
+            return count == len(self._member_states)
+        return count > 0
 
     @callback
     def _async_update_group_state(self, tr_state=None):
         """Update group state.
 
         Optionally you can provide the only state changed since last update
-        allowing this method to take shortcuts.
+        allowing this method to skip looking up every member again.
+
+        This method must be run in the event loop.
+        """
+        if tr_state is None:
+            self._async_reset_members()
+        else:
+            self._async_update_member(tr_state.entity_id, tr_state)
+
+        self._async_update_group_state_from_members(tr_state)
+
+    @callback
+    def _async_update_group_state_from_members(self, tr_state):
+        """Update group state from the member counters.
+
+        tr_state is the state of the member that changed, if any.
 
         This method must be run in the event loop.
         """
-        # To store current states of group entities. Might not be needed.
-        states = None
-        gr_state = self._state
         gr_on = self.group_on
-        gr_off = self.group_off
 
         # We have not determined type of group yet
         if gr_on is None:
             if tr_state is None:
-                states = self._tracking_states
-
-                for state in states:
+                for entity_id in self.tracking:
+                    state = self._member_states.get(entity_id)
+                    if state is None:
+                        continue
                     gr_on, gr_off = _get_group_on_off(state.state)
                     if gr_on is not None:
                         break
@@ -595,33 +648,9 @@ class Group(Entity):
         if gr_on is None:
             return
 
-        if tr_state is None or (
-            (gr_state == gr_on and tr_state.state == gr_off)
-            or (gr_state == gr_off and tr_state.state == gr_on)
-            or tr_state.state not in (gr_on, gr_off)
-        ):
-            if states is None:
-                states = self._tracking_states
-
-            if self.mode(state.state == gr_on for state in states):
-                self._state = gr_on
-            else:
-                self._state = gr_off
-
-        elif tr_state.state in (gr_on, gr_off):
-            self._state = tr_state.state
-
-        if (
-            tr_state is None
-            or self._assumed_state
-            and not tr_state.attributes.get(ATTR_ASSUMED_STATE)
-        ):
-            if states is None:
-                states = self._tracking_states
-
-            self._assumed_state = self.mode(
-                state.attributes.get(ATTR_ASSUMED_STATE) for state in states
-            )
+        if self._mode_matches(self._member_state_counts[gr_on]):
+            self._state = gr_on
+        else:
+            self._state = self.group_off
 
-        elif tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            self._assumed_state = True
+        self._assumed_state = self._mode_matches(self._member_assumed_count)
@@ -4,6 +4,7 @@ from datetime import timedelta
 from itertools import groupby
 import json
 import logging
+import math
 import time
 from typing import Optional, cast
 
@@ -15,6 +16,7 @@ import voluptuous as vol
 from homeassistant.components import recorder
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
+    StateAttributes,
     States,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
@@ -26,6 +28,8 @@ from homeassistant.const import (
     CONF_EXCLUDE,
     CONF_INCLUDE,
     HTTP_BAD_REQUEST,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
 )
 from homeassistant.core import Context, State, split_entity_id
 import homeassistant.helpers.config_validation as cv
@@ -40,6 +44,8 @@ CONF_ORDER = "use_include_order"
 
 STATE_KEY = "state"
 LAST_CHANGED_KEY = "last_changed"
+MIN_KEY = "min"
+MAX_KEY = "max"
 
 # Not reusing from entityfilter because history does not support glob filtering
 _FILTER_SCHEMA_INNER = vol.Schema(
@@ -82,6 +88,7 @@ QUERY_STATES = [
     States.entity_id,
     States.state,
     States.attributes,
+    StateAttributes.shared_attrs,
     States.last_changed,
     States.last_updated,
 ]
@@ -89,6 +96,13 @@ QUERY_STATES = [
 HISTORY_BAKERY = "history_bakery"
 
 
+def _query_states(session):
+    """Query the states with their shared attributes."""
+    return session.query(*QUERY_STATES).outerjoin(
+        StateAttributes, States.attributes_id == StateAttributes.attributes_id
+    )
+
+
 def get_significant_states(hass, *args, **kwargs):
     """Wrap _get_significant_states with a sql session."""
     with session_scope(hass=hass) as session:
@@ -105,6 +119,7 @@ def _get_significant_states(
     include_start_time_state=True,
     significant_changes_only=True,
     minimal_response=False,
+    resolution=None,
 ):
     """
     Return states changes during UTC period start_time - end_time.
@@ -112,12 +127,13 @@ def _get_significant_states(
     Significant states are all states where there is a state change,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
+
+    When a resolution (timedelta) is given, numeric entities are
+    aggregated to min/mean/max per bucket of that size.
     """
     timer_start = time.perf_counter()
 
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
-    )
+    baked_query = hass.data[HISTORY_BAKERY](_query_states)
 
     if significant_changes_only:
         baked_query += lambda q: q.filter(
@@ -157,15 +173,15 @@ def _get_significant_states(
         filters,
         include_start_time_state,
         minimal_response,
+        resolution,
+        end_time,
     )
 
 
 def state_changes_during_period(hass, start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
     with session_scope(hass=hass) as session:
-        baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
-        )
+        baked_query = hass.data[HISTORY_BAKERY](_query_states)
 
         baked_query += lambda q: q.filter(
             (States.last_changed == States.last_updated)
@@ -178,7 +194,9 @@ def state_changes_during_period(hass, start_time, end_time=None, entity_id=None)
             )
 
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.entity_id == bindparam("entity_id")
+            )
             entity_id = entity_id.lower()
 
         baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
@@ -199,13 +217,13 @@ def get_last_state_changes(hass, number_of_states, entity_id):
     start_time = dt_util.utcnow()
 
     with session_scope(hass=hass) as session:
-        baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
-        )
+        baked_query = hass.data[HISTORY_BAKERY](_query_states)
         baked_query += lambda q: q.filter(States.last_changed == States.last_updated)
 
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.entity_id == bindparam("entity_id")
+            )
             entity_id = entity_id.lower()
 
         baked_query += lambda q: q.order_by(
@@ -266,7 +284,7 @@ def _get_states_with_session(
     # We have more than one entity to look at (most commonly we want
     # all entities,) so we need to do a search on all states since the
     # last recorder run started.
-    query = session.query(*QUERY_STATES)
+    query = _query_states(session)
 
     most_recent_states_by_date = session.query(
         States.entity_id.label("max_entity_id"),
@@ -309,9 +327,7 @@ def _get_states_with_session(
 def _get_single_entity_states_with_session(hass, session, utc_point_in_time, entity_id):
     # Use an entirely different (and extremely fast) query if we only
     # have a single entity id
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
-    )
+    baked_query = hass.data[HISTORY_BAKERY](_query_states)
     baked_query += lambda q: q.filter(
         States.last_updated < bindparam("utc_point_in_time"),
         States.entity_id == bindparam("entity_id"),
@@ -335,6 +351,8 @@ def _sorted_states_to_json(
     filters=None,
     include_start_time_state=True,
     minimal_response=False,
+    resolution=None,
+    end_time=None,
 ):
     """Convert SQL results into JSON friendly data structure.
 
@@ -376,6 +394,22 @@ def _sorted_states_to_json(
     for ent_id, group in groupby(states, lambda state: state.entity_id):
         domain = split_entity_id(ent_id)[0]
         ent_results = result[ent_id]
+
+        if resolution is not None:
+            group = list(group)
+            values = _numeric_states(group)
+            if values is not None:
+                if ent_results:
+                    # The state at the start time lasts until the first change
+                    values.insert(0, (start_time, _numeric_value(ent_results[0])))
+                else:
+                    ent_results.append(LazyState(group[0]))
+                ent_results.extend(
+                    _downsample_states(values, start_time, end_time, resolution)
+                )
+                continue
+            group = iter(group)
+
         if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
             ent_results.extend(LazyState(db_state) for db_state in group)
 
@@ -415,6 +449,102 @@ def _sorted_states_to_json(
     return {key: val for key, val in result.items() if val}
 
 
+def _numeric_value(db_state):
+    """Return the value of a numeric state, None if unknown or unavailable.
+
+    Raises ValueError if the state is not a number.
+    """
+    if db_state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+        return None
+    try:
+        return float(db_state.state)
+    except TypeError as err:
+        raise ValueError from err
+
+
+def _numeric_states(db_states):
+    """Return (last_updated, value) of numeric states or None if not numeric.
+
+    Unknown and unavailable states have a value of None, any other state
+    that is not a number makes the entity non numeric.
+    """
+    try:
+        values = [
+            (db_state.last_updated, _numeric_value(db_state)) for db_state in db_states
+        ]
+    except ValueError:
+        return None
+
+    if all(value is None for _, value in values):
+        return None
+    return values
+
+
+def _downsample_states(values, start_time, end_time, resolution):
+    """Aggregate numeric states to min/mean/max per resolution sized bucket.
+
+    Each value lasts until the next one and the mean is weighted by that
+    duration. Only buckets with a change are returned, the value carried into
+    a bucket counts for the part of the bucket before its first change.
+    """
+    start_ts = start_time.timestamp()
+    end_ts = (end_time or dt_util.utcnow()).timestamp()
+    step = resolution.total_seconds()
+    # index: [min, max, weighted sum, duration, last value, changed]
+    buckets = {}
+
+    def add(index, value, duration, changed):
+        """Add a value that lasted duration seconds to a bucket."""
+        bucket = buckets.get(index)
+        if bucket is None:
+            buckets[index] = [value, value, value * duration, duration, value, changed]
+            return
+        bucket[0] = min(bucket[0], value)
+        bucket[1] = max(bucket[1], value)
+        bucket[2] += value * duration
+        bucket[3] += duration
+        bucket[4] = value
+        bucket[5] = bucket[5] or changed
+
+    timestamps = [
+        process_timestamp(last_updated).timestamp() for last_updated, _ in values
+    ]
+    for (value_start, (_, value)), value_end in zip(
+        zip(timestamps, values), timestamps[1:] + [end_ts]
+    ):
+        value_start = max(value_start, start_ts)
+        value_end = max(min(value_end, end_ts), value_start)
+        if value is None or value_start >= end_ts:
+            continue
+        first = int((value_start - start_ts) // step)
+        # A value ending on a bucket boundary does not last into that bucket
+        last = max(first, math.ceil((value_end - start_ts) / step) - 1)
+        if first == last:
+            add(first, value, value_end - value_start, True)
+            continue
+        # Buckets the value fully spans have no change and are not returned
+        add(first, value, start_ts + (first + 1) * step - value_start, True)
+        add(last, value, value_end - (start_ts + last * step), False)
+
+    return [
+        {
+            STATE_KEY: total / duration if duration else last_value,
+            MIN_KEY: min_value,
+            MAX_KEY: max_value,
+            LAST_CHANGED_KEY: (start_time + index * resolution).isoformat(),
+        }
+        for index, (
+            min_value,
+            max_value,
+            total,
+            duration,
+            last_value,
+            changed,
+        ) in sorted(buckets.items())
+        if changed
+    ]
+
+
 def get_state(hass, utc_point_in_time, entity_id, run=None):
     """Return a state at a specific point in time."""
     states = get_states(hass, utc_point_in_time, (entity_id,), run)
@@ -492,6 +622,15 @@ class HistoryPeriodView(HomeAssistantView):
 
         minimal_response = "minimal_response" in request.query
 
+        resolution = request.query.get("resolution")
+        if resolution is not None:
+            try:
+                resolution = timedelta(seconds=int(resolution))
+            except ValueError:
+                return self.json_message("Invalid resolution", HTTP_BAD_REQUEST)
+            if resolution <= timedelta(0):
+                return self.json_message("Invalid resolution", HTTP_BAD_REQUEST)
+
         hass = request.app["hass"]
 
         return cast(
@@ -505,6 +644,7 @@ class HistoryPeriodView(HomeAssistantView):
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
+                resolution,
             ),
         )
 
@@ -517,6 +657,7 @@ class HistoryPeriodView(HomeAssistantView):
         include_start_time_state,
         significant_changes_only,
         minimal_response,
+        resolution,
     ):
         """Fetch significant stats from the database as json."""
         timer_start = time.perf_counter()
@@ -532,6 +673,7 @@ class HistoryPeriodView(HomeAssistantView):
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
+                resolution,
             )
 
         result = list(result.values())
@@ -694,7 +836,9 @@ class LazyState(State):
         """State attributes."""
         if not self._attributes:
             try:
-                self._attributes = json.loads(self._row.attributes)
+                self._attributes = json.loads(
+                    self._row.shared_attrs or self._row.attributes
+                )
             except ValueError:
                 # When json.loads fails
                 _LOGGER.exception("Error converting row to state: %s", self)
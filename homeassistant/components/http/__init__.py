@@ -16,7 +16,7 @@ from homeassistant.const import (
     EVENT_HOMEASSISTANT_STOP,
     SERVER_PORT,
 )
-from homeassistant.core import Event, HomeAssistant
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers import storage
 import homeassistant.helpers.config_validation as cv
 from homeassistant.loader import bind_hass
@@ -30,7 +30,7 @@ from .const import KEY_AUTHENTICATED, KEY_HASS, KEY_HASS_USER, KEY_REAL_IP  # no
 from .cors import setup_cors
 from .real_ip import setup_real_ip
 from .request_context import setup_request_context
-from .static import CACHE_HEADERS, CachingStaticResource
+from .static import CACHE_HEADERS, CachingStaticResource, PrecompressedStaticResource
 from .view import HomeAssistantView  # noqa: F401
 from .web_runner import HomeAssistantTCPSite
 
@@ -357,14 +357,33 @@ class HomeAssistantHTTP:
 
         self.app.router.add_route("GET", url, redirect)
 
-    def register_static_path(self, url_path, path, cache_headers=True):
-        """Register a folder or file to serve as a static path."""
+    def register_static_path(
+        self, url_path, path, cache_headers=True, precompressed=False
+    ):
+        """Register a folder or file to serve as a static path.
+
+        Folders registered as precompressed must not change while running,
+        their compressed variants are built at startup.
+        """
         if os.path.isdir(path):
-            if cache_headers:
-                resource = CachingStaticResource
+            if precompressed:
+                resource = PrecompressedStaticResource(url_path, path)
+
+                @callback
+                def build_compressed_variants(_event):
+                    """Build the compressed variants once started."""
+                    self.hass.async_create_task(
+                        resource.async_build_compressed_variants()
+                    )
+
+                self.hass.bus.async_listen_once(
+                    EVENT_HOMEASSISTANT_START, build_compressed_variants
+                )
+            elif cache_headers:
+                resource = CachingStaticResource(url_path, path)
             else:
-                resource = web.StaticResource
-            self.app.router.register_resource(resource(url_path, path))
+                resource = web.StaticResource(url_path, path)
+            self.app.router.register_resource(resource)
             return
 
         if cache_headers:
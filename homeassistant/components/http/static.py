@@ -1,32 +1,182 @@
 """Static file handling for HTTP component."""
+import asyncio
+from collections import OrderedDict
+import gzip
+import logging
+import mimetypes
+import os
 from pathlib import Path
+import tempfile
+from typing import Dict, NamedTuple, Optional, Tuple
 
 from aiohttp import hdrs
-from aiohttp.web import FileResponse
-from aiohttp.web_exceptions import HTTPForbidden, HTTPNotFound
+from aiohttp.web import FileResponse, Response
+from aiohttp.web_exceptions import HTTPForbidden, HTTPNotFound, HTTPNotModified
 from aiohttp.web_urldispatcher import StaticResource
 
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
 # mypy: allow-untyped-defs
 
+_LOGGER = logging.getLogger(__name__)
+
 CACHE_TIME = 31 * 86400  # = 1 month
 CACHE_HEADERS = {hdrs.CACHE_CONTROL: f"public, max-age={CACHE_TIME}"}
 
+# Content encodings of precompressed siblings in order of preference
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_TYPES = (
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+)
+MIN_COMPRESS_SIZE = 1024
+STATIC_FILE_CACHE_SIZE = 4096
+
+
+class StaticFileVariant(NamedTuple):
+    """A representation of a static file on disk."""
+
+    path: Path
+    etag: str
+
+
+class StaticFile(NamedTuple):
+    """A static file with its precompressed variants."""
+
+    content_type: str
+    # Content encoding -> variant, None for the uncompressed file
+    variants: Dict[Optional[str], StaticFileVariant]
+
+
+def _etag(stat: os.stat_result) -> str:
+    """Return a strong ETag for a file."""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _is_compressible(content_type: Optional[str]) -> bool:
+    """Return if a content type benefits from compression."""
+    if content_type is None:
+        return False
+    return content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES
+
+
+def _accepted_encodings(accept_encoding: str) -> Tuple[str, ...]:
+    """Return the content encodings the client accepts."""
+    encodings = []
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.append(name.strip())
+    return tuple(encodings)
+
+
+def _compress_gzip(content: bytes) -> bytes:
+    """Compress content with gzip."""
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def _compressors():
+    """Return the available compressors by file suffix."""
+    compressors = {".gz": _compress_gzip}
+    if brotli is not None:
+        compressors[".br"] = brotli.compress
+    return compressors
+
+
+def build_compressed_variants(directory: Path) -> int:
+    """Write missing or outdated compressed siblings of the files in directory.
+
+    Returns the number of files written. This method does blocking I/O and
+    must be run in the executor.
+    """
+    compressors = _compressors()
+    built = 0
+
+    for filepath in sorted(directory.rglob("*")):
+        if filepath.suffix in (".gz", ".br") or not filepath.is_file():
+            continue
+
+        content_type, encoding = mimetypes.guess_type(str(filepath))
+        if encoding is not None or not _is_compressible(content_type):
+            continue
+
+        stat = filepath.stat()
+        if stat.st_size < MIN_COMPRESS_SIZE:
+            continue
+
+        content = None
+        for suffix, compress in compressors.items():
+            variant = filepath.with_name(filepath.name + suffix)
+            try:
+                if variant.stat().st_mtime >= stat.st_mtime:
+                    continue
+            except FileNotFoundError:
+                pass
+
+            if content is None:
+                content = filepath.read_bytes()
+            compressed = compress(content)
+            if len(compressed) >= len(content):
+                continue
+
+            try:
+                # Write atomically, requests could be served from it any time
+                fd, tmp_path = tempfile.mkstemp(
+                    prefix=f".{variant.name}.", dir=variant.parent
+                )
+                with os.fdopen(fd, "wb") as fdesc:
+                    fdesc.write(compressed)
+                os.replace(tmp_path, variant)
+            except OSError as err:
+                _LOGGER.debug(
+                    "Unable to write compressed files in %s: %s", directory, err
+                )
+                return built
+
+            built += 1
+
+    return built
+
 
 class CachingStaticResource(StaticResource):
     """Static Resource handler that will add cache headers."""
 
-    async def _handle(self, request):
+    def _get_file_path(self, rel_url: str) -> Optional[Path]:
+        """Return the file to serve, None for a directory.
+
+        This method does blocking I/O and must be run in the executor.
+        """
+        filename = Path(rel_url)
+        if filename.anchor:
+            # rel_url is an absolute name like
+            # /static/\\machine_name\c$ or /static/D:\path
+            # where the static dir is totally different
+            raise HTTPForbidden()
+        filepath = self._directory.joinpath(filename).resolve()
+        if not self._follow_symlinks:
+            filepath.relative_to(self._directory)
+
+        if filepath.is_dir():
+            return None
+        if filepath.is_file():
+            return filepath
+        raise HTTPNotFound
+
+    async def _async_get_file_path(self, request) -> Path:
+        """Return the file a request points at."""
+        loop = asyncio.get_running_loop()
         rel_url = request.match_info["filename"]
         try:
-            filename = Path(rel_url)
-            if filename.anchor:
-                # rel_url is an absolute name like
-                # /static/\\machine_name\c$ or /static/D:\path
-                # where the static dir is totally different
-                raise HTTPForbidden()
-            filepath = self._directory.joinpath(filename).resolve()
-            if not self._follow_symlinks:
-                filepath.relative_to(self._directory)
+            filepath = await loop.run_in_executor(None, self._get_file_path, rel_url)
+        except HTTPNotFound:
+            raise
         except (ValueError, FileNotFoundError) as error:
             # relatively safe
             raise HTTPNotFound() from error
@@ -36,13 +186,130 @@ class CachingStaticResource(StaticResource):
             raise HTTPNotFound() from error
 
         # on opening a dir, load its contents if allowed
-        if filepath.is_dir():
+        if filepath is None:
+            raise HTTPForbidden()
+        return filepath
+
+    async def _handle(self, request):
+        if self._show_index:
+            # Directory listings are left to aiohttp
             return await super()._handle(request)
-        if filepath.is_file():
-            return FileResponse(
-                filepath,
-                chunk_size=self._chunk_size,
-                # type ignore: https://github.com/aio-libs/aiohttp/pull/3976
-                headers=CACHE_HEADERS,  # type: ignore
+
+        filepath = await self._async_get_file_path(request)
+        return FileResponse(
+            filepath,
+            chunk_size=self._chunk_size,
+            # type ignore: https://github.com/aio-libs/aiohttp/pull/3976
+            headers=CACHE_HEADERS,  # type: ignore
+        )
+
+
+class PrecompressedStaticResource(CachingStaticResource):
+    """Static resource for files that do not change while running.
+
+    The result of resolving a file and looking up its precompressed siblings
+    is cached, so only the first request of a file touches the file system
+    outside of reading it. Responses carry strong ETags and conditional
+    requests are answered with 304.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the resource."""
+        super().__init__(*args, **kwargs)
+        self._files: "OrderedDict[str, StaticFile]" = OrderedDict()
+
+    async def async_build_compressed_variants(self) -> None:
+        """Build the compressed variants of the files in the executor."""
+        loop = asyncio.get_running_loop()
+        built = await loop.run_in_executor(
+            None, build_compressed_variants, self._directory
+        )
+        if built:
+            _LOGGER.debug("Built %s compressed files in %s", built, self._directory)
+            # Pick up the new variants
+            self._files.clear()
+
+    def _get_static_file(self, filepath: Path) -> StaticFile:
+        """Stat a file and its precompressed siblings.
+
+        This method does blocking I/O and must be run in the executor.
+        """
+        stat = filepath.stat()
+        variants = {None: StaticFileVariant(filepath, _etag(stat))}
+
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            path = filepath.with_name(filepath.name + suffix)
+            try:
+                variant_stat = path.stat()
+            except OSError:
+                continue
+            # Ignore siblings older than the file they should represent
+            if variant_stat.st_mtime >= stat.st_mtime:
+                variants[encoding] = StaticFileVariant(path, _etag(variant_stat))
+
+        content_type, encoding = mimetypes.guess_type(str(filepath))
+        if content_type is None or encoding is not None:
+            content_type = "application/octet-stream"
+
+        return StaticFile(content_type, variants)
+
+    async def _async_get_static_file(self, request) -> StaticFile:
+        """Return the cached static file a request points at."""
+        rel_url = request.match_info["filename"]
+        static_file = self._files.get(rel_url)
+
+        if static_file is not None:
+            self._files.move_to_end(rel_url)
+            return static_file
+
+        filepath = await self._async_get_file_path(request)
+        static_file = await asyncio.get_running_loop().run_in_executor(
+            None, self._get_static_file, filepath
+        )
+        self._files[rel_url] = static_file
+        while len(self._files) > STATIC_FILE_CACHE_SIZE:
+            self._files.popitem(last=False)
+        return static_file
+
+    async def _handle(self, request):
+        static_file = await self._async_get_static_file(request)
+
+        encoding = None
+        if len(static_file.variants) > 1:
+            accepted = _accepted_encodings(
+                request.headers.get(hdrs.ACCEPT_ENCODING, "")
             )
-        raise HTTPNotFound
+            for encoding, _ in PRECOMPRESSED_ENCODINGS:
+                if encoding in static_file.variants and encoding in accepted:
+                    break
+            else:
+                encoding = None
+
+        variant = static_file.variants[encoding]
+        headers = {**CACHE_HEADERS, hdrs.ETAG: variant.etag}
+        if len(static_file.variants) > 1:
+            headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+
+        if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+        if if_none_match is not None and (
+            if_none_match.strip() == "*"
+            or variant.etag
+            in (tag.strip().replace("W/", "", 1) for tag in if_none_match.split(","))
+        ):
+            raise HTTPNotModified(headers=headers)
+
+        if encoding is not None:
+            headers[hdrs.CONTENT_ENCODING] = encoding
+
+        try:
+            body = await asyncio.get_running_loop().run_in_executor(
+                None, variant.path.read_bytes
+            )
+        except OSError as error:
+            # The file changed on disk, resolve it again on the next request
+            self._files.pop(request.match_info["filename"], None)
+            raise HTTPNotFound() from error
+
+        return Response(
+            body=body, content_type=static_file.content_type, headers=headers
+        )
@@ -1,6 +1,5 @@
 """Support for views."""
 import asyncio
-import json
 import logging
 from typing import Any, Callable, List, Optional
 
@@ -16,7 +15,7 @@ import voluptuous as vol
 from homeassistant import exceptions
 from homeassistant.const import CONTENT_TYPE_JSON, HTTP_OK, HTTP_SERVICE_UNAVAILABLE
 from homeassistant.core import Context, is_callback
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import json_bytes
 
 from .const import KEY_AUTHENTICATED, KEY_HASS, KEY_REAL_IP
 
@@ -47,9 +46,7 @@ class HomeAssistantView:
     ) -> web.Response:
         """Return a JSON response."""
         try:
-            msg = json.dumps(
-                result, sort_keys=True, cls=JSONEncoder, allow_nan=False
-            ).encode("UTF-8")
+            msg = json_bytes(result, sort_keys=True)
         except (ValueError, TypeError) as err:
             _LOGGER.error("Unable to serialize to JSON: %s\n%s", err, result)
             raise HTTPInternalServerError
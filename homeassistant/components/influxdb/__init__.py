@@ -9,7 +9,7 @@ from typing import Any, Callable, Dict, List
 
 from influxdb import InfluxDBClient, exceptions
 from influxdb_client import InfluxDBClient as InfluxDBClientV2
-from influxdb_client.client.write_api import ASYNCHRONOUS, SYNCHRONOUS
+from influxdb_client.client.write_api import SYNCHRONOUS
 from influxdb_client.rest import ApiException
 import requests.exceptions
 import urllib3.exceptions
@@ -26,7 +26,12 @@ from homeassistant.const import (
     STATE_UNAVAILABLE,
     STATE_UNKNOWN,
 )
-from homeassistant.helpers import event as event_helper, state as state_helper
+from homeassistant.core import callback
+from homeassistant.helpers import (
+    discovery,
+    event as event_helper,
+    state as state_helper,
+)
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity_values import EntityValues
 from homeassistant.helpers.entityfilter import (
@@ -37,7 +42,10 @@ from homeassistant.helpers.entityfilter import (
 from .const import (
     API_VERSION_2,
     BATCH_BUFFER_SIZE,
+    BATCH_BUFFER_SIZE_MAX,
+    BATCH_BUFFER_SIZE_MIN,
     BATCH_TIMEOUT,
+    BATCH_WRITE_LATENCY_TARGET,
     CATCHING_UP_MESSAGE,
     CLIENT_ERROR_V1,
     CLIENT_ERROR_V2,
@@ -64,6 +72,7 @@ from .const import (
     CONF_TOKEN,
     CONF_USERNAME,
     CONF_VERIFY_SSL,
+    CONF_WRITER_METRICS,
     CONNECTION_ERROR,
     DEFAULT_API_VERSION,
     DEFAULT_HOST_V2,
@@ -79,6 +88,8 @@ from .const import (
     INFLUX_CONF_VALUE,
     QUERY_ERROR,
     QUEUE_BACKLOG_SECONDS,
+    QUEUE_FULL_MESSAGE,
+    QUEUE_MAX_SIZE,
     RE_DECIMAL,
     RE_DIGIT_TAIL,
     RESUMED_MESSAGE,
@@ -161,6 +172,7 @@ _INFLUX_BASE_SCHEMA = INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA.extend(
         vol.Optional(CONF_IGNORE_ATTRIBUTES, default=[]): vol.All(
             cv.ensure_list, [cv.string]
         ),
+        vol.Optional(CONF_WRITER_METRICS, default=False): cv.boolean,
         vol.Optional(CONF_COMPONENT_CONFIG, default={}): vol.Schema(
             {cv.entity_id: _CUSTOMIZE_ENTITY_SCHEMA}
         ),
@@ -311,10 +323,11 @@ def get_influx_connection(conf, test_write=False, test_read=False):
         kwargs[INFLUX_CONF_ORG] = conf[CONF_ORG]
         bucket = conf.get(CONF_BUCKET)
 
-        influx = InfluxDBClientV2(**kwargs)
+        influx = InfluxDBClientV2(enable_gzip=True, **kwargs)
         query_api = influx.query_api()
-        initial_write_mode = SYNCHRONOUS if test_write else ASYNCHRONOUS
-        write_api = influx.write_api(write_options=initial_write_mode)
+        # Writes happen in batches on our own thread, a synchronous write lets
+        # it retry on errors and measure how long the write took
+        write_api = influx.write_api(write_options=SYNCHRONOUS)
 
         def write_v2(json):
             """Write data to V2 influx."""
@@ -350,7 +363,6 @@ def get_influx_connection(conf, test_write=False, test_read=False):
                 write_v2(b"")
             except ValueError:
                 pass
-            write_api = influx.write_api(write_options=ASYNCHRONOUS)
 
         if test_read:
             tables = query_v2(TEST_QUERY_V2)
@@ -446,9 +458,16 @@ def setup(hass, config):
     instance = hass.data[DOMAIN] = InfluxThread(hass, influx, event_to_json, max_tries)
     instance.start()
 
+    if conf[CONF_WRITER_METRICS]:
+        discovery.load_platform(hass, "sensor", DOMAIN, {}, config)
+
     def shutdown(event):
         """Shut down the thread."""
-        instance.queue.put(None)
+        try:
+            instance.queue.put_nowait(None)
+        except queue.Full:
+            # Stop after the batch being written instead of waiting for room
+            instance.shutdown = True
         instance.join()
         influx.close()
 
@@ -463,18 +482,44 @@ class InfluxThread(threading.Thread):
     def __init__(self, hass, influx, event_to_json, max_tries):
         """Initialize the listener."""
         threading.Thread.__init__(self, name=DOMAIN)
-        self.queue = queue.Queue()
+        self.queue = queue.Queue(maxsize=QUEUE_MAX_SIZE)
         self.influx = influx
         self.event_to_json = event_to_json
         self.max_tries = max_tries
         self.write_errors = 0
         self.shutdown = False
+        self.batch_size = BATCH_BUFFER_SIZE
+        self.write_latency = None
+        # Updated from the event loop and the thread respectively
+        self.dropped_queue_full = 0
+        self.dropped_old = 0
+        self._queue_full = False
         hass.bus.listen(EVENT_STATE_CHANGED, self._event_listener)
 
+    @property
+    def queue_depth(self):
+        """Return the number of events waiting to be written."""
+        return self.queue.qsize()
+
+    @property
+    def dropped(self):
+        """Return the number of events dropped before they were written."""
+        return self.dropped_queue_full + self.dropped_old
+
+    @callback
     def _event_listener(self, event):
-        """Listen for new messages on the bus and queue them for Influx."""
+        """Listen for new messages on the bus and queue them for Influx.
+
+        Events are formatted by the thread, this only hands them over.
+        """
         item = (time.monotonic(), event)
-        self.queue.put(item)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            if not self._queue_full:
+                _LOGGER.warning(QUEUE_FULL_MESSAGE)
+                self._queue_full = True
+            self.dropped_queue_full += 1
 
     @staticmethod
     def batch_timeout():
@@ -491,7 +536,7 @@ class InfluxThread(threading.Thread):
         dropped = 0
 
         try:
-            while len(json) < BATCH_BUFFER_SIZE and not self.shutdown:
+            while len(json) < self.batch_size and not self.shutdown:
                 timeout = None if count == 0 else self.batch_timeout()
                 item = self.queue.get(timeout=timeout)
                 count += 1
@@ -510,18 +555,47 @@ class InfluxThread(threading.Thread):
                         dropped += 1
 
         except queue.Empty:
-            pass
+            self._queue_full = False
 
         if dropped:
+            self.dropped_old += dropped
             _LOGGER.warning(CATCHING_UP_MESSAGE, dropped)
 
         return count, json
 
+    def adapt_batch_size(self, failed=False):
+        """Size the next batch after the latency of the last write.
+
+        Slow or failed writes get smaller batches so a write stays well
+        within the client timeout, while a backlog of events on fast writes
+        gets larger batches so fewer requests are needed to catch up.
+        """
+        if failed or self.write_latency > BATCH_WRITE_LATENCY_TARGET:
+            self.batch_size = max(self.batch_size // 2, BATCH_BUFFER_SIZE_MIN)
+        elif (
+            self.write_latency < BATCH_WRITE_LATENCY_TARGET / 2
+            and self.queue.qsize() >= self.batch_size
+        ):
+            self.batch_size = min(self.batch_size * 2, BATCH_BUFFER_SIZE_MAX)
+
     def write_to_influxdb(self, json):
-        """Write preprocessed events to influxdb, with retry."""
+        """Write preprocessed events to influxdb, with retry.
+
+        Events are written in batches of the current batch size, so a retry
+        after a failed write sends smaller batches.
+        """
+        remaining = json
         for retry in range(self.max_tries + 1):
             try:
-                self.influx.write(json)
+                while remaining:
+                    batch = remaining[: self.batch_size]
+                    start = time.monotonic()
+                    try:
+                        self.influx.write(batch)
+                    finally:
+                        self.write_latency = time.monotonic() - start
+                    remaining = remaining[len(batch) :]
+                    self.adapt_batch_size()
 
                 if self.write_errors:
                     _LOGGER.error(RESUMED_MESSAGE, self.write_errors)
@@ -533,12 +607,13 @@ class InfluxThread(threading.Thread):
                 _LOGGER.error(err)
                 break
             except ConnectionError as err:
+                self.adapt_batch_size(failed=True)
                 if retry < self.max_tries:
                     time.sleep(RETRY_DELAY)
                 else:
                     if not self.write_errors:
                         _LOGGER.error(err)
-                    self.write_errors += len(json)
+                    self.write_errors += len(remaining)
 
     def run(self):
         """Process incoming events."""
@@ -29,6 +29,7 @@ CONF_COMPONENT_CONFIG_GLOB = "component_config_glob"
 CONF_COMPONENT_CONFIG_DOMAIN = "component_config_domain"
 CONF_RETRY_COUNT = "max_retries"
 CONF_IGNORE_ATTRIBUTES = "ignore_attributes"
+CONF_WRITER_METRICS = "writer_metrics"
 
 CONF_LANGUAGE = "language"
 CONF_QUERIES = "queries"
@@ -71,9 +72,13 @@ API_VERSION_2 = "2"
 TIMEOUT = 5
 RETRY_DELAY = 20
 QUEUE_BACKLOG_SECONDS = 30
+QUEUE_MAX_SIZE = 10000
 RETRY_INTERVAL = 60  # seconds
 BATCH_TIMEOUT = 1
 BATCH_BUFFER_SIZE = 100
+BATCH_BUFFER_SIZE_MIN = 10
+BATCH_BUFFER_SIZE_MAX = 1000
+BATCH_WRITE_LATENCY_TARGET = 1  # seconds
 LANGUAGE_INFLUXQL = "influxQL"
 LANGUAGE_FLUX = "flux"
 TEST_QUERY_V1 = "SHOW DATABASES;"
@@ -114,6 +119,7 @@ QUERY_ERROR = (
 )
 RETRY_MESSAGE = f"%s Retrying in {RETRY_INTERVAL} seconds."
 CATCHING_UP_MESSAGE = "Catching up, dropped %d old events."
+QUEUE_FULL_MESSAGE = "Queue is full, dropping events until it has room again."
 RESUMED_MESSAGE = "Resumed, lost %d events."
 WROTE_MESSAGE = "Wrote %d events."
 RUNNING_QUERY_MESSAGE = "Running query: %s."
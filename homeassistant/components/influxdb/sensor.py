@@ -12,6 +12,7 @@ from homeassistant.const import (
     CONF_VALUE_TEMPLATE,
     EVENT_HOMEASSISTANT_STOP,
     STATE_UNKNOWN,
+    TIME_SECONDS,
 )
 from homeassistant.exceptions import PlatformNotReady, TemplateError
 import homeassistant.helpers.config_validation as cv
@@ -41,6 +42,7 @@ from .const import (
     DEFAULT_GROUP_FUNCTION,
     DEFAULT_RANGE_START,
     DEFAULT_RANGE_STOP,
+    DOMAIN,
     INFLUX_CONF_VALUE,
     INFLUX_CONF_VALUE_V2,
     LANGUAGE_FLUX,
@@ -59,6 +61,15 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+UNIT_EVENTS = "events"
+
+# Writer thread attribute -> name and unit of the sensor reporting it
+WRITER_SENSORS = {
+    "queue_depth": ("Queue depth", UNIT_EVENTS),
+    "dropped": ("Dropped events", UNIT_EVENTS),
+    "write_latency": ("Write latency", TIME_SECONDS),
+}
+
 
 def _merge_connection_config_into_query(conf, query):
     """Merge connection details into each configured query."""
@@ -143,6 +154,15 @@ PLATFORM_SCHEMA = vol.All(
 
 def setup_platform(hass, config, add_entities, discovery_info=None):
     """Set up the InfluxDB component."""
+    if discovery_info is not None:
+        writer = hass.data[DOMAIN]
+        entities = [
+            InfluxWriterSensor(writer, attribute, name, unit)
+            for attribute, (name, unit) in WRITER_SENSORS.items()
+        ]
+        add_entities(entities, update_before_add=True)
+        return
+
     try:
         influx = get_influx_connection(config, test_read=True)
     except ConnectionError as exc:
@@ -243,6 +263,40 @@ class InfluxSensor(Entity):
         self._state = value
 
 
+class InfluxWriterSensor(Entity):
+    """A sensor reporting how the InfluxDB writer thread keeps up."""
+
+    def __init__(self, writer, attribute, name, unit):
+        """Initialize the sensor."""
+        self._writer = writer
+        self._attribute = attribute
+        self._name = f"InfluxDB {name}"
+        self._unit_of_measurement = unit
+        self._state = None
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return self._name
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        return self._state
+
+    @property
+    def unit_of_measurement(self):
+        """Return the unit of measurement of this entity."""
+        return self._unit_of_measurement
+
+    def update(self):
+        """Read the latest value from the writer thread."""
+        value = getattr(self._writer, self._attribute)
+        if isinstance(value, float):
+            value = round(value, 3)
+        self._state = value
+
+
 class InfluxFluxSensorData:
     """Class for handling the data retrieval from Influx with Flux query."""
 
@@ -1,9 +1,11 @@
 """Event parser and human readable log generator."""
+import asyncio
 from datetime import timedelta
 from itertools import groupby
 import json
 import logging
 
+from aiohttp import web
 import sqlalchemy
 from sqlalchemy.orm import aliased
 import voluptuous as vol
@@ -13,6 +15,7 @@ from homeassistant.components.history import sqlalchemy_filter_from_include_excl
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
     Events,
+    StateAttributes,
     States,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
@@ -24,6 +27,7 @@ from homeassistant.const import (
     ATTR_ENTITY_ID,
     ATTR_FRIENDLY_NAME,
     ATTR_NAME,
+    CONTENT_TYPE_JSON,
     EVENT_HOMEASSISTANT_START,
     EVENT_HOMEASSISTANT_STOP,
     EVENT_LOGBOOK_ENTRY,
@@ -43,6 +47,7 @@ from homeassistant.helpers.entityfilter import (
 from homeassistant.helpers.integration_platform import (
     async_process_integration_platforms,
 )
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.loader import bind_hass
 import homeassistant.util.dt as dt_util
 
@@ -58,8 +63,10 @@ DOMAIN = "logbook"
 
 GROUP_BY_MINUTES = 15
 
+# Number of entries written to a streamed response at once
+STREAM_CHUNK_SIZE = 100
+
 EMPTY_JSON_OBJECT = "{}"
-UNIT_OF_MEASUREMENT_JSON = '"unit_of_measurement":'
 
 CONFIG_SCHEMA = vol.Schema(
     {DOMAIN: INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA}, extra=vol.ALLOW_EXTRA
@@ -196,24 +203,139 @@ class LogbookView(HomeAssistantView):
             if end_day is None:
                 return self.json_message("Invalid end_time", HTTP_BAD_REQUEST)
 
+        after = request.query.get("after")
+        if after is not None:
+            start_day = dt_util.parse_datetime(after)
+            if start_day is None:
+                return self.json_message("Invalid after", HTTP_BAD_REQUEST)
+
+        limit = request.query.get("limit")
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = 0
+            if limit < 1:
+                return self.json_message("Invalid limit", HTTP_BAD_REQUEST)
+
         hass = request.app["hass"]
 
+        if limit is None:
+            return await self._async_stream_events(
+                request, hass, start_day, end_day, entity_id
+            )
+
         def json_events():
-            """Fetch events and generate JSON."""
-            return self.json(
-                _get_events(
-                    hass,
-                    self.config,
-                    start_day,
-                    end_day,
-                    entity_id,
-                    self.filters,
-                    self.entities_filter,
-                )
+            """Fetch a page of events and generate JSON."""
+            entries, next_after = _get_events_page(
+                hass,
+                start_day,
+                end_day,
+                limit,
+                entity_id,
+                self.filters,
+                self.entities_filter,
             )
+            headers = None
+            if next_after is not None:
+                next_url = request.url.update_query({"after": next_after.isoformat()})
+                headers = {"Link": f'<{next_url}>; rel="next"'}
+            return self.json(entries, headers=headers)
 
         return await hass.async_add_executor_job(json_events)
 
+    async def _async_stream_events(self, request, hass, start_day, end_day, entity_id):
+        """Stream the entries as a JSON list while they are read."""
+        response = web.StreamResponse()
+        response.content_type = CONTENT_TYPE_JSON
+        response.enable_compression()
+        await response.prepare(request)
+
+        def write(data):
+            """Write to the response from the executor."""
+            asyncio.run_coroutine_threadsafe(
+                response.write(data.encode("UTF-8")), hass.loop
+            ).result()
+
+        def stream_events():
+            """Fetch events and write them as JSON."""
+            entries = _iter_events(
+                hass, start_day, end_day, entity_id, self.filters, self.entities_filter
+            )
+            chunk = []
+            separator = "["
+            try:
+                for entry in entries:
+                    chunk.append(
+                        json.dumps(
+                            entry, sort_keys=True, cls=JSONEncoder, allow_nan=False
+                        )
+                    )
+                    if len(chunk) == STREAM_CHUNK_SIZE:
+                        write(separator + ",".join(chunk))
+                        chunk = []
+                        separator = ","
+            finally:
+                entries.close()
+
+            if chunk:
+                write(separator + ",".join(chunk) + "]")
+            elif separator == "[":
+                write("[]")
+            else:
+                write("]")
+
+        try:
+            await hass.async_add_executor_job(stream_events)
+        except ConnectionResetError:
+            _LOGGER.debug("Logbook request closed before all entries were sent")
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error streaming logbook entries")
+            # The status is already sent, closing the connection without ending
+            # the chunked body tells the client the response is incomplete
+            request.transport.close()
+
+        return response
+
+
+class LogbookPage:
+    """Limit the events of a page without splitting a group of events.
+
+    Reading continues after the limit until the group of the last event
+    ends, so humanify groups the entries of a page the same way it would
+    without pagination.
+    """
+
+    def __init__(self, limit):
+        """Initialize the page."""
+        self.limit = limit
+        self.last_time_fired = None
+        self.has_more = False
+
+    def limit_events(self, events):
+        """Yield the events that belong to the page."""
+        count = 0
+        group = None
+        for event in events:
+            event_group = _event_group(event)
+            if count >= self.limit and event_group != group:
+                self.has_more = True
+                return
+            count += 1
+            group = event_group
+            self.last_time_fired = event.time_fired
+            yield event
+
+
+def _event_group(event):
+    """Return the start of the GROUP_BY_MINUTES window the event was fired in."""
+    time_fired = event.time_fired
+    return time_fired.replace(
+        minute=time_fired.minute - time_fired.minute % GROUP_BY_MINUTES,
+        second=0,
+        microsecond=0,
+    )
+
 
 def humanify(hass, events, entity_attr_cache):
     """Generate a converted list of events into Entry objects.
@@ -224,9 +346,7 @@ def humanify(hass, events, entity_attr_cache):
     """
 
     # Group events in batches of GROUP_BY_MINUTES
-    for _, g_events in groupby(
-        events, lambda event: event.time_fired_minute // GROUP_BY_MINUTES
-    ):
+    for _, g_events in groupby(events, _event_group):
 
         events_batch = list(g_events)
 
@@ -341,6 +461,38 @@ def _get_events(
     hass, config, start_day, end_day, entity_id=None, filters=None, entities_filter=None
 ):
     """Get events for a period of time."""
+    return list(
+        _iter_events(hass, start_day, end_day, entity_id, filters, entities_filter)
+    )
+
+
+def _get_events_page(
+    hass, start_day, end_day, limit, entity_id=None, filters=None, entities_filter=None
+):
+    """Get the entries of a page of about limit events after start_day.
+
+    Returns the entries and, if there are more events, the time of the last
+    event of the page to continue after.
+    """
+    page = LogbookPage(limit)
+    entries = list(
+        _iter_events(
+            hass, start_day, end_day, entity_id, filters, entities_filter, page
+        )
+    )
+    return entries, page.last_time_fired if page.has_more else None
+
+
+def _iter_events(
+    hass,
+    start_day,
+    end_day,
+    entity_id=None,
+    filters=None,
+    entities_filter=None,
+    page=None,
+):
+    """Yield the entries for a period of time while the events are read."""
     entity_attr_cache = EntityAttributeCache(hass)
 
     def yield_events(query):
@@ -371,10 +523,15 @@ def _get_events(
                 States.entity_id,
                 States.domain,
                 States.attributes,
+                StateAttributes.shared_attrs,
             )
             .order_by(Events.time_fired)
             .outerjoin(States, (Events.event_id == States.event_id))
             .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+            .outerjoin(
+                StateAttributes,
+                (States.attributes_id == StateAttributes.attributes_id),
+            )
             # The below filter, removes state change events that do not have
             # and old_state, new_state, or the old and
             # new state.
@@ -395,7 +552,7 @@ def _get_events(
             .filter(
                 (Events.event_type != EVENT_STATE_CHANGED)
                 | sqlalchemy.not_(States.domain.in_(CONTINUOUS_DOMAINS))
-                | sqlalchemy.not_(States.attributes.contains(UNIT_OF_MEASUREMENT_JSON))
+                | States.has_unit_of_measurement.isnot(True)
             )
             .filter(
                 Events.event_type.in_(ALL_EVENT_TYPES + list(hass.data.get(DOMAIN, {})))
@@ -424,7 +581,11 @@ def _get_events(
                     entity_filter | (Events.event_type != EVENT_STATE_CHANGED)
                 )
 
-        return list(humanify(hass, yield_events(query), entity_attr_cache))
+        events = yield_events(query)
+        if page is not None:
+            events = page.limit_events(events)
+
+        yield from humanify(hass, events, entity_attr_cache)
 
 
 def _keep_event(hass, event, entities_filter):
@@ -575,13 +736,11 @@ class LazyEventPartialState:
     def attributes(self):
         """State attributes."""
         if not self._attributes:
-            if (
-                self._row.attributes is None
-                or self._row.attributes == EMPTY_JSON_OBJECT
-            ):
+            shared_attrs = self._row.shared_attrs or self._row.attributes
+            if shared_attrs is None or shared_attrs == EMPTY_JSON_OBJECT:
                 self._attributes = {}
             else:
-                self._attributes = json.loads(self._row.attributes)
+                self._attributes = json.loads(shared_attrs)
         return self._attributes
 
     @property
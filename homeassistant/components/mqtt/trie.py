@@ -0,0 +1,136 @@
+"""Wildcard aware topic trie used to dispatch MQTT messages."""
+from operator import itemgetter
+from typing import Dict, Generic, Iterator, List, Tuple, TypeVar
+
+_T = TypeVar("_T")
+
+WILDCARD_LEVEL = "+"
+WILDCARD_SUBTREE = "#"
+
+
+class _Node(Generic[_T]):
+    """A single topic level in the trie."""
+
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children: Dict[str, "_Node[_T]"] = {}
+        self.values: List[Tuple[int, _T]] = []
+
+
+class TopicTrie(Generic[_T]):
+    """Prefix tree of MQTT topic filters.
+
+    Values are stored under the topic filter they were added with. Looking up
+    a topic returns the values of every filter that matches it, honouring the
+    single level (+) and multi level (#) wildcards, in the order they were
+    added.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the trie."""
+        self._root: _Node[_T] = _Node()
+        self._sequence = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of values in the trie."""
+        return self._size
+
+    def __iter__(self) -> Iterator[_T]:
+        """Iterate over all values in the order they were added."""
+        entries: List[Tuple[int, _T]] = []
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            entries.extend(node.values)
+            nodes.extend(node.children.values())
+        entries.sort(key=itemgetter(0))
+        return (value for _, value in entries)
+
+    def add(self, topic_filter: str, value: _T) -> None:
+        """Add a value for a topic filter."""
+        node = self._root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _Node()
+            node = child
+        node.values.append((self._sequence, value))
+        self._sequence += 1
+        self._size += 1
+
+    def remove(self, topic_filter: str, value: _T) -> None:
+        """Remove a value previously added for a topic filter.
+
+        Raises KeyError if the value is not stored for the topic filter.
+        """
+        path: List[Tuple[_Node[_T], str]] = []
+        node = self._root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                raise KeyError(topic_filter)
+            path.append((node, level))
+            node = child
+
+        for idx, (_, stored) in enumerate(node.values):
+            if stored == value:
+                del node.values[idx]
+                break
+        else:
+            raise KeyError(topic_filter)
+
+        self._size -= 1
+
+        # Prune levels that no longer lead to any value
+        for parent, level in reversed(path):
+            child = parent.children[level]
+            if child.values or child.children:
+                break
+            del parent.children[level]
+
+    def has_filter(self, topic_filter: str) -> bool:
+        """Return if any value is stored for exactly this topic filter."""
+        node = self._root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                return False
+            node = child
+        return bool(node.values)
+
+    def match(self, topic: str) -> List[_T]:
+        """Return the values of all topic filters matching a topic."""
+        levels = topic.split("/")
+        depth = len(levels)
+        # Wildcards at the first level do not match topics starting with $
+        wildcard_root = not topic.startswith("$")
+        matches: List[Tuple[int, _T]] = []
+        stack = [(self._root, 0)]
+
+        while stack:
+            node, idx = stack.pop()
+            children = node.children
+            wildcards = idx > 0 or wildcard_root
+
+            if idx == depth:
+                matches.extend(node.values)
+            else:
+                child = children.get(levels[idx])
+                if child is not None:
+                    stack.append((child, idx + 1))
+                if wildcards:
+                    child = children.get(WILDCARD_LEVEL)
+                    if child is not None:
+                        stack.append((child, idx + 1))
+
+            if wildcards:
+                child = children.get(WILDCARD_SUBTREE)
+                if child is not None:
+                    matches.extend(child.values)
+
+        if len(matches) > 1:
+            matches.sort(key=itemgetter(0))
+        return [value for _, value in matches]
@@ -1,8 +1,12 @@
 """Support for Prometheus metrics export."""
+import asyncio
+import gzip
 import logging
 import string
+import time
+from typing import Dict, List, Optional, Tuple
 
-from aiohttp import web
+from aiohttp import hdrs, web
 import prometheus_client
 import voluptuous as vol
 
@@ -47,6 +51,9 @@ CONF_COMPONENT_CONFIG_GLOB = "component_config_glob"
 CONF_COMPONENT_CONFIG_DOMAIN = "component_config_domain"
 CONF_DEFAULT_METRIC = "default_metric"
 CONF_OVERRIDE_METRIC = "override_metric"
+CONF_COLLECT_ON_SCRAPE = "collect_on_scrape"
+CONF_GZIP = "gzip"
+CONF_CACHE_TIME = "cache_time"
 COMPONENT_CONFIG_SCHEMA_ENTRY = vol.Schema(
     {vol.Optional(CONF_OVERRIDE_METRIC): cv.string}
 )
@@ -68,6 +75,11 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Optional(CONF_COMPONENT_CONFIG_DOMAIN, default={}): vol.Schema(
                     {cv.string: COMPONENT_CONFIG_SCHEMA_ENTRY}
                 ),
+                vol.Optional(CONF_COLLECT_ON_SCRAPE, default=False): cv.boolean,
+                vol.Optional(CONF_GZIP, default=False): cv.boolean,
+                vol.Optional(CONF_CACHE_TIME, default=0): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
             }
         )
     },
@@ -77,8 +89,6 @@ CONFIG_SCHEMA = vol.Schema(
 
 def setup(hass, config):
     """Activate Prometheus component."""
-    hass.http.register_view(PrometheusView(prometheus_client))
-
     conf = config[DOMAIN]
     entity_filter = conf[CONF_FILTER]
     namespace = conf.get(CONF_PROM_NAMESPACE)
@@ -91,7 +101,7 @@ def setup(hass, config):
         conf[CONF_COMPONENT_CONFIG_GLOB],
     )
 
-    metrics = PrometheusMetrics(
+    metrics_args = (
         prometheus_client,
         entity_filter,
         namespace,
@@ -101,7 +111,19 @@ def setup(hass, config):
         default_metric,
     )
 
-    hass.bus.listen(EVENT_STATE_CHANGED, metrics.handle_event)
+    if conf[CONF_COLLECT_ON_SCRAPE]:
+        collector = PrometheusCollector(hass, metrics_args)
+        hass.bus.listen(EVENT_STATE_CHANGED, collector.async_handle_event)
+    else:
+        collector = None
+        metrics = PrometheusMetrics(*metrics_args)
+        hass.bus.listen(EVENT_STATE_CHANGED, metrics.handle_event)
+
+    hass.http.register_view(
+        PrometheusView(
+            prometheus_client, collector, conf[CONF_GZIP], conf[CONF_CACHE_TIME]
+        )
+    )
     return True
 
 
@@ -117,9 +139,11 @@ class PrometheusMetrics:
         component_config,
         override_metric,
         default_metric,
+        registry=None,
     ):
         """Initialize Prometheus Metrics."""
         self.prometheus_cli = prometheus_cli
+        self._registry = registry or prometheus_cli.REGISTRY
         self._component_config = component_config
         self._override_metric = override_metric
         self._default_metric = default_metric
@@ -145,6 +169,10 @@ class PrometheusMetrics:
         if state is None:
             return
 
+        self.handle_state(state)
+
+    def handle_state(self, state):
+        """Update the metrics of a state."""
         entity_id = state.entity_id
         _LOGGER.debug("Handling state update for %s", entity_id)
         domain, _ = hacore.split_entity_id(entity_id)
@@ -161,7 +189,7 @@ class PrometheusMetrics:
         state_change = self._metric(
             "state_change", self.prometheus_cli.Counter, "The number of state changes"
         )
-        state_change.labels(**labels).inc()
+        self._count_state_changes(state_change, state)
 
         entity_available = self._metric(
             "entity_available",
@@ -202,9 +230,15 @@ class PrometheusMetrics:
             full_metric_name = self._sanitize_metric_name(
                 f"{self.metrics_prefix}{metric}"
             )
-            self._metrics[metric] = factory(full_metric_name, documentation, labels)
+            self._metrics[metric] = factory(
+                full_metric_name, documentation, labels, registry=self._registry
+            )
             return self._metrics[metric]
 
+    def _count_state_changes(self, metric, state):
+        """Count a change of a state."""
+        metric.labels(**self._labels(state)).inc()
+
     @staticmethod
     def _sanitize_metric_name(metric: str) -> str:
         return "".join(
@@ -465,7 +499,67 @@ class PrometheusMetrics:
             "Count of times an automation has been triggered",
         )
 
-        metric.labels(**self._labels(state)).inc()
+        self._count_state_changes(metric, state)
+
+
+class SnapshotMetrics(PrometheusMetrics):
+    """Metrics of a snapshot of the states.
+
+    The metrics are built from scratch when scraped, counters are set from
+    the number of state changes counted by the collector.
+    """
+
+    def __init__(self, state_changes: Dict[str, int], *args, registry):
+        """Initialize the snapshot metrics."""
+        super().__init__(*args, registry=registry)
+        self._state_changes = state_changes
+
+    def _count_state_changes(self, metric, state):
+        """Set the counter of the state changes of a state."""
+        metric.labels(**self._labels(state)).inc(
+            self._state_changes.get(state.entity_id, 0)
+        )
+
+
+class PrometheusCollector:
+    """Collect the metrics of the current states when scraped.
+
+    Between scrapes only the state changes of each entity are counted.
+    """
+
+    def __init__(self, hass, metrics_args):
+        """Initialize the collector."""
+        self.hass = hass
+        self.prometheus_cli = metrics_args[0]
+        self._metrics_args = metrics_args
+        self._state_changes: Dict[str, int] = {}
+
+    @hacore.callback
+    def async_handle_event(self, event):
+        """Count the state changes of an entity."""
+        state = event.data.get("new_state")
+        if state is None:
+            return
+
+        entity_id = state.entity_id
+        self._state_changes[entity_id] = self._state_changes.get(entity_id, 0) + 1
+
+    @hacore.callback
+    def async_snapshot(self) -> Tuple[List[hacore.State], Dict[str, int]]:
+        """Return the current states and their number of state changes."""
+        return self.hass.states.async_all(), dict(self._state_changes)
+
+    def collect_snapshot(self, snapshot):
+        """Return a registry with the metrics of a snapshot.
+
+        This method must be run in the executor.
+        """
+        states, state_changes = snapshot
+        registry = self.prometheus_cli.CollectorRegistry(auto_describe=False)
+        metrics = SnapshotMetrics(state_changes, *self._metrics_args, registry=registry)
+        for state in states:
+            metrics.handle_state(state)
+        return registry
 
 
 class PrometheusView(HomeAssistantView):
@@ -474,15 +568,71 @@ class PrometheusView(HomeAssistantView):
     url = API_ENDPOINT
     name = "api:prometheus"
 
-    def __init__(self, prometheus_cli):
+    def __init__(
+        self,
+        prometheus_cli,
+        collector: Optional[PrometheusCollector] = None,
+        use_gzip: bool = False,
+        cache_time: float = 0,
+    ):
         """Initialize Prometheus view."""
         self.prometheus_cli = prometheus_cli
+        self._collector = collector
+        self._use_gzip = use_gzip
+        self._cache_time = cache_time
+        # Rendered (body, gzipped body) and when it expires
+        self._payload: Optional[Tuple[bytes, Optional[bytes]]] = None
+        self._payload_expires = 0.0
+        self._render_task: Optional[asyncio.Future] = None
+
+    def _render(self, snapshot) -> Tuple[bytes, Optional[bytes]]:
+        """Render the metrics, gzipped if enabled.
+
+        This method must be run in the executor.
+        """
+        body = self.prometheus_cli.generate_latest()
+        if self._collector is not None:
+            body += self.prometheus_cli.generate_latest(
+                self._collector.collect_snapshot(snapshot)
+            )
+        return body, gzip.compress(body) if self._use_gzip else None
+
+    async def _async_get_payload(self, hass) -> Tuple[bytes, Optional[bytes]]:
+        """Return the rendered metrics, shared by concurrent scrapes."""
+        if self._payload is not None and time.monotonic() < self._payload_expires:
+            return self._payload
+
+        if self._render_task is None:
+            snapshot = None
+            if self._collector is not None:
+                snapshot = self._collector.async_snapshot()
+            self._render_task = hass.async_add_executor_job(self._render, snapshot)
+            self._render_task.add_done_callback(self._async_render_done)
+
+        return await asyncio.shield(self._render_task)
+
+    @hacore.callback
+    def _async_render_done(self, render_task: asyncio.Future) -> None:
+        """Cache the rendered metrics."""
+        self._render_task = None
+        if render_task.cancelled() or render_task.exception() is not None:
+            return
+        self._payload = render_task.result()
+        self._payload_expires = time.monotonic() + self._cache_time
 
     async def get(self, request):
         """Handle request for Prometheus metrics."""
         _LOGGER.debug("Received Prometheus metrics request")
 
-        return web.Response(
-            body=self.prometheus_cli.generate_latest(),
-            content_type=CONTENT_TYPE_TEXT_PLAIN,
-        )
+        body, gzipped = await self._async_get_payload(request.app["hass"])
+
+        if gzipped is not None and "gzip" in request.headers.get(
+            hdrs.ACCEPT_ENCODING, ""
+        ):
+            return web.Response(
+                body=gzipped,
+                content_type=CONTENT_TYPE_TEXT_PLAIN,
+                headers={hdrs.CONTENT_ENCODING: "gzip"},
+            )
+
+        return web.Response(body=body, content_type=CONTENT_TYPE_TEXT_PLAIN)
@@ -1,15 +1,15 @@
 """Support for recording details."""
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 import queue
 import threading
 import time
 from typing import Any, Callable, List, Optional
 
-from sqlalchemy import create_engine, event as sqlalchemy_event, exc, select
+from sqlalchemy import create_engine, event as sqlalchemy_event, exc, func, select
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import StaticPool
 import voluptuous as vol
@@ -17,6 +17,7 @@ import voluptuous as vol
 from homeassistant.components import persistent_notification
 from homeassistant.const import (
     ATTR_ENTITY_ID,
+    ATTR_NOW,
     CONF_EXCLUDE,
     EVENT_HOMEASSISTANT_START,
     EVENT_HOMEASSISTANT_STOP,
@@ -36,7 +37,8 @@ import homeassistant.util.dt as dt_util
 
 from . import migration, purge
 from .const import DATA_INSTANCE, DOMAIN, SQLITE_URL_PREFIX
-from .models import Base, Events, RecorderRuns, States
+from .models import Base, Events, RecorderRuns, StateAttributes, States
+from .statistics import StatisticsCompiler
 from .util import session_scope, validate_or_move_away_sqlite_database
 
 _LOGGER = logging.getLogger(__name__)
@@ -58,6 +60,10 @@ DEFAULT_DB_FILE = "home-assistant_v2.db"
 DEFAULT_DB_MAX_RETRIES = 10
 DEFAULT_DB_RETRY_WAIT = 3
 KEEPALIVE_TIME = 30
+STATE_ATTRIBUTES_ID_CACHE_SIZE = 2048
+# Dialects whose autoincrement continues after explicitly inserted ids, rows
+# get their ids before the flush so each table is written in one executemany
+EXPLICIT_ID_DIALECTS = ("sqlite", "mysql")
 
 CONF_AUTO_PURGE = "auto_purge"
 CONF_DB_URL = "db_url"
@@ -188,6 +194,8 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
 
 PurgeTask = namedtuple("PurgeTask", ["keep_days", "repack"])
+RepackTask = namedtuple("RepackTask", [])
+TimerTick = namedtuple("TimerTick", ["now"])
 
 
 class Recorder(threading.Thread):
@@ -226,7 +234,23 @@ class Recorder(threading.Thread):
 
         self._timechanges_seen = 0
         self._keepalive_count = 0
-        self._old_state_ids = {}
+        # entity_id -> state_id of the last state recorded, or its States row
+        # while that is pending without an id in the event session
+        self._old_states = {}
+        self._pending_states = []
+        # Assign primary keys before the flush so rows are inserted in batches
+        self._use_explicit_ids = False
+        # Primary key column -> next id to assign in the pending batch
+        self._next_ids = {}
+        # entity_id -> (attributes, shared_attrs) of the last state recorded
+        self._serialized_attributes = {}
+        # shared_attrs -> attributes_id of committed rows, least recent first
+        self.state_attributes_ids = OrderedDict()
+        # shared_attrs -> StateAttributes rows pending in the event session
+        self._pending_state_attributes = {}
+        self.purge_progress = None
+        self._stop_requested = False
+        self.statistics = StatisticsCompiler()
         self.event_session = None
         self.get_session = None
         self._completed_database_setup = False
@@ -292,6 +316,7 @@ class Recorder(threading.Thread):
                 """Shut down the Recorder."""
                 if not hass_started.done():
                     hass_started.set_result(shutdown_task)
+                self._stop_requested = True
                 self.queue.put(None)
                 self.join()
 
@@ -330,6 +355,10 @@ class Recorder(threading.Thread):
                 async_purge, hour=4, minute=12, second=0
             )
 
+        self.hass.helpers.event.track_time_interval(
+            self.async_timer_tick, timedelta(seconds=1)
+        )
+
         self.event_session = self.get_session()
         # Use a session for the event read loop
         # with a commit every time the event time
@@ -342,22 +371,30 @@ class Recorder(threading.Thread):
                 self.queue.task_done()
                 return
             if isinstance(event, PurgeTask):
+                # Pending states may reference attributes the purge removes
+                self._commit_event_session_or_retry()
                 # Schedule a new purge task if this one didn't finish
-                if not purge.purge_old_data(self, event.keep_days, event.repack):
+                if not purge.purge_old_data(self, event.keep_days):
                     self.queue.put(PurgeTask(event.keep_days, event.repack))
+                elif event.repack:
+                    # Repacking blocks the database, write the queued events first
+                    self.queue.put(RepackTask())
                 self.queue.task_done()
                 continue
+            if isinstance(event, RepackTask):
+                if self._stop_requested:
+                    _LOGGER.debug("Skipping repacking the database while stopping")
+                else:
+                    purge.repack_database(self)
+                self.queue.task_done()
+                continue
+            if isinstance(event, TimerTick):
+                self.queue.task_done()
+                self._process_timer_tick(event.now)
+                continue
             if event.event_type == EVENT_TIME_CHANGED:
                 self.queue.task_done()
-                self._keepalive_count += 1
-                if self._keepalive_count >= KEEPALIVE_TIME:
-                    self._keepalive_count = 0
-                    self._send_keep_alive()
-                if self.commit_interval:
-                    self._timechanges_seen += 1
-                    if self._timechanges_seen >= self.commit_interval:
-                        self._timechanges_seen = 0
-                        self._commit_event_session_or_retry()
+                self._process_timer_tick(event.data.get(ATTR_NOW, event.time_fired))
                 continue
             if event.event_type in self.exclude_t:
                 self.queue.task_done()
@@ -369,12 +406,17 @@ class Recorder(threading.Thread):
                     self.queue.task_done()
                     continue
 
+            # Rows are only added to the session here. They are linked through
+            # relationships and written together when the session is committed.
+            dbevent = None
             try:
-                dbevent = Events.from_event(event)
                 if event.event_type == EVENT_STATE_CHANGED:
-                    dbevent.event_data = "{}"
+                    dbevent = Events.from_event(event, event_data="{}")
+                else:
+                    dbevent = Events.from_event(event)
+                if self._use_explicit_ids:
+                    dbevent.event_id = self._next_id(Events.event_id)
                 self.event_session.add(dbevent)
-                self.event_session.flush()
             except (TypeError, ValueError):
                 _LOGGER.warning("Event is not JSON serializable: %s", event)
             except Exception as err:  # pylint: disable=broad-except
@@ -385,16 +427,27 @@ class Recorder(threading.Thread):
                 try:
                     dbstate = States.from_event(event)
                     has_new_state = event.data.get("new_state")
-                    dbstate.old_state_id = self._old_state_ids.get(dbstate.entity_id)
+                    old_state = self._old_states.pop(dbstate.entity_id, None)
+                    if isinstance(old_state, int):
+                        dbstate.old_state_id = old_state
+                    elif old_state is not None and old_state in self.event_session:
+                        # The old state is still pending in this batch
+                        dbstate.old_state = old_state
                     if not has_new_state:
                         dbstate.state = None
-                    dbstate.event_id = dbevent.event_id
+                    if self._use_explicit_ids:
+                        dbstate.state_id = self._next_id(States.state_id)
+                        dbstate.event_id = dbevent.event_id
+                    else:
+                        dbstate.event = dbevent
+                    self._set_state_attributes(dbstate, event)
                     self.event_session.add(dbstate)
-                    self.event_session.flush()
-                    if has_new_state:
-                        self._old_state_ids[dbstate.entity_id] = dbstate.state_id
-                    elif dbstate.entity_id in self._old_state_ids:
-                        del self._old_state_ids[dbstate.entity_id]
+                    if has_new_state and self._use_explicit_ids:
+                        self._old_states[dbstate.entity_id] = dbstate.state_id
+                    elif has_new_state:
+                        self._old_states[dbstate.entity_id] = dbstate
+                        self._pending_states.append(dbstate)
+                    self.statistics.add_event(self.event_session, event)
                 except (TypeError, ValueError):
                     _LOGGER.warning(
                         "State is not JSON serializable: %s",
@@ -411,6 +464,111 @@ class Recorder(threading.Thread):
 
             self.queue.task_done()
 
+    def _set_state_attributes(self, dbstate, event):
+        """Set the shared attributes of the new state, adding them if new."""
+        entity_id = dbstate.entity_id
+        new_state = event.data.get("new_state")
+        serialized = self._serialized_attributes.get(entity_id)
+
+        # The state machine shares unchanged attributes with the previous
+        # state, equality would also match 1 with 1.0 or True
+        if (
+            new_state is not None
+            and serialized is not None
+            and serialized[0] is new_state.attributes
+        ):
+            shared_attrs = serialized[1]
+        else:
+            shared_attrs = StateAttributes.shared_attrs_from_event(event)
+            if new_state is None:
+                self._serialized_attributes.pop(entity_id, None)
+            else:
+                self._serialized_attributes[entity_id] = (
+                    new_state.attributes,
+                    shared_attrs,
+                )
+
+        attributes_id = self.state_attributes_ids.get(shared_attrs)
+        if attributes_id is not None:
+            self.state_attributes_ids.move_to_end(shared_attrs)
+            dbstate.attributes_id = attributes_id
+            return
+
+        pending = self._pending_state_attributes.get(shared_attrs)
+        if pending is not None:
+            if self._use_explicit_ids:
+                dbstate.attributes_id = pending.attributes_id
+            else:
+                dbstate.state_attributes = pending
+            return
+
+        attr_hash = StateAttributes.hash_shared_attrs(shared_attrs)
+        # Do not flush the pending batch just to look up the attributes
+        with self.event_session.no_autoflush:
+            attributes_id = (
+                self.event_session.query(StateAttributes.attributes_id)
+                .filter(StateAttributes.hash == attr_hash)
+                .filter(StateAttributes.shared_attrs == shared_attrs)
+                .first()
+            )
+
+        if attributes_id is not None:
+            self._cache_state_attributes_id(shared_attrs, attributes_id[0])
+            dbstate.attributes_id = attributes_id[0]
+            return
+
+        dbstate_attributes = StateAttributes(hash=attr_hash, shared_attrs=shared_attrs)
+        if self._use_explicit_ids:
+            dbstate_attributes.attributes_id = self._next_id(
+                StateAttributes.attributes_id
+            )
+            dbstate.attributes_id = dbstate_attributes.attributes_id
+        else:
+            dbstate.state_attributes = dbstate_attributes
+        self.event_session.add(dbstate_attributes)
+        self._pending_state_attributes[shared_attrs] = dbstate_attributes
+
+    def _next_id(self, column):
+        """Return the next primary key of a table for the pending batch.
+
+        The highest id is only read for the first row of a table in a batch,
+        the recorder is the only writer of the tables it assigns ids for.
+        """
+        next_id = self._next_ids.get(column)
+        if next_id is None:
+            with self.event_session.no_autoflush:
+                next_id = (self.event_session.query(func.max(column)).scalar() or 0) + 1
+        self._next_ids[column] = next_id + 1
+        return next_id
+
+    def _cache_state_attributes_id(self, shared_attrs, attributes_id):
+        """Remember the id of committed shared attributes."""
+        self.state_attributes_ids[shared_attrs] = attributes_id
+        if len(self.state_attributes_ids) > STATE_ATTRIBUTES_ID_CACHE_SIZE:
+            self.state_attributes_ids.popitem(last=False)
+
+    @callback
+    def async_timer_tick(self, now):
+        """Queue a timer tick for the recorder thread.
+
+        While EVENT_TIME_CHANGED is fired its events are the ticks instead.
+        """
+        if EVENT_TIME_CHANGED not in self.hass.bus.async_listeners():
+            self.queue.put(TimerTick(now))
+
+    def _process_timer_tick(self, now):
+        """Compile statistics, keep the connection alive and commit."""
+        self.statistics.compile(self.event_session, now)
+        self._keepalive_count += 1
+        if self._keepalive_count >= KEEPALIVE_TIME:
+            self._keepalive_count = 0
+            self._send_keep_alive()
+        if self.commit_interval:
+            self._timechanges_seen += 1
+            if self._timechanges_seen >= self.commit_interval:
+                self._timechanges_seen = 0
+                self._commit_event_session_or_retry()
+
     def _send_keep_alive(self):
         try:
             _LOGGER.debug("Sending keepalive")
@@ -461,6 +619,15 @@ class Recorder(threading.Thread):
         self._reopen_event_session()
 
     def _reopen_event_session(self):
+        self._pending_state_attributes = {}
+        self._next_ids = {}
+        # Rows of the rolled back batch will never get an id
+        self._pending_states = []
+        self._old_states = {
+            entity_id: state_id
+            for entity_id, state_id in self._old_states.items()
+            if isinstance(state_id, int)
+        }
         try:
             self.event_session.rollback()
         except Exception as err:  # pylint: disable=broad-except
@@ -480,13 +647,34 @@ class Recorder(threading.Thread):
             _LOGGER.exception("Error while creating new event session: %s", err)
 
     def _commit_event_session(self):
+        pending_state_attributes = self._pending_state_attributes
+        self._pending_state_attributes = {}
+        self._next_ids = {}
         try:
+            if self._pending_states:
+                self.event_session.flush()
+                # Keep only the ids of the states, they are assigned by the
+                # flush and must be read before the commit expires the rows
+                for dbstate in self._pending_states:
+                    if self._old_states.get(dbstate.entity_id) is dbstate:
+                        self._old_states[dbstate.entity_id] = dbstate.state_id
+                self._pending_states = []
+            elif pending_state_attributes and not self._use_explicit_ids:
+                self.event_session.flush()
+            # Read the ids before the commit expires the rows
+            attributes_ids = [
+                (shared_attrs, dbstate_attributes.attributes_id)
+                for shared_attrs, dbstate_attributes in pending_state_attributes.items()
+            ]
             self.event_session.commit()
         except Exception as err:
             _LOGGER.error("Error executing query: %s", err)
             self.event_session.rollback()
             raise
 
+        for shared_attrs, attributes_id in attributes_ids:
+            self._cache_state_attributes_id(shared_attrs, attributes_id)
+
     @callback
     def event_listener(self, event):
         """Listen for new events and put them in the process queue."""
@@ -540,6 +728,7 @@ class Recorder(threading.Thread):
             self.engine.dispose()
 
         self.engine = create_engine(self.db_url, **kwargs)
+        self._use_explicit_ids = self.engine.dialect.name in EXPLICIT_ID_DIALECTS
 
         sqlalchemy_event.listen(self.engine, "connect", setup_recorder_connection)
 
@@ -3,3 +3,9 @@
 DATA_INSTANCE = "recorder_instance"
 SQLITE_URL_PREFIX = "sqlite://"
 DOMAIN = "recorder"
+
+EVENT_RECORDER_PURGE_PROGRESS = "recorder_purge_progress"
+
+# The maximum number of rows to delete in a single purge batch,
+# stays under the SQLite limit of 999 bound variables per query
+MAX_ROWS_TO_PURGE = 998
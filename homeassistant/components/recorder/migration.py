@@ -1,7 +1,7 @@
 """Schema migration helpers."""
 import logging
 
-from sqlalchemy import Table, text
+from sqlalchemy import Boolean, Integer, Table, Text, column, select, table, text
 from sqlalchemy.engine import reflection
 from sqlalchemy.exc import InternalError, OperationalError, SQLAlchemyError
 
@@ -11,6 +11,8 @@ from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+UNIT_OF_MEASUREMENT_JSON = '"unit_of_measurement":'
+
 
 def migrate_schema(instance):
     """Check if the schema needs to be upgraded."""
@@ -277,10 +279,51 @@ def _apply_update(engine, new_version, old_version):
         _drop_index(engine, "states", "ix_states_entity_id")
         _create_index(engine, "events", "ix_events_event_type_time_fired")
         _drop_index(engine, "events", "ix_events_event_type")
+    elif new_version == 10:
+        # The state_attributes table is created with the other tables.
+        # Existing rows keep their attributes column, new rows reference
+        # their deduplicated attributes instead.
+        _add_columns(engine, "states", ["attributes_id INTEGER"])
+        _create_index(engine, "states", "ix_states_attributes_id")
+    elif new_version == 11:
+        _add_columns(engine, "states", ["has_unit_of_measurement BOOLEAN"])
+        _backfill_has_unit_of_measurement(engine)
+        _create_index(engine, "events", "ix_events_time_fired_event_type")
     else:
         raise ValueError(f"No schema migration defined for version {new_version}")
 
 
+def _backfill_has_unit_of_measurement(engine):
+    """Flag the recorded states that have a unit of measurement."""
+    _LOGGER.warning(
+        "Flagging states with a unit of measurement. Note: this can take "
+        "several minutes on large databases and slow computers. Please "
+        "be patient!"
+    )
+    states = table(
+        "states",
+        column("attributes", Text),
+        column("attributes_id", Integer),
+        column("has_unit_of_measurement", Boolean),
+    )
+    state_attributes = table(
+        "state_attributes",
+        column("attributes_id", Integer),
+        column("shared_attrs", Text),
+    )
+    unit_attributes_ids = select([state_attributes.c.attributes_id]).where(
+        state_attributes.c.shared_attrs.contains(UNIT_OF_MEASUREMENT_JSON)
+    )
+    engine.execute(
+        states.update()
+        .where(
+            states.c.attributes.contains(UNIT_OF_MEASUREMENT_JSON)
+            | states.c.attributes_id.in_(unit_attributes_ids)
+        )
+        .values(has_unit_of_measurement=True)
+    )
+
+
 def _inspect_schema_version(engine, session):
     """Determine the schema version by inspecting the db structure.
 
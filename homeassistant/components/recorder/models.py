@@ -1,11 +1,14 @@
 """Models for SQLAlchemy."""
 import json
 import logging
+import zlib
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -14,8 +17,10 @@ from sqlalchemy import (
     distinct,
 )
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from sqlalchemy.orm.session import Session
 
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT
 from homeassistant.core import Context, Event, EventOrigin, State, split_entity_id
 from homeassistant.helpers.json import JSONEncoder
 import homeassistant.util.dt as dt_util
@@ -24,7 +29,7 @@ import homeassistant.util.dt as dt_util
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 9
+SCHEMA_VERSION = 11
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -49,14 +54,17 @@ class Events(Base):  # type: ignore
         # Used for fetching events at a specific time
         # see logbook
         Index("ix_events_event_type_time_fired", "event_type", "time_fired"),
+        # Used for fetching the events of a period in order
+        # see logbook
+        Index("ix_events_time_fired_event_type", "time_fired", "event_type"),
     )
 
     @staticmethod
-    def from_event(event):
+    def from_event(event, event_data=None):
         """Create an event database object from a native event."""
         return Events(
             event_type=event.event_type,
-            event_data=json.dumps(event.data, cls=JSONEncoder),
+            event_data=event_data or json.dumps(event.data, cls=JSONEncoder),
             origin=str(event.origin),
             time_fired=event.time_fired,
             context_id=event.context.id,
@@ -93,12 +101,30 @@ class States(Base):  # type: ignore
     domain = Column(String(64))
     entity_id = Column(String(255))
     state = Column(String(255))
+    # Only set on rows written before the attributes were deduplicated
     attributes = Column(Text)
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
+    # Used by the logbook to skip states of sensors with a unit
+    has_unit_of_measurement = Column(Boolean, default=False)
     event_id = Column(Integer, ForeignKey("events.event_id"), index=True)
     last_changed = Column(DateTime(timezone=True), default=dt_util.utcnow)
     last_updated = Column(DateTime(timezone=True), default=dt_util.utcnow, index=True)
     created = Column(DateTime(timezone=True), default=dt_util.utcnow)
     old_state_id = Column(Integer)
+    # Relationships used to link rows that are still pending in the
+    # recorder session, before their primary keys are known
+    event = relationship("Events", uselist=False)
+    old_state = relationship(
+        "States",
+        primaryjoin="States.old_state_id == States.state_id",
+        foreign_keys=[old_state_id],
+        remote_side=[state_id],
+        uselist=False,
+    )
+    # Loaded with the state, to_native needs it for every row
+    state_attributes = relationship("StateAttributes", uselist=False, lazy="joined")
 
     __table_args__ = (
         # Used for fetching the state of entities at a specific time
@@ -118,13 +144,15 @@ class States(Base):  # type: ignore
         if state is None:
             dbstate.state = ""
             dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = "{}"
+            dbstate.has_unit_of_measurement = False
             dbstate.last_changed = event.time_fired
             dbstate.last_updated = event.time_fired
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes), cls=JSONEncoder)
+            dbstate.has_unit_of_measurement = (
+                ATTR_UNIT_OF_MEASUREMENT in state.attributes
+            )
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
@@ -132,11 +160,15 @@ class States(Base):  # type: ignore
 
     def to_native(self, validate_entity_id=True):
         """Convert to an HA state object."""
+        shared_attrs = self.attributes
+        if shared_attrs is None and self.state_attributes is not None:
+            shared_attrs = self.state_attributes.shared_attrs
+
         try:
             return State(
                 self.entity_id,
                 self.state,
-                json.loads(self.attributes),
+                json.loads(shared_attrs or "{}"),
                 process_timestamp(self.last_changed),
                 process_timestamp(self.last_updated),
                 # Join the events table on event_id to get the context instead
@@ -150,6 +182,68 @@ class States(Base):  # type: ignore
             return None
 
 
+class StateAttributes(Base):  # type: ignore
+    """State attributes shared by all states that have the same attributes."""
+
+    __tablename__ = "state_attributes"
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def shared_attrs_from_event(event):
+        """Create the shared attributes of a state_changed event."""
+        state = event.data.get("new_state")
+        # State got deleted
+        if state is None:
+            return "{}"
+        return json.dumps(dict(state.attributes), cls=JSONEncoder)
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the hash used to look up shared attributes."""
+        return zlib.crc32(shared_attrs.encode("utf-8"))
+
+    def to_native(self, validate_entity_id=True):
+        """Convert to a state attributes dictionary."""
+        try:
+            return json.loads(self.shared_attrs)
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to state attributes: %s", self)
+            return {}
+
+
+class StatisticsBase:
+    """Statistics of a numeric entity over a period."""
+
+    id = Column(Integer, primary_key=True)
+    created = Column(DateTime(timezone=True), default=dt_util.utcnow)
+    entity_id = Column(String(255))
+    start = Column(DateTime(timezone=True))
+    mean = Column(Float)
+    min = Column(Float)
+    max = Column(Float)
+    sum = Column(Float)
+    count = Column(Integer)
+
+
+class Statistics(StatisticsBase, Base):  # type: ignore
+    """Hourly statistics."""
+
+    __tablename__ = "statistics"
+    __table_args__ = (Index("ix_statistics_entity_id_start", "entity_id", "start"),)
+
+
+class StatisticsShortTerm(StatisticsBase, Base):  # type: ignore
+    """Five minute statistics."""
+
+    __tablename__ = "statistics_short_term"
+    __table_args__ = (
+        Index("ix_statistics_short_term_entity_id_start", "entity_id", "start"),
+    )
+
+
 class RecorderRuns(Base):  # type: ignore
     """Representation of recorder run."""
 
@@ -3,63 +3,67 @@ from datetime import timedelta
 import logging
 import time
 
+import attr
+from sqlalchemy import distinct, func, or_
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
 
 import homeassistant.util.dt as dt_util
 
-from .models import Events, RecorderRuns, States
-from .util import execute, session_scope
+from .const import EVENT_RECORDER_PURGE_PROGRESS, MAX_ROWS_TO_PURGE
+from .models import Events, RecorderRuns, StateAttributes, States
+from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
+@attr.s(slots=True)
+class PurgeProgress:
+    """Progress of a purge that runs over multiple batches."""
+
+    states_remaining: int = attr.ib()
+    events_remaining: int = attr.ib()
+    states_deleted: int = attr.ib(default=0)
+    events_deleted: int = attr.ib(default=0)
+    started: float = attr.ib(factory=time.monotonic)
+
+    def as_dict(self, finished: bool) -> dict:
+        """Return the progress as event data."""
+        deleted = self.states_deleted + self.events_deleted
+        elapsed = time.monotonic() - self.started
+        return {
+            "finished": finished,
+            "states_deleted": self.states_deleted,
+            "events_deleted": self.events_deleted,
+            "states_remaining": max(self.states_remaining, 0),
+            "events_remaining": max(self.events_remaining, 0),
+            "rows_per_second": round(deleted / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+def purge_old_data(instance, purge_days: int) -> bool:
     """Purge events and states older than purge_days ago.
 
-    Cleans up an timeframe of an hour, based on the oldest record.
+    Deletes at most MAX_ROWS_TO_PURGE rows per call. States are deleted before
+    the events they reference. Returns False while there is more to purge, so
+    the recorder can write queued events before the next batch.
     """
     purge_before = dt_util.utcnow() - timedelta(days=purge_days)
     _LOGGER.debug("Purging states and events before target %s", purge_before)
 
     try:
         with session_scope(session=instance.get_session()) as session:
-            # Purge a max of 1 hour, based on the oldest states or events record
-            batch_purge_before = purge_before
+            progress = instance.purge_progress
+            if progress is None:
+                progress = instance.purge_progress = _start_purge(session, purge_before)
 
-            query = session.query(States).order_by(States.last_updated.asc()).limit(1)
-            states = execute(query, to_native=True, validate_entity_ids=False)
-            if states:
-                batch_purge_before = min(
-                    batch_purge_before, states[0].last_updated + timedelta(hours=1),
-                )
+            # Cached attribute ids may be purged with the states using them
+            instance.state_attributes_ids.clear()
 
-            query = session.query(Events).order_by(Events.time_fired.asc()).limit(1)
-            events = execute(query, to_native=True)
-            if events:
-                batch_purge_before = min(
-                    batch_purge_before, events[0].time_fired + timedelta(hours=1),
-                )
-
-            _LOGGER.debug("Purging states and events before %s", batch_purge_before)
-
-            deleted_rows = (
-                session.query(States)
-                .filter(States.last_updated < batch_purge_before)
-                .delete(synchronize_session=False)
-            )
-            _LOGGER.debug("Deleted %s states", deleted_rows)
-
-            deleted_rows = (
-                session.query(Events)
-                .filter(Events.time_fired < batch_purge_before)
-                .delete(synchronize_session=False)
-            )
-            _LOGGER.debug("Deleted %s events", deleted_rows)
-
-            # If states or events purging isn't processing the purge_before yet,
-            # return false, as we are not done yet.
-            if batch_purge_before != purge_before:
+            if _purge_states(session, purge_before, progress) or _purge_events(
+                session, purge_before, progress
+            ):
                 _LOGGER.debug("Purging hasn't fully completed yet")
+                _report_progress(instance, progress, False)
                 return False
 
             # Recorder runs is small, no need to batch run it
@@ -70,15 +74,7 @@ def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
             )
             _LOGGER.debug("Deleted %s recorder_runs", deleted_rows)
 
-        if repack:
-            # Execute sqlite or postgresql vacuum command to free up space on disk
-            if instance.engine.driver in ("pysqlite", "postgresql"):
-                _LOGGER.debug("Vacuuming SQL DB to free space")
-                instance.engine.execute("VACUUM")
-            # Optimize mysql / mariadb tables to free up space on disk
-            elif instance.engine.driver in ("mysqldb", "pymysql"):
-                _LOGGER.debug("Optimizing SQL DB to free space")
-                instance.engine.execute("OPTIMIZE TABLE states, events, recorder_runs")
+        _report_progress(instance, progress, True)
 
     except OperationalError as err:
         # Retry when one of the following MySQL errors occurred:
@@ -97,4 +93,140 @@ def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
         _LOGGER.warning("Error purging history: %s", err)
     except SQLAlchemyError as err:
         _LOGGER.warning("Error purging history: %s", err)
+
+    instance.purge_progress = None
     return True
+
+
+def repack_database(instance) -> None:
+    """Free up the space of the purged rows on disk.
+
+    This blocks the database while it runs, it is a separate step after the purge.
+    """
+    try:
+        # Execute sqlite or postgresql vacuum command to free up space on disk
+        if instance.engine.driver in ("pysqlite", "postgresql"):
+            _LOGGER.debug("Vacuuming SQL DB to free space")
+            instance.engine.execute("VACUUM")
+        # Optimize mysql / mariadb tables to free up space on disk
+        elif instance.engine.driver in ("mysqldb", "pymysql"):
+            _LOGGER.debug("Optimizing SQL DB to free space")
+            instance.engine.execute(
+                "OPTIMIZE TABLE states, state_attributes, events, recorder_runs"
+            )
+    except SQLAlchemyError as err:
+        _LOGGER.warning("Error repacking database: %s", err)
+
+
+def _start_purge(session, purge_before) -> PurgeProgress:
+    """Count the rows a new purge will delete."""
+    old_event_ids = session.query(Events.event_id).filter(
+        Events.time_fired < purge_before
+    )
+    # States of purged events are deleted with them
+    states = (
+        session.query(func.count(States.state_id))
+        .filter(
+            or_(
+                States.last_updated < purge_before,
+                States.event_id.in_(old_event_ids.subquery()),
+            )
+        )
+        .scalar()
+    )
+    events = (
+        session.query(func.count(Events.event_id))
+        .filter(Events.time_fired < purge_before)
+        .scalar()
+    )
+    _LOGGER.debug("Starting purge of %s states and %s events", states, events)
+    return PurgeProgress(states_remaining=states, events_remaining=events)
+
+
+def _purge_states(session, purge_before, progress: PurgeProgress) -> bool:
+    """Delete a batch of states, return if any were deleted."""
+    states = (
+        session.query(States.state_id, States.attributes_id)
+        .filter(States.last_updated < purge_before)
+        .limit(MAX_ROWS_TO_PURGE)
+        .all()
+    )
+    if not states:
+        return False
+
+    deleted_rows = (
+        session.query(States)
+        .filter(States.state_id.in_([state.state_id for state in states]))
+        .delete(synchronize_session=False)
+    )
+    progress.states_deleted += deleted_rows
+    progress.states_remaining -= deleted_rows
+    _LOGGER.debug("Deleted %s states", deleted_rows)
+    _purge_unused_attributes(session, {state.attributes_id for state in states})
+    return True
+
+
+def _purge_unused_attributes(session, attributes_ids) -> None:
+    """Delete the shared attributes no remaining state references."""
+    attributes_ids.discard(None)
+    if not attributes_ids:
+        return
+
+    used_ids = {
+        attributes_id
+        for attributes_id, in session.query(distinct(States.attributes_id)).filter(
+            States.attributes_id.in_(attributes_ids)
+        )
+    }
+    unused_ids = attributes_ids - used_ids
+    if not unused_ids:
+        return
+
+    deleted_rows = (
+        session.query(StateAttributes)
+        .filter(StateAttributes.attributes_id.in_(unused_ids))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s state attributes", deleted_rows)
+
+
+def _purge_events(session, purge_before, progress: PurgeProgress) -> bool:
+    """Delete a batch of events, return if any were deleted."""
+    event_ids = [
+        event_id
+        for event_id, in session.query(Events.event_id)
+        .filter(Events.time_fired < purge_before)
+        .limit(MAX_ROWS_TO_PURGE)
+    ]
+    if not event_ids:
+        return False
+
+    # States reference their event, they must be gone before the event is deleted
+    attributes_ids = {
+        attributes_id
+        for attributes_id, in session.query(States.attributes_id).filter(
+            States.event_id.in_(event_ids)
+        )
+    }
+    deleted_states = (
+        session.query(States)
+        .filter(States.event_id.in_(event_ids))
+        .delete(synchronize_session=False)
+    )
+    progress.states_deleted += deleted_states
+    progress.states_remaining -= deleted_states
+    _purge_unused_attributes(session, attributes_ids)
+    deleted_rows = (
+        session.query(Events)
+        .filter(Events.event_id.in_(event_ids))
+        .delete(synchronize_session=False)
+    )
+    progress.events_deleted += deleted_rows
+    progress.events_remaining -= deleted_rows
+    _LOGGER.debug("Deleted %s events", deleted_rows)
+    return True
+
+
+def _report_progress(instance, progress: PurgeProgress, finished: bool) -> None:
+    """Fire an event with the progress of the purge."""
+    instance.hass.bus.fire(EVENT_RECORDER_PURGE_PROGRESS, progress.as_dict(finished))
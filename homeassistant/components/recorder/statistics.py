@@ -0,0 +1,209 @@
+"""Long term statistics rolled up from numeric states."""
+from collections import defaultdict
+from datetime import datetime, timedelta
+import logging
+import math
+from typing import Dict, List, Optional
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant
+import homeassistant.util.dt as dt_util
+
+from .models import Statistics, StatisticsShortTerm, process_timestamp
+from .util import execute, session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+PERIOD_5MINUTE = "5minute"
+PERIOD_HOUR = "hour"
+
+STATISTICS_TABLES = {PERIOD_5MINUTE: StatisticsShortTerm, PERIOD_HOUR: Statistics}
+
+
+def _period_start(time: datetime, period: timedelta) -> datetime:
+    """Return the start of the period time falls in."""
+    time = process_timestamp(time)
+    seconds = int(period.total_seconds())
+    timestamp = int(time.timestamp())
+    return dt_util.utc_from_timestamp(timestamp - timestamp % seconds)
+
+
+class _Rollup:
+    """Accumulate samples for the open period of one statistics table."""
+
+    def __init__(self, table, period: timedelta):
+        """Initialize the rollup."""
+        self.table = table
+        self.period = period
+        self.start: Optional[datetime] = None
+        # entity_id -> [min, max, sum, count]
+        self.values: Dict[str, List[float]] = {}
+
+    def add(self, session, entity_id: str, value: float, time: datetime) -> None:
+        """Add a sample to the open period or the compiled period it belongs to."""
+        if self.start is not None and time < self.start:
+            self._add_late(session, entity_id, value, time)
+            return
+
+        values = self.values.get(entity_id)
+        if values is None:
+            self.values[entity_id] = [value, value, value, 1]
+            return
+        if value < values[0]:
+            values[0] = value
+        elif value > values[1]:
+            values[1] = value
+        values[2] += value
+        values[3] += 1
+
+    def _add_late(self, session, entity_id: str, value: float, time: datetime) -> None:
+        """Fold a sample recorded after its period was compiled into that period."""
+        start = _period_start(time, self.period)
+        row = (
+            session.query(self.table)
+            .filter(self.table.entity_id == entity_id)
+            .filter(self.table.start == start)
+            .first()
+        )
+        if row is None:
+            session.add(self._row(entity_id, start, [value, value, value, 1]))
+            return
+
+        row.min = min(row.min, value)
+        row.max = max(row.max, value)
+        row.sum += value
+        row.count += 1
+        row.mean = row.sum / row.count
+        _LOGGER.debug("Recompiled %s statistics of %s", entity_id, start)
+
+    def _row(self, entity_id: str, start: datetime, values: List[float]):
+        """Return a statistics row of the values of a period."""
+        min_, max_, sum_, count = values
+        return self.table(
+            entity_id=entity_id,
+            start=start,
+            mean=sum_ / count,
+            min=min_,
+            max=max_,
+            sum=sum_,
+            count=count,
+        )
+
+    def compile(self, session, now: datetime, last_values: Dict[str, float]) -> None:
+        """Write the statistics of the periods that closed before now."""
+        if self.start is not None and now < self.start + self.period:
+            return
+
+        # The last known value of each entity is in effect when a period starts
+        carried = {
+            entity_id: [value, value, value, 1]
+            for entity_id, value in last_values.items()
+        }
+
+        if self.start is not None:
+            for entity_id, values in self.values.items():
+                session.add(self._row(entity_id, self.start, values))
+            _LOGGER.debug("Compiled %s statistics for %s", len(self.values), self.start)
+
+            # Periods without state changes only have the carried values
+            start = self.start + self.period
+            while start + self.period <= now:
+                for entity_id, values in carried.items():
+                    session.add(self._row(entity_id, start, values))
+                start += self.period
+
+        self.start = _period_start(now, self.period)
+        self.values = {entity_id: list(values) for entity_id, values in carried.items()}
+
+
+class StatisticsCompiler:
+    """Roll up numeric states to 5 minute and hourly statistics.
+
+    Runs in the recorder thread, rows are added to the recorder
+    session when a period closes. A state recorded after its period
+    was compiled is folded into the row of that period.
+    """
+
+    def __init__(self):
+        """Initialize the compiler."""
+        self._last_values: Dict[str, float] = {}
+        self._last_updated: Dict[str, datetime] = {}
+        self._rollups = [
+            _Rollup(StatisticsShortTerm, timedelta(minutes=5)),
+            _Rollup(Statistics, timedelta(hours=1)),
+        ]
+
+    def compile(self, session, now: datetime) -> None:
+        """Write the statistics of all periods that closed before now."""
+        for rollup in self._rollups:
+            rollup.compile(session, now, self._last_values)
+
+    def add_event(self, session, event: Event) -> None:
+        """Add the new state of a state_changed event."""
+        assert event.event_type == EVENT_STATE_CHANGED
+        entity_id = event.data["entity_id"]
+        new_state = event.data.get("new_state")
+
+        try:
+            value = float(new_state.state)
+        except (AttributeError, TypeError, ValueError):
+            # Removed or not a number, stop carrying the value forward
+            self._forget(entity_id)
+            return
+
+        if not math.isfinite(value):
+            self._forget(entity_id)
+            return
+
+        last_updated = new_state.last_updated
+        self.compile(session, last_updated)
+        # A late state does not replace the value of a newer one
+        previous = self._last_updated.get(entity_id)
+        if previous is None or last_updated >= previous:
+            self._last_values[entity_id] = value
+            self._last_updated[entity_id] = last_updated
+        for rollup in self._rollups:
+            rollup.add(session, entity_id, value, last_updated)
+
+    def _forget(self, entity_id: str) -> None:
+        """Stop carrying the value of an entity forward."""
+        self._last_values.pop(entity_id, None)
+        self._last_updated.pop(entity_id, None)
+
+
+def statistics_during_period(
+    hass: HomeAssistant,
+    start_time: datetime,
+    end_time: Optional[datetime] = None,
+    entity_ids: Optional[List[str]] = None,
+    period: str = PERIOD_HOUR,
+) -> Dict[str, List[dict]]:
+    """Return statistics of periods starting between start_time and end_time."""
+    table = STATISTICS_TABLES[period]
+
+    with session_scope(hass=hass) as session:
+        query = session.query(
+            table.entity_id, table.start, table.mean, table.min, table.max, table.sum
+        ).filter(table.start >= start_time)
+
+        if end_time is not None:
+            query = query.filter(table.start < end_time)
+
+        if entity_ids is not None:
+            query = query.filter(table.entity_id.in_(entity_ids))
+
+        stats = execute(query.order_by(table.entity_id, table.start))
+
+    result = defaultdict(list)
+    for row in stats:
+        result[row.entity_id].append(
+            {
+                "start": process_timestamp(row.start),
+                "mean": row.mean,
+                "min": row.min,
+                "max": row.max,
+                "sum": row.sum,
+            }
+        )
+
+    return dict(result)
@@ -1,12 +1,10 @@
 """Websocket constants."""
 import asyncio
 from concurrent import futures
-from functools import partial
-import json
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Any, Callable
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import json_bytes
 
 if TYPE_CHECKING:
     from .connection import ActiveConnection  # noqa
@@ -43,4 +41,7 @@ SIGNAL_WEBSOCKET_DISCONNECTED = "websocket_disconnected"
 # Data used to store the current connection list
 DATA_CONNECTIONS = f"{DOMAIN}.connections"
 
-JSON_DUMP = partial(json.dumps, cls=JSONEncoder, allow_nan=False)
+
+def JSON_DUMP(obj: Any) -> str:  # pylint: disable=invalid-name
+    """Dump an object to JSON, reusing the cached JSON of states."""
+    return json_bytes(obj).decode("UTF-8")
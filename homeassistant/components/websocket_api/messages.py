@@ -1,7 +1,11 @@
 """Message templates for websocket commands."""
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, Union
+import weakref
 
 import voluptuous as vol
 
+from homeassistant.core import Event
 from homeassistant.helpers import config_validation as cv
 
 from . import const
@@ -17,6 +21,13 @@ MINIMAL_MESSAGE_SCHEMA = vol.Schema(
 # Base schema to extend by message handlers
 BASE_COMMAND_MESSAGE_SCHEMA = vol.Schema({vol.Required("id"): cv.positive_int})
 
+# Number of serialized events kept for connections subscribed to the same events
+EVENT_MESSAGE_CACHE_SIZE = 128
+
+# Serialized event messages keyed by id() of the event. A weak reference to the
+# event is kept alongside, an id reused by a new event does not match it.
+_EVENT_MESSAGE_CACHE: "OrderedDict[int, Tuple[weakref.ref, str]]" = OrderedDict()
+
 
 def result_message(iden, result=None):
     """Return a success result message."""
@@ -36,3 +47,26 @@ def error_message(iden, code, message):
 def event_message(iden, event):
     """Return an event message."""
     return {"id": iden, "type": "event", "event": event}
+
+
+def cached_event_message(iden: int, event: Event) -> Union[str, Dict[str, Any]]:
+    """Return an event message serialized to JSON.
+
+    The event is serialized once and shared by all connections subscribed to
+    it, only the message id is spliced in per connection. If the event can not
+    be serialized, the message is returned as a dict so the writer can report
+    the error.
+    """
+    cached = _EVENT_MESSAGE_CACHE.get(id(event))
+
+    if cached is None or cached[0]() is not event:
+        try:
+            payload = const.JSON_DUMP({"type": "event", "event": event})
+        except (ValueError, TypeError):
+            return event_message(iden, event)
+
+        cached = _EVENT_MESSAGE_CACHE[id(event)] = (weakref.ref(event), payload)
+        if len(_EVENT_MESSAGE_CACHE) > EVENT_MESSAGE_CACHE_SIZE:
+            _EVENT_MESSAGE_CACHE.popitem(last=False)
+
+    return f'{{"id": {iden}, {cached[1][1:]}'
@@ -5,17 +5,20 @@ Home Assistant is a Home Automation framework for observing the state
 of entities and react to changes.
 """
 import asyncio
+from collections import OrderedDict
 import datetime
 import enum
 import functools
 from ipaddress import ip_address
+import json
 import logging
 import os
 import pathlib
 import random
 import re
+import sys
 import threading
-from time import monotonic
+from time import monotonic, time_ns
 from types import MappingProxyType
 from typing import (
     TYPE_CHECKING,
@@ -29,6 +32,7 @@ from typing import (
     Mapping,
     Optional,
     Set,
+    Tuple,
     TypeVar,
     Union,
     cast,
@@ -39,7 +43,7 @@ import attr
 import voluptuous as vol
 import yarl
 
-from homeassistant import block_async_io, loader, util
+from homeassistant import block_async_io, const as ha_const, loader, util
 from homeassistant.const import (
     ATTR_DOMAIN,
     ATTR_FRIENDLY_NAME,
@@ -103,6 +107,14 @@ DOMAIN = "homeassistant"
 # How long to wait to log tasks that are blocking
 BLOCK_LOG_TIMEOUT = 60
 
+# How many removed entities the state machine remembers for changes since
+STATE_REMOVED_HISTORY = 10000
+
+# State values shared by many entities, only these are interned
+COMMON_STATES = frozenset(
+    value for name, value in vars(ha_const).items() if name.startswith("STATE_")
+)
+
 # How long we wait for the result of a service call
 SERVICE_CALL_LIMIT = 10  # seconds
 
@@ -138,6 +150,22 @@ def valid_state(state: str) -> bool:
     return len(state) < 256
 
 
+def _same_values(first: Any, second: Any) -> bool:
+    """Test if two attribute values are equal and of the same types.
+
+    Plain equality treats 1, 1.0 and True as the same value.
+    """
+    if type(first) is not type(second):  # pylint: disable=unidiomatic-typecheck
+        return False
+    if isinstance(first, dict):
+        return first.keys() == second.keys() and all(
+            _same_values(value, second[key]) for key, value in first.items()
+        )
+    if isinstance(first, (list, tuple)):
+        return len(first) == len(second) and all(map(_same_values, first, second))
+    return bool(first == second)
+
+
 def callback(func: CALLABLE_T) -> CALLABLE_T:
     """Annotation to mark method as safe to call from within the event loop."""
     setattr(func, "_hass_callback", True)
@@ -149,6 +177,50 @@ def is_callback(func: Callable[..., Any]) -> bool:
     return getattr(func, "_hass_callback", False) is True
 
 
+class HassJobType(enum.Enum):
+    """Represent a job type."""
+
+    Coroutinefunction = 1
+    Callback = 2
+    Executor = 3
+
+
+class HassJob:
+    """Represent a job to be run later.
+
+    The type of the target is resolved once so it does not
+    have to be checked every time the job runs.
+    """
+
+    __slots__ = ("job_type", "target")
+
+    def __init__(self, target: Callable) -> None:
+        """Create a job object."""
+        if asyncio.iscoroutine(target):
+            raise ValueError("Coroutine not allowed to be passed to HassJob")
+
+        self.target = target
+        self.job_type = _get_callable_job_type(target)
+
+    def __repr__(self) -> str:
+        """Return the job."""
+        return f"<Job {self.job_type} {self.target}>"
+
+
+def _get_callable_job_type(target: Callable) -> HassJobType:
+    """Determine the job type from the callable."""
+    # Check for partials to properly determine if coroutine function
+    check_target = target
+    while isinstance(check_target, functools.partial):
+        check_target = check_target.func
+
+    if asyncio.iscoroutinefunction(check_target):
+        return HassJobType.Coroutinefunction
+    if is_callback(check_target):
+        return HassJobType.Callback
+    return HassJobType.Executor
+
+
 class CoreState(enum.Enum):
     """Represent the current state of Home Assistant."""
 
@@ -327,6 +399,34 @@ class HomeAssistant:
 
         return task
 
+    @callback
+    def async_add_hass_job(
+        self, hassjob: HassJob, *args: Any
+    ) -> Optional[asyncio.Future]:
+        """Add a HassJob from within the event loop.
+
+        This method must be run in the event loop.
+
+        hassjob: HassJob to call.
+        args: parameters for method to call.
+        """
+        if hassjob.job_type == HassJobType.Callback:
+            self.loop.call_soon(hassjob.target, *args)
+            return None
+
+        if hassjob.job_type == HassJobType.Coroutinefunction:
+            task = self.loop.create_task(hassjob.target(*args))
+        else:
+            task = self.loop.run_in_executor(  # type: ignore
+                None, hassjob.target, *args
+            )
+
+        # If a task is scheduled
+        if self._track_task:
+            self._pending_tasks.append(task)
+
+        return task
+
     @callback
     def async_create_task(self, target: Coroutine) -> asyncio.tasks.Task:
         """Create a task from within the eventloop.
@@ -504,19 +604,76 @@ class HomeAssistant:
             self.loop.stop()
 
 
-@attr.s(slots=True, frozen=True)
+# Default of the context id, the id is generated when first used
+_CONTEXT_ID_LAZY: Any = object()
+
+
 class Context:
-    """The context that triggered something."""
-
-    user_id: str = attr.ib(default=None)
-    parent_id: Optional[str] = attr.ib(default=None)
-    # The uuid1 uses a random multicast MAC address instead of the real MAC address
-    # of the machine without the overhead of calling the getrandom() system call.
-    #
-    # This is effectively equivalent to PostgreSQL's uuid_generate_v1mc() function
-    id: str = attr.ib(
-        factory=lambda: uuid.uuid1(node=random.getrandbits(48) | (1 << 40)).hex
-    )
+    """The context that triggered something.
+
+    Contexts are immutable, attributes can't be set after initialization.
+    """
+
+    __slots__ = ["user_id", "parent_id", "_id"]
+
+    def __init__(
+        self,
+        user_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        id: Optional[str] = _CONTEXT_ID_LAZY,  # pylint: disable=redefined-builtin
+    ) -> None:
+        """Initialize a context."""
+        object.__setattr__(self, "user_id", user_id)
+        object.__setattr__(self, "parent_id", parent_id)
+        if id is not _CONTEXT_ID_LAZY:
+            object.__setattr__(self, "_id", id)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Prevent changing the context."""
+        raise attr.exceptions.FrozenInstanceError()
+
+    def __delattr__(self, name: str) -> None:
+        """Prevent changing the context."""
+        raise attr.exceptions.FrozenInstanceError()
+
+    @property
+    def id(self) -> str:
+        """Return the id of the context."""
+        try:
+            return self._id  # type: ignore
+        except AttributeError:
+            # The uuid1 uses a random multicast MAC address instead of the real
+            # MAC address of the machine without the overhead of calling the
+            # getrandom() system call.
+            #
+            # This is effectively equivalent to PostgreSQL's
+            # uuid_generate_v1mc() function
+            context_id = uuid.uuid1(node=random.getrandbits(48) | (1 << 40)).hex
+            object.__setattr__(self, "_id", context_id)
+            return context_id
+
+    def __eq__(self, other: Any) -> bool:
+        """Return the comparison of the context."""
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented  # type: ignore
+        return (
+            self.id == other.id
+            and self.user_id == other.user_id
+            and self.parent_id == other.parent_id
+        )
+
+    def __hash__(self) -> int:
+        """Return the hash of the context."""
+        return hash((self.user_id, self.parent_id, self.id))
+
+    def __repr__(self) -> str:
+        """Return the representation of the context."""
+        return (
+            f"Context(user_id={self.user_id!r}, parent_id={self.parent_id!r}, "
+            f"id={self.id!r})"
+        )
 
     def as_dict(self) -> dict:
         """Return a dictionary representation of the context."""
@@ -537,7 +694,7 @@ class EventOrigin(enum.Enum):
 class Event:
     """Representation of an event within the bus."""
 
-    __slots__ = ["event_type", "data", "origin", "time_fired", "context"]
+    __slots__ = ["event_type", "data", "origin", "time_fired", "context", "__weakref__"]
 
     def __init__(
         self,
@@ -592,7 +749,10 @@ class EventBus:
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
-        self._listeners: Dict[str, List[Callable]] = {}
+        self._listeners: Dict[str, List[HassJob]] = {}
+        # Jobs to run for each fired event type, None is the key for
+        # event types without listeners of their own
+        self._dispatch: Dict[Optional[str], Tuple[HassJob, ...]] = {}
         self._hass = hass
 
     @callback
@@ -630,6 +790,31 @@ class EventBus:
     ) -> None:
         """Fire an event.
 
+        This method must be run in the event loop.
+        """
+        jobs = self._dispatch.get(self._dispatch_key(event_type))
+        if jobs is None:
+            jobs = self._async_dispatch_plan(event_type)
+
+        event = Event(event_type, event_data, origin, None, context)
+
+        if event_type != EVENT_TIME_CHANGED:
+            _LOGGER.debug("Bus:Handling %s", event)
+
+        if not jobs:
+            return
+
+        call_soon = self._hass.loop.call_soon
+        for job in jobs:
+            if job.job_type == HassJobType.Callback:
+                call_soon(job.target, event)
+            else:
+                self._hass.async_add_hass_job(job, event)
+
+    @callback
+    def _async_dispatch_plan(self, event_type: str) -> Tuple[HassJob, ...]:
+        """Build and cache the jobs to run when an event type is fired.
+
         This method must be run in the event loop.
         """
         listeners = self._listeners.get(event_type, [])
@@ -639,16 +824,27 @@ class EventBus:
         if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
             listeners = match_all_listeners + listeners
 
-        event = Event(event_type, event_data, origin, None, context)
+        jobs = tuple(listeners)
+        self._dispatch[self._dispatch_key(event_type)] = jobs
+        return jobs
 
-        if event_type != EVENT_TIME_CHANGED:
-            _LOGGER.debug("Bus:Handling %s", event)
+    def _dispatch_key(self, event_type: str) -> Optional[str]:
+        """Return the key the jobs of an event type are cached under."""
+        # Close always gets its own key, the jobs cached under None would
+        # send it to the MATCH_ALL listeners
+        if event_type in self._listeners or event_type == EVENT_HOMEASSISTANT_CLOSE:
+            return event_type
+        return None
 
-        if not listeners:
-            return
-
-        for func in listeners:
-            self._hass.async_add_job(func, event)
+    @callback
+    def _async_invalidate_dispatch(self, event_type: str) -> None:
+        """Drop cached jobs after the listeners of an event type changed."""
+        if event_type == MATCH_ALL:
+            self._dispatch.clear()
+        else:
+            self._dispatch.pop(event_type, None)
+            # The jobs of event types without listeners are cached under None
+            self._dispatch.pop(None, None)
 
     def listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
@@ -675,14 +871,20 @@ class EventBus:
 
         This method must be run in the event loop.
         """
+        return self._async_listen_job(event_type, HassJob(listener))
+
+    @callback
+    def _async_listen_job(self, event_type: str, hassjob: HassJob) -> CALLBACK_TYPE:
+        """Listen for events of a specific type with a job."""
         if event_type in self._listeners:
-            self._listeners[event_type].append(listener)
+            self._listeners[event_type].append(hassjob)
         else:
-            self._listeners[event_type] = [listener]
+            self._listeners[event_type] = [hassjob]
+        self._async_invalidate_dispatch(event_type)
 
         def remove_listener() -> None:
             """Remove the listener."""
-            self._async_remove_listener(event_type, listener)
+            self._async_remove_listener(event_type, hassjob)
 
         return remove_listener
 
@@ -715,6 +917,7 @@ class EventBus:
 
         This method must be run in the event loop.
         """
+        job: Optional[HassJob] = None
 
         @callback
         def onetime_listener(event: Event) -> None:
@@ -727,19 +930,21 @@ class EventBus:
             # multiple times as well.
             # This will make sure the second time it does nothing.
             setattr(onetime_listener, "run", True)
-            self._async_remove_listener(event_type, onetime_listener)
+            self._async_remove_listener(event_type, cast(HassJob, job))
             self._hass.async_run_job(listener, event)
 
-        return self.async_listen(event_type, onetime_listener)
+        job = HassJob(onetime_listener)
+        return self._async_listen_job(event_type, job)
 
     @callback
-    def _async_remove_listener(self, event_type: str, listener: Callable) -> None:
+    def _async_remove_listener(self, event_type: str, hassjob: HassJob) -> None:
         """Remove a listener of a specific event_type.
 
         This method must be run in the event loop.
         """
         try:
-            self._listeners[event_type].remove(listener)
+            self._listeners[event_type].remove(hassjob)
+            self._async_invalidate_dispatch(event_type)
 
             # delete event_type list if empty
             if not self._listeners[event_type]:
@@ -747,7 +952,7 @@ class EventBus:
         except (KeyError, ValueError):
             # KeyError is key event_type listener did not exist
             # ValueError if listener did not exist within event_type
-            _LOGGER.warning("Unable to remove unknown listener %s", listener)
+            _LOGGER.warning("Unable to remove unknown job listener %s", hassjob)
 
 
 class State:
@@ -770,6 +975,8 @@ class State:
         "last_updated",
         "context",
         "domain",
+        "_as_dict",
+        "_as_json",
     ]
 
     def __init__(
@@ -797,13 +1004,19 @@ class State:
                 "State max length is 255 characters."
             )
 
-        self.entity_id = entity_id.lower()
-        self.state = state
-        self.attributes = MappingProxyType(attributes or {})
+        # Interned, many states of the same entity share the strings
+        self.entity_id = sys.intern(entity_id.lower())
+        self.state = sys.intern(state) if state in COMMON_STATES else state
+        if isinstance(attributes, MappingProxyType):
+            self.attributes = attributes
+        else:
+            self.attributes = MappingProxyType(attributes or {})
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
         self.context = context or Context()
-        self.domain = split_entity_id(self.entity_id)[0]
+        self.domain = sys.intern(split_entity_id(self.entity_id)[0])
+        self._as_dict: Optional[Dict] = None
+        self._as_json: Optional[bytes] = None
 
     @property
     def object_id(self) -> str:
@@ -824,15 +1037,41 @@ class State:
 
         To be used for JSON serialization.
         Ensures: state == State.from_dict(state.as_dict())
+
+        The dict is created once per state and must not be modified.
         """
-        return {
-            "entity_id": self.entity_id,
-            "state": self.state,
-            "attributes": dict(self.attributes),
-            "last_changed": self.last_changed,
-            "last_updated": self.last_updated,
-            "context": self.context.as_dict(),
-        }
+        if self._as_dict is None:
+            self._as_dict = {
+                "entity_id": self.entity_id,
+                "state": self.state,
+                "attributes": dict(self.attributes),
+                "last_changed": self.last_changed,
+                "last_updated": self.last_updated,
+                "context": self.context.as_dict(),
+            }
+        return self._as_dict
+
+    def as_json(self) -> bytes:
+        """Return the State serialized to compact JSON with sorted keys.
+
+        The keys are sorted so json_bytes can splice it into sorted documents.
+
+        Async friendly.
+
+        Raises ValueError or TypeError if the attributes can't be serialized.
+        """
+        if self._as_json is None:
+            # pylint: disable=import-outside-toplevel
+            from homeassistant.helpers.json import JSONEncoder
+
+            self._as_json = json.dumps(
+                self.as_dict(),
+                cls=JSONEncoder,
+                allow_nan=False,
+                separators=(",", ":"),
+                sort_keys=True,
+            ).encode("UTF-8")
+        return self._as_json
 
     @classmethod
     def from_dict(cls, json_dict: Dict) -> Any:
@@ -896,6 +1135,47 @@ class StateMachine:
         self._states: Dict[str, State] = {}
         self._bus = bus
         self._loop = loop
+        # Revisions continue from the current time in microseconds, so they
+        # keep increasing over restarts.
+        self._revision = time_ns() // 1000
+        self._removed_since = self._revision
+        # Entity id -> revision of the last change, oldest change first
+        self._revisions: "OrderedDict[str, int]" = OrderedDict()
+        self._removed: "OrderedDict[str, int]" = OrderedDict()
+
+    @property
+    def revision(self) -> int:
+        """Return the revision of the last change to the states."""
+        return self._revision
+
+    @callback
+    def async_changed_since(
+        self, revision: int
+    ) -> Optional[Tuple[List[State], List[str]]]:
+        """Return states changed and entity ids removed after revision.
+
+        Returns None if the changes since revision are not known anymore.
+
+        This method must be run in the event loop.
+        """
+        if not self._removed_since <= revision <= self._revision:
+            return None
+
+        changed = []
+        for entity_id, state_revision in reversed(self._revisions.items()):
+            if state_revision <= revision:
+                break
+            changed.append(self._states[entity_id])
+
+        removed = []
+        for entity_id, state_revision in reversed(self._removed.items()):
+            if state_revision <= revision:
+                break
+            removed.append(entity_id)
+
+        changed.reverse()
+        removed.reverse()
+        return changed, removed
 
     def entity_ids(self, domain_filter: Optional[str] = None) -> List[str]:
         """List of entity ids that are being tracked."""
@@ -971,6 +1251,12 @@ class StateMachine:
         if old_state is None:
             return False
 
+        self._revision += 1
+        del self._revisions[entity_id]
+        self._removed[entity_id] = self._revision
+        if len(self._removed) > STATE_REMOVED_HISTORY:
+            _, self._removed_since = self._removed.popitem(last=False)
+
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": None},
@@ -1038,11 +1324,24 @@ class StateMachine:
         if same_state and same_attr:
             return
 
+        if same_attr and all(
+            _same_values(value, old_state.attributes[key])  # type: ignore
+            for key, value in attributes.items()
+        ):
+            # Share the attributes with the previous state
+            attributes = old_state.attributes  # type: ignore
+
         if context is None:
             context = Context()
 
         state = State(entity_id, new_state, attributes, last_changed, None, context)
         self._states[entity_id] = state
+        self._revision += 1
+        self._revisions[entity_id] = self._revision
+        if old_state is None:
+            self._removed.pop(entity_id, None)
+        else:
+            self._revisions.move_to_end(entity_id)
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": state},
@@ -1593,9 +1892,15 @@ class Config:
 
 
 def _async_create_timer(hass: HomeAssistant) -> None:
-    """Create a timer that will start on HOMEASSISTANT_START."""
+    """Create a timer that will start on HOMEASSISTANT_START.
+
+    Time based helpers schedule their callbacks on the event loop directly.
+    EVENT_TIME_CHANGED is only fired while something listens for it.
+    """
     handle = None
     timer_context = Context()
+    # pylint: disable=protected-access
+    listeners = hass.bus._listeners
 
     def schedule_tick(now: datetime.datetime) -> None:
         """Schedule a timer tick when the next second rolls around."""
@@ -1610,7 +1915,10 @@ def _async_create_timer(hass: HomeAssistant) -> None:
         """Fire next time event."""
         now = dt_util.utcnow()
 
-        hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: now}, context=timer_context)
+        if EVENT_TIME_CHANGED in listeners:
+            hass.bus.async_fire(
+                EVENT_TIME_CHANGED, {ATTR_NOW: now}, context=timer_context
+            )
 
         # If we are more than a second late, a tick was missed
         late = monotonic() - target
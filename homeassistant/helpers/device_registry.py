@@ -1,7 +1,7 @@
 """Provide a way to connect entities belonging to one device."""
 from collections import OrderedDict
 import logging
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 import uuid
 
 import attr
@@ -104,11 +104,18 @@ class DeviceRegistry:
     devices: Dict[str, DeviceEntry]
     deleted_devices: Dict[str, DeletedDeviceEntry]
     _devices_index: Dict[str, Dict[str, Dict[str, str]]]
+    # Registered device ids by config entry id and area id, dicts keep the order
+    _config_entry_index: Dict[str, Dict[str, None]]
+    _area_index: Dict[str, Dict[str, None]]
 
     def __init__(self, hass: HomeAssistantType) -> None:
         """Initialize the device registry."""
         self.hass = hass
-        self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
+        self._store = hass.helpers.storage.Store(
+            STORAGE_VERSION,
+            STORAGE_KEY,
+            journal={"devices": "id", "deleted_devices": "id"},
+        )
         self._clear_index()
 
     @callback
@@ -162,6 +169,7 @@ class DeviceRegistry:
         else:
             devices_index = self._devices_index[REGISTERED_DEVICE]
             self.devices[device.id] = device
+            self._add_device_to_lookup_index(device)
 
         _add_device_to_index(devices_index, device)
 
@@ -173,6 +181,7 @@ class DeviceRegistry:
         else:
             devices_index = self._devices_index[REGISTERED_DEVICE]
             self.devices.pop(device.id)
+            self._remove_device_from_lookup_index(device)
 
         _remove_device_from_index(devices_index, device)
 
@@ -184,18 +193,51 @@ class DeviceRegistry:
         _remove_device_from_index(devices_index, old_device)
         _add_device_to_index(devices_index, new_device)
 
+        # Only touch changed keys to keep the order of the lookups
+        if old_device.config_entries != new_device.config_entries:
+            _remove_from_lookup_index(
+                self._config_entry_index,
+                old_device.config_entries - new_device.config_entries,
+                old_device.id,
+            )
+            _add_to_lookup_index(
+                self._config_entry_index,
+                new_device.config_entries - old_device.config_entries,
+                new_device.id,
+            )
+        if old_device.area_id != new_device.area_id:
+            _remove_from_lookup_index(
+                self._area_index, (old_device.area_id,), old_device.id
+            )
+            _add_to_lookup_index(self._area_index, (new_device.area_id,), new_device.id)
+
+    def _add_device_to_lookup_index(self, device: DeviceEntry) -> None:
+        """Add a registered device to the config entry and area index."""
+        _add_to_lookup_index(self._config_entry_index, device.config_entries, device.id)
+        _add_to_lookup_index(self._area_index, (device.area_id,), device.id)
+
+    def _remove_device_from_lookup_index(self, device: DeviceEntry) -> None:
+        """Remove a registered device from the config entry and area index."""
+        _remove_from_lookup_index(
+            self._config_entry_index, device.config_entries, device.id
+        )
+        _remove_from_lookup_index(self._area_index, (device.area_id,), device.id)
+
     def _clear_index(self):
         """Clear the index."""
         self._devices_index = {
             REGISTERED_DEVICE: {IDX_IDENTIFIERS: {}, IDX_CONNECTIONS: {}},
             DELETED_DEVICE: {IDX_IDENTIFIERS: {}, IDX_CONNECTIONS: {}},
         }
+        self._config_entry_index = {}
+        self._area_index = {}
 
     def _rebuild_index(self):
         """Create the index after loading devices."""
         self._clear_index()
         for device in self.devices.values():
             _add_device_to_index(self._devices_index[REGISTERED_DEVICE], device)
+            self._add_device_to_lookup_index(device)
         for device in self.deleted_devices.values():
             _add_device_to_index(self._devices_index[DELETED_DEVICE], device)
 
@@ -234,6 +276,9 @@ class DeviceRegistry:
             else:
                 self._remove_device(deleted_device)
                 device = deleted_device.to_device_entry()
+                self.async_schedule_save(
+                    ("deleted_devices", device.id), ("devices", device.id)
+                )
             self._add_device(device)
 
         if via_device is not None:
@@ -366,7 +411,7 @@ class DeviceRegistry:
 
         new = attr.evolve(old, **changes)
         self._update_device(old, new)
-        self.async_schedule_save()
+        self.async_schedule_save(("devices", device_id))
 
         self.hass.bus.async_fire(
             EVENT_DEVICE_REGISTRY_UPDATED,
@@ -394,7 +439,7 @@ class DeviceRegistry:
         self.hass.bus.async_fire(
             EVENT_DEVICE_REGISTRY_UPDATED, {"action": "remove", "device_id": device_id}
         )
-        self.async_schedule_save()
+        self.async_schedule_save(("devices", device_id), ("deleted_devices", device_id))
 
     async def async_load(self):
         """Load the device registry."""
@@ -441,49 +486,49 @@ class DeviceRegistry:
         self._rebuild_index()
 
     @callback
-    def async_schedule_save(self) -> None:
-        """Schedule saving the device registry."""
-        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+    def async_schedule_save(self, *changed: Tuple[str, str]) -> None:
+        """Schedule saving the device registry.
+
+        changed are (collection, device id) pairs, only those devices are
+        written if there are any.
+        """
+        if not changed:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+            return
+
+        self._store.async_delay_save_changes(
+            self._data_to_save, self._device_to_save, changed, SAVE_DELAY
+        )
 
     @callback
     def _data_to_save(self) -> Dict[str, List[Dict[str, Any]]]:
         """Return data of device registry to store in a file."""
         data = {}
 
-        data["devices"] = [
-            {
-                "config_entries": list(entry.config_entries),
-                "connections": list(entry.connections),
-                "identifiers": list(entry.identifiers),
-                "manufacturer": entry.manufacturer,
-                "model": entry.model,
-                "name": entry.name,
-                "sw_version": entry.sw_version,
-                "entry_type": entry.entry_type,
-                "id": entry.id,
-                "via_device_id": entry.via_device_id,
-                "area_id": entry.area_id,
-                "name_by_user": entry.name_by_user,
-            }
-            for entry in self.devices.values()
-        ]
+        data["devices"] = [_device_as_dict(entry) for entry in self.devices.values()]
         data["deleted_devices"] = [
-            {
-                "config_entries": list(entry.config_entries),
-                "connections": list(entry.connections),
-                "identifiers": list(entry.identifiers),
-                "id": entry.id,
-            }
-            for entry in self.deleted_devices.values()
+            _deleted_device_as_dict(entry) for entry in self.deleted_devices.values()
         ]
 
         return data
 
+    @callback
+    def _device_to_save(self, collection: str, device_id: str) -> Optional[Dict]:
+        """Return data of a device to store in the journal."""
+        if collection == "devices":
+            device = self.devices.get(device_id)
+            return None if device is None else _device_as_dict(device)
+
+        deleted_device = self.deleted_devices.get(device_id)
+        if deleted_device is None:
+            return None
+        return _deleted_device_as_dict(deleted_device)
+
     @callback
     def async_clear_config_entry(self, config_entry_id: str) -> None:
         """Clear config entry from registry entries."""
-        for device in list(self.devices.values()):
-            self._async_update_device(device.id, remove_config_entry_id=config_entry_id)
+        for device_id in list(self._config_entry_index.get(config_entry_id, ())):
+            self._async_update_device(device_id, remove_config_entry_id=config_entry_id)
         for deleted_device in list(self.deleted_devices.values()):
             config_entries = deleted_device.config_entries
             if config_entry_id not in config_entries:
@@ -498,14 +543,54 @@ class DeviceRegistry:
                 self.deleted_devices[deleted_device.id] = attr.evolve(
                     deleted_device, config_entries=config_entries
                 )
-            self.async_schedule_save()
+            self.async_schedule_save(("deleted_devices", deleted_device.id))
 
     @callback
     def async_clear_area_id(self, area_id: str) -> None:
         """Clear area id from registry entries."""
-        for dev_id, device in self.devices.items():
-            if area_id == device.area_id:
-                self._async_update_device(dev_id, area_id=None)
+        for dev_id in list(self._area_index.get(area_id, ())):
+            self._async_update_device(dev_id, area_id=None)
+
+    @callback
+    def async_entries_for_area(self, area_id: str) -> List[DeviceEntry]:
+        """Return entries that match an area."""
+        return [self.devices[dev_id] for dev_id in self._area_index.get(area_id, ())]
+
+    @callback
+    def async_entries_for_config_entry(self, config_entry_id: str) -> List[DeviceEntry]:
+        """Return entries that match a config entry."""
+        return [
+            self.devices[dev_id]
+            for dev_id in self._config_entry_index.get(config_entry_id, ())
+        ]
+
+
+def _device_as_dict(entry: DeviceEntry) -> Dict[str, Any]:
+    """Return the stored representation of a device."""
+    return {
+        "config_entries": list(entry.config_entries),
+        "connections": list(entry.connections),
+        "identifiers": list(entry.identifiers),
+        "manufacturer": entry.manufacturer,
+        "model": entry.model,
+        "name": entry.name,
+        "sw_version": entry.sw_version,
+        "entry_type": entry.entry_type,
+        "id": entry.id,
+        "via_device_id": entry.via_device_id,
+        "area_id": entry.area_id,
+        "name_by_user": entry.name_by_user,
+    }
+
+
+def _deleted_device_as_dict(entry: DeletedDeviceEntry) -> Dict[str, Any]:
+    """Return the stored representation of a deleted device."""
+    return {
+        "config_entries": list(entry.config_entries),
+        "connections": list(entry.connections),
+        "identifiers": list(entry.identifiers),
+        "id": entry.id,
+    }
 
 
 @singleton(DATA_REGISTRY)
@@ -519,7 +604,7 @@ async def async_get_registry(hass: HomeAssistantType) -> DeviceRegistry:
 @callback
 def async_entries_for_area(registry: DeviceRegistry, area_id: str) -> List[DeviceEntry]:
     """Return entries that match an area."""
-    return [device for device in registry.devices.values() if device.area_id == area_id]
+    return registry.async_entries_for_area(area_id)
 
 
 @callback
@@ -527,11 +612,7 @@ def async_entries_for_config_entry(
     registry: DeviceRegistry, config_entry_id: str
 ) -> List[DeviceEntry]:
     """Return entries that match a config entry."""
-    return [
-        device
-        for device in registry.devices.values()
-        if config_entry_id in device.config_entries
-    ]
+    return registry.async_entries_for_config_entry(config_entry_id)
 
 
 @callback
@@ -545,9 +626,8 @@ def async_cleanup(
     config_entry_ids = {entry.entry_id for entry in hass.config_entries.async_entries()}
     references_config_entries = {
         device.id
-        for device in dev_reg.devices.values()
-        for config_entry_id in device.config_entries
-        if config_entry_id in config_entry_ids
+        for config_entry_id in config_entry_ids
+        for device in dev_reg.async_entries_for_config_entry(config_entry_id)
     }
 
     # Find all devices that are referenced in the entity registry.
@@ -608,6 +688,28 @@ def async_setup_cleanup(hass: HomeAssistantType, dev_reg: DeviceRegistry) -> Non
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, startup_clean)
 
 
+def _add_to_lookup_index(
+    index: Dict[str, Dict[str, None]], keys: Iterable[Optional[str]], device_id: str
+) -> None:
+    """Add a device id to the device ids of keys in a lookup index."""
+    for key in keys:
+        if key is not None:
+            index.setdefault(key, {})[device_id] = None
+
+
+def _remove_from_lookup_index(
+    index: Dict[str, Dict[str, None]], keys: Iterable[Optional[str]], device_id: str
+) -> None:
+    """Remove a device id from the device ids of keys in a lookup index."""
+    for key in keys:
+        if key is None:
+            continue
+        device_ids = index[key]
+        del device_ids[device_id]
+        if not device_ids:
+            del index[key]
+
+
 def _normalize_connections(connections: set) -> set:
     """Normalize connections to ensure we can match mac addresses."""
     return {
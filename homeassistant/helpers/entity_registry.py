@@ -125,7 +125,12 @@ class EntityRegistry:
         self.hass = hass
         self.entities: Dict[str, RegistryEntry]
         self._index: Dict[Tuple[str, str, str], str] = {}
-        self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
+        # Entity ids by device id and config entry id, dicts keep the order
+        self._device_index: Dict[str, Dict[str, None]] = {}
+        self._config_entry_index: Dict[str, Dict[str, None]] = {}
+        self._store = hass.helpers.storage.Store(
+            STORAGE_VERSION, STORAGE_KEY, journal={"entities": "entity_id"}
+        )
         self.hass.bus.async_listen(
             EVENT_DEVICE_REGISTRY_UPDATED, self.async_device_removed
         )
@@ -266,7 +271,7 @@ class EntityRegistry:
         )
         self._register_entry(entity)
         _LOGGER.info("Registered new %s.%s entity: %s", domain, platform, entity_id)
-        self.async_schedule_save()
+        self.async_schedule_save(entity_id)
 
         self.hass.bus.async_fire(
             EVENT_ENTITY_REGISTRY_UPDATED, {"action": "create", "entity_id": entity_id}
@@ -281,7 +286,7 @@ class EntityRegistry:
         self.hass.bus.async_fire(
             EVENT_ENTITY_REGISTRY_UPDATED, {"action": "remove", "entity_id": entity_id}
         )
-        self.async_schedule_save()
+        self.async_schedule_save(entity_id)
 
     @callback
     def async_device_removed(self, event: Event) -> None:
@@ -387,11 +392,11 @@ class EntityRegistry:
         if not changes:
             return old
 
-        self._remove_index(old)
         new = attr.evolve(old, **changes)
-        self._register_entry(new)
+        self.entities[entity_id] = new
+        self._update_index(old, new)
 
-        self.async_schedule_save()
+        self.async_schedule_save(old.entity_id, entity_id)
 
         data = {"action": "update", "entity_id": entity_id, "changes": list(changes)}
 
@@ -443,53 +448,71 @@ class EntityRegistry:
         self._rebuild_index()
 
     @callback
-    def async_schedule_save(self) -> None:
-        """Schedule saving the entity registry."""
-        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+    def async_schedule_save(self, *entity_ids: str) -> None:
+        """Schedule saving the entity registry.
+
+        Only the passed entities are written if there are any.
+        """
+        if not entity_ids:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+            return
+
+        self._store.async_delay_save_changes(
+            self._data_to_save,
+            self._entry_to_save,
+            [("entities", entity_id) for entity_id in entity_ids],
+            SAVE_DELAY,
+        )
 
     @callback
     def _data_to_save(self) -> Dict[str, Any]:
         """Return data of entity registry to store in a file."""
         data = {}
 
-        data["entities"] = [
-            {
-                "entity_id": entry.entity_id,
-                "config_entry_id": entry.config_entry_id,
-                "device_id": entry.device_id,
-                "unique_id": entry.unique_id,
-                "platform": entry.platform,
-                "name": entry.name,
-                "icon": entry.icon,
-                "disabled_by": entry.disabled_by,
-                "capabilities": entry.capabilities,
-                "supported_features": entry.supported_features,
-                "device_class": entry.device_class,
-                "unit_of_measurement": entry.unit_of_measurement,
-                "original_name": entry.original_name,
-                "original_icon": entry.original_icon,
-            }
-            for entry in self.entities.values()
-        ]
+        data["entities"] = [_entry_as_dict(entry) for entry in self.entities.values()]
 
         return data
 
+    @callback
+    def _entry_to_save(self, collection: str, entity_id: str) -> Optional[Dict]:
+        """Return data of an entity to store in the journal."""
+        entry = self.entities.get(entity_id)
+        if entry is None:
+            return None
+        return _entry_as_dict(entry)
+
     @callback
     def async_clear_config_entry(self, config_entry: str) -> None:
         """Clear config entry from registry entries."""
-        for entity_id in [
-            entity_id
-            for entity_id, entry in self.entities.items()
-            if config_entry == entry.config_entry_id
-        ]:
+        for entity_id in list(self._config_entry_index.get(config_entry, ())):
             self.async_remove(entity_id)
 
+    @callback
+    def async_entries_for_device(self, device_id: str) -> List[RegistryEntry]:
+        """Return entries that match a device."""
+        return [
+            self.entities[entity_id]
+            for entity_id in self._device_index.get(device_id, ())
+        ]
+
+    @callback
+    def async_entries_for_config_entry(
+        self, config_entry_id: str
+    ) -> List[RegistryEntry]:
+        """Return entries that match a config entry."""
+        return [
+            self.entities[entity_id]
+            for entity_id in self._config_entry_index.get(config_entry_id, ())
+        ]
+
     def _register_entry(self, entry: RegistryEntry) -> None:
         self.entities[entry.entity_id] = entry
         self._add_index(entry)
 
     def _add_index(self, entry: RegistryEntry) -> None:
         self._index[(entry.domain, entry.platform, entry.unique_id)] = entry.entity_id
+        _add_to_index(self._device_index, entry.device_id, entry.entity_id)
+        _add_to_index(self._config_entry_index, entry.config_entry_id, entry.entity_id)
 
     def _unregister_entry(self, entry: RegistryEntry) -> None:
         self._remove_index(entry)
@@ -497,13 +520,74 @@ class EntityRegistry:
 
     def _remove_index(self, entry: RegistryEntry) -> None:
         del self._index[(entry.domain, entry.platform, entry.unique_id)]
+        _remove_from_index(self._device_index, entry.device_id, entry.entity_id)
+        _remove_from_index(
+            self._config_entry_index, entry.config_entry_id, entry.entity_id
+        )
+
+    def _update_index(self, old: RegistryEntry, new: RegistryEntry) -> None:
+        del self._index[(old.domain, old.platform, old.unique_id)]
+        self._index[(new.domain, new.platform, new.unique_id)] = new.entity_id
+
+        # Only touch changed keys to keep the order of the lookups
+        renamed = old.entity_id != new.entity_id
+        if renamed or old.device_id != new.device_id:
+            _remove_from_index(self._device_index, old.device_id, old.entity_id)
+            _add_to_index(self._device_index, new.device_id, new.entity_id)
+        if renamed or old.config_entry_id != new.config_entry_id:
+            _remove_from_index(
+                self._config_entry_index, old.config_entry_id, old.entity_id
+            )
+            _add_to_index(self._config_entry_index, new.config_entry_id, new.entity_id)
 
     def _rebuild_index(self) -> None:
         self._index = {}
+        self._device_index = {}
+        self._config_entry_index = {}
         for entry in self.entities.values():
             self._add_index(entry)
 
 
+def _add_to_index(
+    index: Dict[str, Dict[str, None]], key: Optional[str], entity_id: str
+) -> None:
+    """Add an entity id to the entity ids of key in a secondary index."""
+    if key is not None:
+        index.setdefault(key, {})[entity_id] = None
+
+
+def _remove_from_index(
+    index: Dict[str, Dict[str, None]], key: Optional[str], entity_id: str
+) -> None:
+    """Remove an entity id from the entity ids of key in a secondary index."""
+    if key is None:
+        return
+    entity_ids = index[key]
+    del entity_ids[entity_id]
+    if not entity_ids:
+        del index[key]
+
+
+def _entry_as_dict(entry: RegistryEntry) -> Dict[str, Any]:
+    """Return the stored representation of a registry entry."""
+    return {
+        "entity_id": entry.entity_id,
+        "config_entry_id": entry.config_entry_id,
+        "device_id": entry.device_id,
+        "unique_id": entry.unique_id,
+        "platform": entry.platform,
+        "name": entry.name,
+        "icon": entry.icon,
+        "disabled_by": entry.disabled_by,
+        "capabilities": entry.capabilities,
+        "supported_features": entry.supported_features,
+        "device_class": entry.device_class,
+        "unit_of_measurement": entry.unit_of_measurement,
+        "original_name": entry.original_name,
+        "original_icon": entry.original_icon,
+    }
+
+
 @singleton(DATA_REGISTRY)
 async def async_get_registry(hass: HomeAssistantType) -> EntityRegistry:
     """Create entity registry."""
@@ -517,9 +601,7 @@ def async_entries_for_device(
     registry: EntityRegistry, device_id: str
 ) -> List[RegistryEntry]:
     """Return entries that match a device."""
-    return [
-        entry for entry in registry.entities.values() if entry.device_id == device_id
-    ]
+    return registry.async_entries_for_device(device_id)
 
 
 @callback
@@ -527,11 +609,7 @@ def async_entries_for_config_entry(
     registry: EntityRegistry, config_entry_id: str
 ) -> List[RegistryEntry]:
     """Return entries that match a config entry."""
-    return [
-        entry
-        for entry in registry.entities.values()
-        if entry.config_entry_id == config_entry_id
-    ]
+    return registry.async_entries_for_config_entry(config_entry_id)
 
 
 async def _async_migrate(entities: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
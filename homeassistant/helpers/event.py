@@ -9,15 +9,14 @@ from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union
 import attr
 
 from homeassistant.const import (
-    ATTR_NOW,
     EVENT_CORE_CONFIG_UPDATE,
     EVENT_STATE_CHANGED,
-    EVENT_TIME_CHANGED,
     MATCH_ALL,
     SUN_EVENT_SUNRISE,
     SUN_EVENT_SUNSET,
 )
 from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
 from homeassistant.helpers.sun import get_astral_event_next
 from homeassistant.helpers.template import Template
@@ -290,28 +289,137 @@ def async_track_template(
     action: Callable[[str, State, State], None],
     variables: Optional[Dict[str, Any]] = None,
 ) -> CALLBACK_TYPE:
-    """Add a listener that track state changes with template condition."""
-    from . import condition  # pylint: disable=import-outside-toplevel
+    """Add a listener that track state changes with template condition.
 
+    The entities and domains that the last render accessed decide which
+    state changes render the template again. Templates that iterate over
+    states are rendered at most once per rate limit of their RenderInfo.
+    """
     # Local variable to keep track of if the action has already been triggered
     already_triggered = False
+    info = template.async_render_to_info(variables)
+    last_render: Optional[datetime] = None
+    pending_event: Optional[Event] = None
+    cancel_rate_limit: Optional[CALLBACK_TYPE] = None
+    unsub_entities: Optional[CALLBACK_TYPE] = None
+    unsub_all: Optional[CALLBACK_TYPE] = None
+    tracked_entities: frozenset = frozenset()
 
     @callback
-    def template_condition_listener(entity_id: str, from_s: State, to_s: State) -> None:
-        """Check if condition is correct and run action."""
-        nonlocal already_triggered
-        template_result = condition.async_template(hass, template, variables)
+    def render(event: Event) -> None:
+        """Render the template and run the action if it became true."""
+        nonlocal already_triggered, info, last_render
+        info = template.async_render_to_info(variables)
+        last_render = dt_util.utcnow()
+        update_listeners()
+
+        try:
+            template_result = info.result.lower() == "true"
+        except TemplateError as ex:
+            _LOGGER.error("Error during template condition: %s", ex)
+            template_result = False
 
         # Check to see if template returns true
         if template_result and not already_triggered:
             already_triggered = True
-            hass.async_run_job(action, entity_id, from_s, to_s)
+            hass.async_run_job(
+                action,
+                event.data.get("entity_id"),
+                event.data.get("old_state"),
+                event.data.get("new_state"),
+            )
         elif not template_result:
             already_triggered = False
 
-    return async_track_state_change(
-        hass, template.extract_entities(variables), template_condition_listener
-    )
+    @callback
+    def rate_limit_expired(now: datetime) -> None:
+        """Render the template for the changes seen while rate limited."""
+        nonlocal cancel_rate_limit, pending_event
+        cancel_rate_limit = None
+        event, pending_event = pending_event, None
+        if event is not None:
+            render(event)
+
+    @callback
+    def state_changed_listener(event: Event) -> None:
+        """Render the template if the state change can change the result."""
+        nonlocal cancel_rate_limit, pending_event
+        # pylint: disable=protected-access
+        if info._entities or info.rate_limit is not None:
+            entity_id = event.data["entity_id"]
+            if (
+                event.data.get("old_state") is None
+                or event.data.get("new_state") is None
+            ):
+                if not info.filter_lifecycle(entity_id):
+                    return
+            elif not info.filter(entity_id):
+                return
+
+        if cancel_rate_limit is not None:
+            pending_event = event
+            return
+
+        if info.rate_limit is not None and last_render is not None:
+            delay = (last_render + info.rate_limit - dt_util.utcnow()).total_seconds()
+            if delay > 0:
+                pending_event = event
+                cancel_rate_limit = async_call_later(hass, delay, rate_limit_expired)
+                return
+
+        render(event)
+
+    @callback
+    def update_listeners() -> None:
+        """Listen to the state changes that the last render depends on."""
+        nonlocal unsub_entities, unsub_all, tracked_entities
+        # pylint: disable=protected-access
+        entities = info._entities
+
+        if not info.is_static and (not entities or info.rate_limit is not None):
+            # Domains or all states are iterated, new entities matter too.
+            # Without any states accessed, any state change may change the
+            # result as before (for example templates using now()).
+            if unsub_entities is not None:
+                unsub_entities()
+                unsub_entities = None
+                tracked_entities = frozenset()
+            if unsub_all is None:
+                unsub_all = hass.bus.async_listen(
+                    EVENT_STATE_CHANGED, state_changed_listener
+                )
+            return
+
+        if unsub_all is not None:
+            unsub_all()
+            unsub_all = None
+
+        if entities == tracked_entities:
+            return
+
+        if unsub_entities is not None:
+            unsub_entities()
+            unsub_entities = None
+
+        tracked_entities = entities
+        if entities:
+            unsub_entities = async_track_state_change_event(
+                hass, entities, state_changed_listener
+            )
+
+    update_listeners()
+
+    @callback
+    def remove_listener() -> None:
+        """Remove the state change listeners."""
+        if unsub_entities is not None:
+            unsub_entities()
+        if unsub_all is not None:
+            unsub_all()
+        if cancel_rate_limit is not None:
+            cancel_rate_limit()
+
+    return remove_listener
 
 
 track_template = threaded_listener_factory(async_track_template)
@@ -580,15 +688,10 @@ def async_track_utc_time_change(
 ) -> CALLBACK_TYPE:
     """Add a listener that will fire if time matches a pattern."""
     # We do not have to wrap the function with time pattern matching logic
-    # if no pattern given
+    # if no pattern given, fire every second like the time changed event
+    # used to do.
     if all(val is None for val in (hour, minute, second)):
-
-        @callback
-        def time_change_listener(event: Event) -> None:
-            """Fire every time event that comes in."""
-            hass.async_run_job(action, event.data[ATTR_NOW])
-
-        return hass.bus.async_listen(EVENT_TIME_CHANGED, time_change_listener)
+        return async_track_time_interval(hass, action, timedelta(seconds=1))
 
     matching_seconds = dt_util.parse_time_expression(second, 0, 59)
     matching_minutes = dt_util.parse_time_expression(minute, 0, 59)
@@ -2,10 +2,21 @@
 from datetime import datetime
 import json
 import logging
-from typing import Any
+import re
+import secrets
+from typing import Any, List
+
+from homeassistant.core import State
 
 _LOGGER = logging.getLogger(__name__)
 
+# States are encoded as a placeholder string while the rest of the document is
+# dumped, the placeholders are replaced by the cached JSON of the state after.
+_STATE_PLACEHOLDER = f"\x00{secrets.token_hex(8)}:"
+_STATE_PLACEHOLDER_RE = re.compile(
+    rb'"\\u0000' + _STATE_PLACEHOLDER[1:].encode() + rb'(\d+)\\u0000"'
+)
+
 
 class JSONEncoder(json.JSONEncoder):
     """JSONEncoder that supports Home Assistant objects."""
@@ -24,3 +35,38 @@ class JSONEncoder(json.JSONEncoder):
             return o.as_dict()
 
         return json.JSONEncoder.default(self, o)
+
+
+class _StateCacheJSONEncoder(JSONEncoder):
+    """JSONEncoder that leaves placeholders for the cached JSON of states."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialize the encoder."""
+        super().__init__(**kwargs)
+        self.states: List[bytes] = []
+
+    # pylint: disable=method-hidden
+    def default(self, o: Any) -> Any:
+        """Convert Home Assistant objects, states to placeholders."""
+        # Subclasses like the lazy states of the history are not cached
+        if type(o) is State:  # pylint: disable=unidiomatic-typecheck
+            self.states.append(o.as_json())
+            return f"{_STATE_PLACEHOLDER}{len(self.states) - 1}\x00"
+
+        return super().default(o)
+
+
+def json_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """Dump an object to JSON bytes.
+
+    States are serialized once and their cached JSON is reused.
+    Raises ValueError or TypeError if the object can't be serialized.
+    """
+    encoder = _StateCacheJSONEncoder(allow_nan=False, sort_keys=sort_keys)
+    dumped = encoder.encode(obj).encode("UTF-8")
+
+    if not encoder.states:
+        return dumped
+
+    states = encoder.states
+    return _STATE_PLACEHOLDER_RE.sub(lambda match: states[int(match[1])], dumped)
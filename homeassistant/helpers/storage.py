@@ -1,12 +1,15 @@
 """Helper to help store data."""
 import asyncio
+import json
 from json import JSONEncoder
 import logging
 import os
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+import secrets
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
 
 from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
 from homeassistant.core import CALLBACK_TYPE, CoreState, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.event import async_call_later
 from homeassistant.loader import bind_hass
 from homeassistant.util import json as json_util
@@ -15,6 +18,9 @@ from homeassistant.util import json as json_util
 # mypy: no-check-untyped-defs
 
 STORAGE_DIR = ".storage"
+JOURNAL_SUFFIX = ".journal"
+# Size of the journal in bytes after which the data is written to the snapshot
+JOURNAL_COMPACT_SIZE = 1024 * 1024
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -67,8 +73,15 @@ class Store:
         private: bool = False,
         *,
         encoder: Optional[Type[JSONEncoder]] = None,
+        journal: Optional[Dict[str, str]] = None,
     ):
-        """Initialize storage class."""
+        """Initialize storage class.
+
+        Passing journal enables the journal mode. It maps the collections
+        (lists of dictionaries) in the stored data to the key of their items.
+        Changed items are appended to a journal next to the snapshot and the
+        snapshot is only rewritten when the journal grows too large.
+        """
         self.version = version
         self.key = key
         self.hass = hass
@@ -79,12 +92,24 @@ class Store:
         self._write_lock = asyncio.Lock()
         self._load_task: Optional[asyncio.Future] = None
         self._encoder = encoder
+        self._journal = journal
+        # Changed (collection, key) pairs not written yet, dict keeps order
+        self._journal_changes: Dict[Tuple[str, str], None] = {}
+        # Size of the journal on disk, None if the next write is a snapshot
+        self._journal_size: Optional[int] = None
+        # Id of the snapshot, journal entries are only replayed on it
+        self._journal_id: Optional[str] = None
 
     @property
     def path(self):
         """Return the config path."""
         return self.hass.config.path(STORAGE_DIR, self.key)
 
+    @property
+    def journal_path(self):
+        """Return the journal path."""
+        return self.path + JOURNAL_SUFFIX
+
     async def async_load(self) -> Union[Dict, List, None]:
         """Load data.
 
@@ -109,9 +134,7 @@ class Store:
             if "data_func" in data:
                 data["data"] = data.pop("data_func")()
         else:
-            data = await self.hass.async_add_executor_job(
-                json_util.load_json, self.path
-            )
+            data = await self.hass.async_add_executor_job(self._load_data)
 
             if data == {}:
                 return None
@@ -125,10 +148,70 @@ class Store:
                 self.version,
             )
             stored = await self._async_migrate_func(data["version"], data["data"])
+            # The journal can only be appended to a snapshot of this version
+            self._journal_size = None
 
         self._load_task = None
         return stored
 
+    def _load_data(self) -> Dict:
+        """Load the snapshot and replay the journal on top of it.
+
+        This method does blocking I/O and must be run in the executor.
+        """
+        data = json_util.load_json(self.path)
+
+        if self._journal is None or data == {}:
+            return data
+
+        self._journal_id = data.get("journal_id")
+        try:
+            with open(self.journal_path, encoding="utf-8") as fdesc:
+                lines = fdesc.readlines()
+                self._journal_size = os.fstat(fdesc.fileno()).st_size
+        except FileNotFoundError:
+            lines = []
+            self._journal_size = 0
+        except OSError as error:
+            _LOGGER.exception("Loading journal failed: %s", self.journal_path)
+            raise HomeAssistantError(error) from error
+
+        if not lines:
+            return data
+
+        if not lines[-1].endswith("\n"):
+            # The last write was interrupted, even a complete entry would
+            # be joined with the next one appended
+            self._journal_size = None
+
+        collections = {
+            collection: {item[key]: item for item in data["data"].get(collection, [])}
+            for collection, key in self._journal.items()
+        }
+        for line in lines:
+            try:
+                change = json.loads(line)
+                items = collections[change["collection"]]
+            except (ValueError, KeyError):
+                # An interrupted write leaves a partial last line, appending
+                # to it would corrupt the next entry so write a snapshot next
+                _LOGGER.warning("Ignoring invalid journal entry for %s", self.key)
+                self._journal_size = None
+                continue
+            if change.get("journal_id") != self._journal_id:
+                # Left behind when removing the journal after writing a
+                # newer snapshot failed, the snapshot contains the change
+                continue
+            if change["item"] is None:
+                items.pop(change["key"], None)
+            else:
+                items[change["key"]] = change["item"]
+
+        for collection, items in collections.items():
+            data["data"][collection] = list(items.values())
+
+        return data
+
     async def async_save(self, data: Union[Dict, List]) -> None:
         """Save data."""
         self._data = {"version": self.version, "key": self.key, "data": data}
@@ -146,7 +229,42 @@ class Store:
     def async_delay_save(self, data_func: Callable[[], Dict], delay: float = 0) -> None:
         """Save data with an optional delay."""
         self._data = {"version": self.version, "key": self.key, "data_func": data_func}
+        self._async_delay_write(delay)
+
+    @callback
+    def async_delay_save_changes(
+        self,
+        data_func: Callable[[], Dict],
+        item_func: Callable[[str, str], Optional[Dict]],
+        changed: Iterable[Tuple[str, str]],
+        delay: float = 0,
+    ) -> None:
+        """Save changed items with an optional delay.
+
+        changed are the (collection, key) pairs of the changed items. In
+        journal mode item_func(collection, key) is called at write time and
+        its result is appended to the journal, None for a removed item.
+        Otherwise, or when the journal is compacted, data_func is saved.
+        """
+        if self._journal is None or (
+            self._data is not None and "item_func" not in self._data
+        ):
+            # A snapshot is pending, it will include the changes
+            self.async_delay_save(data_func, delay)
+            return
 
+        self._journal_changes.update(dict.fromkeys(changed))
+        self._data = {
+            "version": self.version,
+            "key": self.key,
+            "data_func": data_func,
+            "item_func": item_func,
+        }
+        self._async_delay_write(delay)
+
+    @callback
+    def _async_delay_write(self, delay: float) -> None:
+        """Schedule writing the pending data."""
         self._async_cleanup_delay_listener()
         self._async_cleanup_final_write_listener()
 
@@ -206,6 +324,28 @@ class Store:
                 return
 
             data = self._data
+            item_func = data.pop("item_func", None)
+            changes = self._journal_changes
+            self._journal_changes = {}
+
+            if (
+                item_func is not None
+                and "data" not in data
+                and self._journal_size is not None
+                and self._journal_size < JOURNAL_COMPACT_SIZE
+            ):
+                self._data = None
+                items = [
+                    (collection, key, item_func(collection, key))
+                    for collection, key in changes
+                ]
+                try:
+                    await self.hass.async_add_executor_job(self._write_journal, items)
+                except (json_util.SerializationError, json_util.WriteError) as err:
+                    _LOGGER.error("Error writing journal for %s: %s", self.key, err)
+                    # Write everything to the snapshot on the next write
+                    self._journal_size = None
+                return
 
             if "data_func" in data:
                 data["data"] = data.pop("data_func")()
@@ -224,16 +364,80 @@ class Store:
         if not os.path.isdir(os.path.dirname(path)):
             os.makedirs(os.path.dirname(path))
 
+        if self._journal is not None:
+            # A new id makes any journal left behind stale for this snapshot
+            self._journal_size = None
+            self._journal_id = secrets.token_hex(8)
+            data = {**data, "journal_id": self._journal_id}
+
         _LOGGER.debug("Writing data for %s", self.key)
         json_util.save_json(path, data, self._private, encoder=self._encoder)
 
+        if self._journal is not None:
+            # The snapshot contains all changes of the journal
+            try:
+                os.unlink(self.journal_path)
+            except FileNotFoundError:
+                pass
+            except OSError as error:
+                _LOGGER.exception("Removing journal failed: %s", self.journal_path)
+                raise json_util.WriteError(error) from error
+            self._journal_size = 0
+
+    def _write_journal(self, items: List[Tuple[str, str, Optional[Dict]]]) -> None:
+        """Append changed items to the journal.
+
+        This method does blocking I/O and must be run in the executor.
+        """
+        try:
+            lines = "".join(
+                json.dumps(
+                    {
+                        "journal_id": self._journal_id,
+                        "collection": collection,
+                        "key": key,
+                        "item": item,
+                    },
+                    separators=(",", ":"),
+                    cls=self._encoder,
+                )
+                + "\n"
+                for collection, key, item in items
+            )
+        except TypeError as error:
+            raise json_util.SerializationError(
+                f"Failed to serialize to JSON: {self.journal_path}"
+            ) from error
+
+        _LOGGER.debug("Writing %s journal entries for %s", len(items), self.key)
+        try:
+            fd = os.open(
+                self.journal_path,
+                os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                0o600 if self._private else 0o644,
+            )
+            with open(fd, "w", encoding="utf-8") as fdesc:
+                fdesc.write(lines)
+                fdesc.flush()
+                os.fsync(fd)
+                self._journal_size = os.fstat(fd).st_size
+        except OSError as error:
+            _LOGGER.exception("Writing journal failed: %s", self.journal_path)
+            raise json_util.WriteError(error) from error
+
     async def _async_migrate_func(self, old_version, old_data):
         """Migrate to the new version."""
         raise NotImplementedError
 
     async def async_remove(self):
         """Remove all data."""
-        try:
-            await self.hass.async_add_executor_job(os.unlink, self.path)
-        except FileNotFoundError:
-            pass
+        paths = [self.path]
+        if self._journal is not None:
+            paths.append(self.journal_path)
+            self._journal_size = None
+
+        for path in paths:
+            try:
+                await self.hass.async_add_executor_job(os.unlink, path)
+            except FileNotFoundError:
+                pass
@@ -1,19 +1,23 @@
 """Template helper methods for rendering strings with Home Assistant data."""
 import base64
+from collections import OrderedDict
 import collections.abc
-from datetime import datetime
+from datetime import datetime, timedelta
 from functools import wraps
 import json
 import logging
 import math
 import random
 import re
-from typing import Any, Dict, Iterable, List, Optional, Union
+import time
+from types import CodeType
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
 from urllib.parse import urlencode as urllib_urlencode
 import weakref
 
 import jinja2
-from jinja2 import contextfilter, contextfunction
+from jinja2 import contextfilter, contextfunction, meta
+from jinja2.bccache import Bucket, BytecodeCache
 from jinja2.sandbox import ImmutableSandboxedEnvironment
 from jinja2.utils import Namespace  # type: ignore
 
@@ -22,11 +26,12 @@ from homeassistant.const import (
     ATTR_LATITUDE,
     ATTR_LONGITUDE,
     ATTR_UNIT_OF_MEASUREMENT,
+    EVENT_HOMEASSISTANT_STARTED,
     LENGTH_METERS,
     MATCH_ALL,
     STATE_UNKNOWN,
 )
-from homeassistant.core import State, callback, split_entity_id, valid_entity_id
+from homeassistant.core import Event, State, callback, split_entity_id, valid_entity_id
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers import location as loc_helper
 from homeassistant.helpers.typing import HomeAssistantType, TemplateVarsType
@@ -44,12 +49,33 @@ DATE_STR_FORMAT = "%Y-%m-%d %H:%M:%S"
 _RENDER_INFO = "template.render_info"
 _ENVIRONMENT = "template.environment"
 
+# Compiled templates shared by all environments, keyed by source
+_COMPILE_CACHE: "OrderedDict[str, CodeType]" = OrderedDict()
+COMPILE_CACHE_SIZE = 2048
+
+BYTECODE_CACHE_STORAGE_KEY = "core.template_bytecode"
+BYTECODE_CACHE_STORAGE_VERSION = 1
+BYTECODE_CACHE_SAVE_DELAY = 60
+
+# Templates that iterate over states are rendered at most once per rate limit
+# when tracked, as any state change in the system may change their result.
+ALL_STATES_RATE_LIMIT = timedelta(minutes=1)
+DOMAIN_STATES_RATE_LIMIT = timedelta(seconds=1)
+
 _RE_NONE_ENTITIES = re.compile(r"distance\(|closest\(", re.I | re.M)
 _RE_GET_ENTITIES = re.compile(
     r"(?:(?:(?:states\.|(?P<func>is_state|is_state_attr|state_attr|states|expand)\((?:[\ \'\"]?))(?P<entity_id>[\w]+\.[\w]+)|states\.(?P<domain_outer>[a-z]+)|states\[(?:[\'\"]?)(?P<domain_inner>[\w]+))|(?P<variable>[\w]+))",
     re.I | re.M,
 )
 _RE_JINJA_DELIMITERS = re.compile(r"\{%|\{\{")
+# Templates that only output value or a part of value_json
+_RE_TRIVIAL_VALUE_TEMPLATE = re.compile(
+    r"^\s*\{\{\s*(value|value_json)"
+    r"((?:\.\w+|\[\s*(?:\d+|'[^'\\]*'|\"[^\"\\]*\")\s*\])*)\s*\}\}\s*$"
+)
+_RE_TRIVIAL_VALUE_PATH = re.compile(
+    r"\.(?:(\d+)|(\w+))|\[\s*(?:(\d+)|'([^'\\]*)'|\"([^\"\\]*)\")\s*\]"
+)
 
 
 @bind_hass
@@ -141,6 +167,9 @@ class RenderInfo:
         self._all_states = False
         self._domains = []
         self._entities = []
+        # Set when frozen
+        self.is_static = False
+        self.rate_limit: Optional[timedelta] = None
 
     def filter(self, entity_id: str) -> bool:
         """Template should re-render if the state changes."""
@@ -162,15 +191,18 @@ class RenderInfo:
 
     def _freeze(self) -> None:
         self._entities = frozenset(self._entities)
+        self.is_static = _RE_JINJA_DELIMITERS.search(self.template.template) is None
         if self._all_states:
             # Leave lifecycle_filter as True
             del self._domains
+            self.rate_limit = ALL_STATES_RATE_LIMIT
         elif not self._domains:
             del self._domains
             self.filter_lifecycle = self.filter
         else:
             self._domains = frozenset(self._domains)
             self.filter_lifecycle = self._filter_lifecycle
+            self.rate_limit = DOMAIN_STATES_RATE_LIMIT
 
 
 class Template:
@@ -184,6 +216,8 @@ class Template:
         self.template: str = template
         self._compiled_code = None
         self._compiled = None
+        self._uses_value_json: Optional[bool] = None
+        self._trivial_value_path = None
         self.hass = hass
 
     @property
@@ -278,13 +312,22 @@ class Template:
         if self._compiled is None:
             self._ensure_compiled()
 
+        if self._uses_value_json is None:
+            self._analyze_value_usage()
+
+        if self._trivial_value_path is not None:
+            result = self._render_trivial_value(value)
+            if result is not _SENTINEL:
+                return result
+
         variables = dict(variables or {})
         variables["value"] = value
 
-        try:
-            variables["value_json"] = json.loads(value)
-        except (ValueError, TypeError):
-            pass
+        if self._uses_value_json:
+            try:
+                variables["value_json"] = json.loads(value)
+            except (ValueError, TypeError):
+                pass
 
         try:
             return self._compiled.render(variables).strip()
@@ -298,6 +341,58 @@ class Template:
                 )
             return value if error_value is _SENTINEL else error_value
 
+    def _analyze_value_usage(self):
+        """Find out how the template uses value and value_json."""
+        self._uses_value_json = "value_json" in meta.find_undeclared_variables(
+            self._env.parse(self.template)
+        )
+
+        match = _RE_TRIVIAL_VALUE_TEMPLATE.match(self.template)
+        if match is None:
+            return
+
+        path = []
+        for (
+            attr_index,
+            attr,
+            index,
+            key,
+            double_quoted_key,
+        ) in _RE_TRIVIAL_VALUE_PATH.findall(match.group(2)):
+            if attr_index or index:
+                path.append((False, int(attr_index or index)))
+            elif attr:
+                path.append((True, attr))
+            else:
+                path.append((False, key or double_quoted_key))
+
+        self._trivial_value_path = (match.group(1) == "value_json", path)
+
+    def _render_trivial_value(self, value):
+        """Render a template that only outputs (a part of) the value.
+
+        Returns _SENTINEL when Jinja has to render it, for example when
+        a key is missing and Jinja decides how that is handled.
+        """
+        parse_json, path = self._trivial_value_path
+
+        if parse_json:
+            try:
+                value = json.loads(value)
+            except (ValueError, TypeError):
+                return _SENTINEL
+
+        for is_attr, key in path:
+            # Jinja looks up attributes of the object before its items
+            if is_attr and hasattr(value, key):
+                return _SENTINEL
+            try:
+                value = value[key]
+            except (LookupError, TypeError):
+                return _SENTINEL
+
+        return str(value).strip()
+
     def _ensure_compiled(self):
         """Bind a template to a specific hass instance."""
         self.ensure_valid()
@@ -1065,9 +1160,159 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         cached = self.template_cache.get(source)
 
         if cached is None:
-            cached = self.template_cache[source] = super().compile(source)
+            cached = _COMPILE_CACHE.get(source)
+            if cached is None:
+                cached = self._compile_uncached(source)
+                _COMPILE_CACHE[source] = cached
+                while len(_COMPILE_CACHE) > COMPILE_CACHE_SIZE:
+                    _COMPILE_CACHE.popitem(last=False)
+            else:
+                COMPILE_STATS.hits += 1
+                # Another thread may have evicted it in the meantime
+                if source in _COMPILE_CACHE:
+                    _COMPILE_CACHE.move_to_end(source)
+            self.template_cache[source] = cached
+        else:
+            COMPILE_STATS.hits += 1
+
+        # Templates compiled before the bytecode cache was set up, or by an
+        # environment without one, are stored when they are first used here
+        if isinstance(self.bytecode_cache, StoreBytecodeCache):
+            self.bytecode_cache.store_code(self, source, cached)
 
         return cached
 
+    def _compile_uncached(self, source):
+        """Compile a template that is not cached in memory."""
+        bucket = None
+        if self.bytecode_cache is not None:
+            bucket = self.bytecode_cache.get_bucket(self, source, None, source)
+            if isinstance(self.bytecode_cache, StoreBytecodeCache):
+                self.bytecode_cache.stored_sources.add(source)
+            if bucket.code is not None:
+                COMPILE_STATS.bytecode_hits += 1
+                return bucket.code
+
+        start = time.perf_counter()
+        code = super().compile(source)
+        COMPILE_STATS.compile_time += time.perf_counter() - start
+        COMPILE_STATS.misses += 1
+
+        if bucket is not None:
+            bucket.code = code
+            self.bytecode_cache.set_bucket(bucket)
+
+        return code
+
+
+class TemplateCompileStats:
+    """Count how templates were compiled."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.hits = 0
+        self.bytecode_hits = 0
+        self.misses = 0
+        self.compile_time = 0.0
+
+    @property
+    def time_saved(self) -> float:
+        """Estimate the compile time saved by the caches."""
+        if not self.misses:
+            return 0.0
+        return (self.hits + self.bytecode_hits) * self.compile_time / self.misses
+
+
+COMPILE_STATS = TemplateCompileStats()
+
+
+class StoreBytecodeCache(BytecodeCache):
+    """Jinja bytecode cache persisted in a storage file.
+
+    Only the templates compiled since startup are written back, so
+    templates that are no longer used drop out of the file.
+    """
+
+    def __init__(self, hass, store, data):
+        """Initialize the cache."""
+        self.hass = hass
+        self._store = store
+        self._data: Dict[str, str] = data
+        self._used: Dict[str, str] = {}
+        # Sources that are loaded from or written to the store in this run
+        self.stored_sources: Set[str] = set()
+
+    def store_code(self, environment, source: str, code: CodeType) -> None:
+        """Store the compiled code of a template unless it is stored already."""
+        if source in self.stored_sources:
+            return
+        self.stored_sources.add(source)
+        bucket = self.get_bucket(environment, source, None, source)
+        if bucket.code is None:
+            bucket.code = code
+            self.set_bucket(bucket)
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        """Load the bytecode of a bucket."""
+        data = self._data.get(bucket.key)
+        if data is None:
+            return
+        bucket.bytecode_from_string(base64.b64decode(data))
+        if bucket.code is not None:
+            self._used[bucket.key] = data
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        """Store the bytecode of a bucket."""
+        data = base64.b64encode(bucket.bytecode_to_string()).decode()
+        self._data[bucket.key] = self._used[bucket.key] = data
+        # Templates may be compiled outside the event loop
+        self.hass.loop.call_soon_threadsafe(self._async_schedule_save)
+
+    def clear(self) -> None:
+        """Clear the cache."""
+        self._data = {}
+        self._used = {}
+        self.stored_sources = set()
+        self.hass.loop.call_soon_threadsafe(self._async_schedule_save)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the used bytecode after a delay."""
+        self._store.async_delay_save(lambda: self._used, BYTECODE_CACHE_SAVE_DELAY)
+
+
+async def async_setup_bytecode_cache(hass: HomeAssistantType) -> None:
+    """Load the compiled templates of the previous run from storage."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.helpers.storage import Store
+
+    store = Store(hass, BYTECODE_CACHE_STORAGE_VERSION, BYTECODE_CACHE_STORAGE_KEY)
+    data = await store.async_load()
+    if not isinstance(data, dict):
+        data = {}
+
+    env = hass.data.get(_ENVIRONMENT)
+    if env is None:
+        env = hass.data[_ENVIRONMENT] = TemplateEnvironment(hass)
+    env.bytecode_cache = bytecode_cache = StoreBytecodeCache(hass, store, data)
+    # Store the templates compiled before the cache was set up
+    for source, code in list(_COMPILE_CACHE.items()):
+        bytecode_cache.store_code(env, source, code)
+
+    @callback
+    def log_compile_stats(event: Event) -> None:
+        """Log how many templates the caches compiled during startup."""
+        _LOGGER.debug(
+            "Compiled %s templates in %.3fs during startup. %s were cached in "
+            "memory and %s on disk, saving about %.3fs",
+            COMPILE_STATS.misses,
+            COMPILE_STATS.compile_time,
+            COMPILE_STATS.hits,
+            COMPILE_STATS.bytecode_hits,
+            COMPILE_STATS.time_saved,
+        )
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, log_compile_stats)
+
 
 _NO_HASS_ENV = TemplateEnvironment(None)
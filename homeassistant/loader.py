@@ -11,6 +11,7 @@ import json
 import logging
 import pathlib
 import sys
+from timeit import default_timer as timer
 from types import ModuleType
 from typing import (
     TYPE_CHECKING,
@@ -20,6 +21,7 @@ from typing import (
     List,
     Optional,
     Set,
+    Tuple,
     TypeVar,
     Union,
     cast,
@@ -37,6 +39,8 @@ CALLABLE_T = TypeVar("CALLABLE_T", bound=Callable)  # pylint: disable=invalid-na
 _LOGGER = logging.getLogger(__name__)
 
 DATA_COMPONENTS = "components"
+DATA_IMPORTS_IN_PROGRESS = "integration_imports_in_progress"
+DATA_IMPORT_TIMES = "integration_import_times"
 DATA_INTEGRATIONS = "integrations"
 DATA_CUSTOM_COMPONENTS = "custom_components"
 PACKAGE_CUSTOM_COMPONENTS = "custom_components"
@@ -391,11 +395,73 @@ class Integration:
             )
         return cache[full_name]  # type: ignore
 
+    async def async_get_component(self) -> ModuleType:
+        """Return the component, importing it in the executor if needed."""
+        cache = self.hass.data.setdefault(DATA_COMPONENTS, {})
+        if self.domain in cache:
+            return cache[self.domain]  # type: ignore
+        return await self._async_import(self.domain, self.get_component)
+
+    async def async_get_platform(self, platform_name: str) -> ModuleType:
+        """Return a platform for an integration, importing it in the executor."""
+        cache = self.hass.data.setdefault(DATA_COMPONENTS, {})
+        full_name = f"{self.domain}.{platform_name}"
+        if full_name in cache:
+            return cache[full_name]  # type: ignore
+        return await self._async_import(
+            full_name, ft.partial(self.get_platform, platform_name)
+        )
+
+    async def _async_import(
+        self, name: str, import_func: Callable[[], ModuleType]
+    ) -> ModuleType:
+        """Import a module in the executor.
+
+        Concurrent imports of the same module share a single executor job.
+        """
+        in_progress: Dict[str, asyncio.Future] = self.hass.data.setdefault(
+            DATA_IMPORTS_IN_PROGRESS, {}
+        )
+        future = in_progress.get(name)
+
+        if future is None:
+            future = in_progress[name] = self.hass.async_add_executor_job(
+                _import_timed, import_func
+            )
+
+            def _import_done(fut: asyncio.Future) -> None:
+                """Clean up and record the time the import took."""
+                in_progress.pop(name, None)
+                if fut.cancelled() or fut.exception() is not None:
+                    return
+                elapsed = fut.result()[1]
+                self.hass.data.setdefault(DATA_IMPORT_TIMES, {})[name] = elapsed
+                _LOGGER.debug("Importing %s took %.3f seconds", name, elapsed)
+
+            future.add_done_callback(_import_done)
+
+        try:
+            module, _ = await asyncio.shield(future)
+        except RuntimeError as err:
+            # Modules that create asyncio primitives at import time
+            # can only be imported in the event loop thread.
+            _LOGGER.debug("Importing %s in the event loop: %s", name, err)
+            return import_func()
+
+        return cast(ModuleType, module)
+
     def __repr__(self) -> str:
         """Text representation of class."""
         return f"<Integration {self.domain}: {self.pkg_path}>"
 
 
+def _import_timed(import_func: Callable[[], ModuleType]) -> Tuple[ModuleType, float]:
+    """Import a module and return it with the time the import took."""
+    start = timer()
+    module = import_func()
+    return module, timer() - start
+
+
 async def async_get_integration(hass: "HomeAssistant", domain: str) -> Integration:
     """Get an integration."""
     cache = hass.data.get(DATA_INTEGRATIONS)
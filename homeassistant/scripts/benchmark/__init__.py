@@ -6,6 +6,7 @@ from contextlib import suppress
 from datetime import datetime
 import json
 import logging
+from tempfile import TemporaryDirectory
 from timeit import default_timer as timer
 from typing import Callable, Dict, TypeVar
 
@@ -46,9 +47,12 @@ def run(args):
 async def run_benchmark(bench):
     """Run a benchmark."""
     hass = core.HomeAssistant()
-    runtime = await bench(hass)
-    print(f"Benchmark {bench.__name__} done in {runtime}s")
-    await hass.async_stop()
+    # Benchmarks may save to storage
+    with TemporaryDirectory() as config_dir:
+        hass.config.config_dir = config_dir
+        runtime = await bench(hass)
+        print(f"Benchmark {bench.__name__} done in {runtime}s")
+        await hass.async_stop()
 
 
 def benchmark(func: CALLABLE_T) -> CALLABLE_T:
@@ -85,6 +89,55 @@ async def fire_events(hass):
     return timer() - start
 
 
+@benchmark
+async def fire_events_no_listeners(hass):
+    """Fire a million events without listeners."""
+    return await _fire_events_listeners(hass, 0)
+
+
+@benchmark
+async def fire_events_10_listeners(hass):
+    """Fire a hundred thousand events to 10 listeners."""
+    return await _fire_events_listeners(hass, 10)
+
+
+@benchmark
+async def fire_events_1000_listeners(hass):
+    """Fire a thousand events to 1000 listeners."""
+    return await _fire_events_listeners(hass, 1000)
+
+
+async def _fire_events_listeners(hass, listener_count):
+    """Fire events to listener_count listeners, a million calls in total."""
+    count = 0
+    event_name = "benchmark_event"
+    events_to_fire = 10 ** 6 // max(listener_count, 1)
+    calls_expected = events_to_fire * listener_count
+    event = asyncio.Event()
+
+    @core.callback
+    def listener(_):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == calls_expected:
+            event.set()
+
+    for _ in range(listener_count):
+        hass.bus.async_listen(event_name, listener)
+
+    start = timer()
+
+    for _ in range(events_to_fire):
+        hass.bus.async_fire(event_name)
+
+    if calls_expected:
+        await event.wait()
+
+    return timer() - start
+
+
 @benchmark
 async def time_changed_helper(hass):
     """Run a million events through time changed helper."""
@@ -323,6 +376,188 @@ async def json_serialize_states(hass):
     return timer() - start
 
 
+@benchmark
+async def json_serialize_10000_states(hass):
+    """Serialize 10,000 states 100 times like repeated get_states calls."""
+    states = [
+        core.State(
+            f"light.kitchen_{idx}",
+            "on",
+            {"friendly_name": f"Kitchen Lights {idx}", "brightness": 255},
+        )
+        for idx in range(10 ** 4)
+    ]
+
+    start = timer()
+    for _ in range(100):
+        JSON_DUMP(states)
+    return timer() - start
+
+
+@benchmark
+async def mqtt_retained_burst(hass):
+    """Dispatch a burst of 4000 retained messages to 1500 MQTT subscriptions."""
+    # pylint: disable=import-outside-toplevel
+    from paho.mqtt.client import MQTTMessage
+
+    from homeassistant import config_entries
+    from homeassistant.components import mqtt
+
+    conf = mqtt.CONFIG_SCHEMA({mqtt.DOMAIN: {mqtt.CONF_BROKER: "localhost"}})[
+        mqtt.DOMAIN
+    ]
+    entry = config_entries.ConfigEntry(
+        1,
+        mqtt.DOMAIN,
+        "benchmark",
+        {},
+        config_entries.SOURCE_USER,
+        config_entries.CONN_CLASS_LOCAL_PUSH,
+        {},
+    )
+    client = mqtt.MQTT(hass, entry, conf)
+
+    count = 0
+
+    @core.callback
+    def msg_callback(_):
+        """Handle message."""
+        nonlocal count
+        count += 1
+
+    for idx in range(1500):
+        await client.async_subscribe(f"home/device{idx}/state", msg_callback, 0)
+    await client.async_subscribe("home/+/availability", msg_callback, 0)
+    await client.async_subscribe("homeassistant/#", msg_callback, 0)
+
+    messages = []
+    for idx in range(4000):
+        msg = MQTTMessage(topic=f"home/device{idx}/state".encode())
+        msg.payload = b"on"
+        msg.retain = True
+        messages.append(msg)
+
+    start = timer()
+
+    for msg in messages:
+        # pylint: disable=protected-access
+        client._mqtt_handle_message(msg)
+
+    await hass.async_block_till_done()
+
+    assert count == 1500
+    return timer() - start
+
+
+@benchmark
+async def websocket_state_changed_fan_out(hass):
+    """Send 10,000 state changes to 12 websocket subscribers."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.auth.models import User
+    from homeassistant.components.websocket_api import commands, connection
+
+    subscribers = 12
+    changes = 10 ** 4
+    count = 0
+    event = asyncio.Event()
+
+    @core.callback
+    def send_message(message):
+        """Serialize the message like the websocket writer does."""
+        nonlocal count
+        if not isinstance(message, str):
+            JSON_DUMP(message)
+        count += 1
+
+        if count == subscribers * (changes + 1):
+            event.set()
+
+    user = User(name="Benchmark", perm_lookup=None, is_owner=True, is_active=True)
+
+    for _ in range(subscribers):
+        commands.handle_subscribe_events(
+            hass,
+            connection.ActiveConnection(
+                logging.getLogger(__name__), hass, send_message, user, None
+            ),
+            {"id": 1, "type": "subscribe_events", "event_type": EVENT_STATE_CHANGED},
+        )
+
+    entity_id = "sensor.power"
+    attributes = {"unit_of_measurement": "W", "friendly_name": "Power"}
+
+    start = timer()
+
+    for idx in range(changes):
+        hass.states.async_set(entity_id, idx, attributes)
+
+    await event.wait()
+
+    return timer() - start
+
+
+@benchmark
+async def registry_lookups_startup(hass):
+    """Look up the entities and devices of 4,000 entities on 900 devices."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant import config_entries
+    from homeassistant.helpers import device_registry, entity_registry
+
+    entries = [
+        config_entries.ConfigEntry(
+            1,
+            "benchmark",
+            f"Benchmark {idx}",
+            {},
+            config_entries.SOURCE_USER,
+            config_entries.CONN_CLASS_LOCAL_PUSH,
+            {},
+            entry_id=f"config_entry_{idx}",
+        )
+        for idx in range(30)
+    ]
+
+    dev_reg = device_registry.DeviceRegistry(hass)
+    await dev_reg.async_load()
+    devices = []
+    for idx in range(900):
+        device = dev_reg.async_get_or_create(
+            config_entry_id=entries[idx % len(entries)].entry_id,
+            identifiers={("benchmark", str(idx))},
+        )
+        devices.append(
+            dev_reg.async_update_device(device.id, area_id=f"area_{idx % 20}")
+        )
+
+    ent_reg = entity_registry.EntityRegistry(hass)
+    await ent_reg.async_load()
+    for idx in range(4000):
+        ent_reg.async_get_or_create(
+            "sensor",
+            "benchmark",
+            str(idx),
+            config_entry=entries[idx % len(devices) % len(entries)],
+            device_id=devices[idx % len(devices)].id,
+        )
+
+    start = timer()
+
+    # What integrations do when their config entries are set up
+    for entry in entries:
+        for device in device_registry.async_entries_for_config_entry(
+            dev_reg, entry.entry_id
+        ):
+            dev_reg.async_get_device(device.identifiers, set())
+            for entity in entity_registry.async_entries_for_device(ent_reg, device.id):
+                ent_reg.async_get(entity.entity_id)
+        entity_registry.async_entries_for_config_entry(ent_reg, entry.entry_id)
+
+    for idx in range(20):
+        device_registry.async_entries_for_area(dev_reg, f"area_{idx}")
+
+    return timer() - start
+
+
 def _create_state_changed_event_from_old_new(
     entity_id, event_time_fired, old_state, new_state
 ):
@@ -345,6 +580,7 @@ def _create_state_changed_event_from_old_new(
             "entity_id"
             "domain"
             "attributes"
+            "shared_attrs"
             "state_id",
             "old_state_id",
         ],
@@ -352,7 +588,8 @@ def _create_state_changed_event_from_old_new(
 
     row.event_type = EVENT_STATE_CHANGED
     row.event_data = "{}"
-    row.attributes = attributes_json
+    row.attributes = None
+    row.shared_attrs = attributes_json
     row.time_fired = event_time_fired
     row.state = new_state and new_state.get("state")
     row.entity_id = entity_id
@@ -1,10 +1,14 @@
 """Custom loader."""
 from collections import OrderedDict
+from copy import deepcopy
 import fnmatch
+import hashlib
+import io
 import logging
 import os
 import sys
-from typing import Dict, Iterator, List, TypeVar, Union, overload
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, TypeVar, Union, overload
 
 import yaml
 
@@ -32,6 +36,23 @@ DICT_T = TypeVar("DICT_T", bound=Dict)  # pylint: disable=invalid-name
 _LOGGER = logging.getLogger(__name__)
 __SECRET_CACHE: Dict[str, JSON_TYPE] = {}
 
+# A file modified this long before it was read can't change unnoticed with
+# the same modification time, otherwise its content is hashed on every load
+RACY_MTIME_NS = 2 * 10 ** 9
+
+
+class ParsedYaml(NamedTuple):
+    """A parsed YAML file that doesn't depend on other files or the env."""
+
+    mtime_ns: int
+    size: int
+    read_ns: int
+    digest: bytes
+    data: JSON_TYPE
+
+
+__YAML_CACHE: Dict[str, ParsedYaml] = {}
+
 
 def clear_secret_cache() -> None:
     """Clear the secret cache.
@@ -41,6 +62,14 @@ def clear_secret_cache() -> None:
     __SECRET_CACHE.clear()
 
 
+def clear_yaml_cache() -> None:
+    """Clear the cache of parsed YAML files.
+
+    Async friendly.
+    """
+    __YAML_CACHE.clear()
+
+
 class SafeLineLoader(yaml.SafeLoader):
     """Loader class that keeps track of line numbers."""
 
@@ -52,13 +81,35 @@ class SafeLineLoader(yaml.SafeLoader):
         return node
 
 
+if hasattr(yaml, "CSafeLoader"):
+
+    class FastSafeLoader(yaml.CSafeLoader):  # type: ignore
+        """Loader class that parses with libyaml.
+
+        The objects are annotated with their file and line by the same
+        constructors as the SafeLineLoader.
+        """
+
+        def __init__(self, stream: str) -> None:
+            """Initialize the loader."""
+            super().__init__(stream)
+            self.name = "<unicode string>"
+
+    # Loader used by load_yaml, libyaml if available
+    LOADER = FastSafeLoader
+else:  # pragma: no cover
+    LOADER = SafeLineLoader
+
+
 def load_yaml(fname: str) -> JSON_TYPE:
-    """Load a YAML file."""
+    """Load a YAML file.
+
+    Files that don't include other files, secrets or environment variables
+    are cached and only parsed again when their content changed.
+    """
     try:
         with open(fname, encoding="utf-8") as conf_file:
-            # If configuration file is empty YAML returns None
-            # We convert that to an empty dict
-            return yaml.load(conf_file, Loader=SafeLineLoader) or OrderedDict()
+            return _load_yaml_file(fname, conf_file)
     except yaml.YAMLError as exc:
         _LOGGER.error(str(exc))
         raise HomeAssistantError(exc)
@@ -67,6 +118,58 @@ def load_yaml(fname: str) -> JSON_TYPE:
         raise HomeAssistantError(exc)
 
 
+def _load_yaml_file(fname: str, conf_file: io.TextIOBase) -> JSON_TYPE:
+    """Load an open YAML file from the cache or parse it."""
+    stat: Optional[os.stat_result] = None
+    if isinstance(conf_file, io.TextIOWrapper):
+        stat = os.fstat(conf_file.fileno())
+
+    cached = __YAML_CACHE.get(fname)
+    if (
+        stat is not None
+        and cached is not None
+        and cached.mtime_ns == stat.st_mtime_ns
+        and cached.size == stat.st_size
+        and cached.read_ns - cached.mtime_ns > RACY_MTIME_NS
+    ):
+        return deepcopy(cached.data)
+
+    read_ns = time.time_ns()
+    content = conf_file.read()
+    digest = hashlib.sha1(content.encode("utf-8")).digest()
+
+    if stat is not None and cached is not None and cached.digest == digest:
+        __YAML_CACHE[fname] = cached._replace(
+            mtime_ns=stat.st_mtime_ns, size=stat.st_size, read_ns=read_ns
+        )
+        return deepcopy(cached.data)
+
+    start = time.perf_counter()
+    loader = LOADER(content)
+    loader.name = fname
+    try:
+        # If configuration file is empty YAML returns None
+        # We convert that to an empty dict
+        data = loader.get_single_data() or OrderedDict()
+    finally:
+        loader.dispose()
+    _LOGGER.debug("Parsed %s in %.3f seconds", fname, time.perf_counter() - start)
+
+    if stat is None or not getattr(loader, "cacheable", True):
+        __YAML_CACHE.pop(fname, None)
+        return data
+
+    __YAML_CACHE[fname] = ParsedYaml(
+        stat.st_mtime_ns, stat.st_size, read_ns, digest, deepcopy(data)
+    )
+    return data
+
+
+def _not_cacheable(loader: yaml.SafeLoader) -> None:
+    """Mark that the result of a loader depends on other files or the env."""
+    setattr(loader, "cacheable", False)
+
+
 @overload
 def _add_reference(
     obj: Union[list, NodeListClass], loader: yaml.SafeLoader, node: yaml.nodes.Node
@@ -108,6 +211,7 @@ def _include_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
         device_tracker: !include device_tracker.yaml
 
     """
+    _not_cacheable(loader)
     fname = os.path.join(os.path.dirname(loader.name), node.value)
     try:
         return _add_reference(load_yaml(fname), loader, node)
@@ -134,6 +238,7 @@ def _include_dir_named_yaml(
     loader: SafeLineLoader, node: yaml.nodes.Node
 ) -> OrderedDict:
     """Load multiple files from directory as a dictionary."""
+    _not_cacheable(loader)
     mapping: OrderedDict = OrderedDict()
     loc = os.path.join(os.path.dirname(loader.name), node.value)
     for fname in _find_files(loc, "*.yaml"):
@@ -148,6 +253,7 @@ def _include_dir_merge_named_yaml(
     loader: SafeLineLoader, node: yaml.nodes.Node
 ) -> OrderedDict:
     """Load multiple files from directory as a merged dictionary."""
+    _not_cacheable(loader)
     mapping: OrderedDict = OrderedDict()
     loc = os.path.join(os.path.dirname(loader.name), node.value)
     for fname in _find_files(loc, "*.yaml"):
@@ -163,6 +269,7 @@ def _include_dir_list_yaml(
     loader: SafeLineLoader, node: yaml.nodes.Node
 ) -> List[JSON_TYPE]:
     """Load multiple files from directory as a list."""
+    _not_cacheable(loader)
     loc = os.path.join(os.path.dirname(loader.name), node.value)
     return [
         load_yaml(f)
@@ -175,6 +282,7 @@ def _include_dir_merge_list_yaml(
     loader: SafeLineLoader, node: yaml.nodes.Node
 ) -> JSON_TYPE:
     """Load multiple files from directory as a merged list."""
+    _not_cacheable(loader)
     loc: str = os.path.join(os.path.dirname(loader.name), node.value)
     merged_list: List[JSON_TYPE] = []
     for fname in _find_files(loc, "*.yaml"):
@@ -198,17 +306,15 @@ def _ordered_dict(loader: SafeLineLoader, node: yaml.nodes.MappingNode) -> Order
         try:
             hash(key)
         except TypeError:
-            fname = getattr(loader.stream, "name", "")
             raise yaml.MarkedYAMLError(
                 context=f'invalid key: "{key}"',
-                context_mark=yaml.Mark(fname, 0, line, -1, None, None),
+                context_mark=yaml.Mark(loader.name, 0, line, -1, None, None),
             )
 
         if key in seen:
-            fname = getattr(loader.stream, "name", "")
             _LOGGER.warning(
                 'YAML file %s contains duplicate key "%s". Check lines %d and %d',
-                fname,
+                loader.name,
                 key,
                 seen[key],
                 line,
@@ -226,6 +332,7 @@ def _construct_seq(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
 
 def _env_var_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> str:
     """Load environment variables and embed it into the configuration YAML."""
+    _not_cacheable(loader)
     args = node.value.split()
 
     # Check for a default value
@@ -266,6 +373,7 @@ def _load_secret_yaml(secret_path: str) -> JSON_TYPE:
 
 def secret_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
     """Load secrets and embed it into the configuration YAML."""
+    _not_cacheable(loader)
     secret_path = os.path.dirname(loader.name)
     while True:
         secrets = _load_secret_yaml(secret_path)
@@ -325,3 +433,5 @@ yaml.SafeLoader.add_constructor("!include_dir_named", _include_dir_named_yaml)
 yaml.SafeLoader.add_constructor(
     "!include_dir_merge_named", _include_dir_merge_named_yaml
 )
+# Share the constructors, constructors added later apply to both loaders
+LOADER.yaml_constructors = yaml.SafeLoader.yaml_constructors
@@ -33,6 +33,91 @@ async def test_api_list_state_entities(hass, mock_api_client):
     assert remote_data == hass.states.async_all()
 
 
+async def test_api_list_states_not_modified(hass, mock_api_client):
+    """Test listing states answers conditional requests."""
+    hass.states.async_set("test.entity", "hello")
+    resp = await mock_api_client.get(const.URL_API_STATES)
+    assert resp.status == 200
+    etag = resp.headers["ETag"]
+    assert etag == f'"{hass.states.revision}"'
+    assert resp.headers["X-HA-Revision"] == str(hass.states.revision)
+
+    resp = await mock_api_client.get(
+        const.URL_API_STATES, headers={"If-None-Match": etag}
+    )
+    assert resp.status == 304
+
+    hass.states.async_set("test.entity", "world")
+    resp = await mock_api_client.get(
+        const.URL_API_STATES, headers={"If-None-Match": etag}
+    )
+    assert resp.status == 200
+    assert resp.headers["ETag"] != etag
+
+
+async def test_api_list_states_since_not_modified(hass, mock_api_client):
+    """Test conditional requests for changes depend on the since revision."""
+    hass.states.async_set("test.entity", "hello")
+    revision = hass.states.revision
+    hass.states.async_set("test.entity", "world")
+
+    resp = await mock_api_client.get(const.URL_API_STATES)
+    full_etag = resp.headers["ETag"]
+
+    resp = await mock_api_client.get(
+        const.URL_API_STATES,
+        params={"since": revision},
+        headers={"If-None-Match": full_etag},
+    )
+    assert resp.status == 200
+    etag = resp.headers["ETag"]
+    assert etag != full_etag
+
+    resp = await mock_api_client.get(
+        const.URL_API_STATES,
+        params={"since": revision - 1},
+        headers={"If-None-Match": etag},
+    )
+    assert resp.status == 200
+
+    resp = await mock_api_client.get(
+        const.URL_API_STATES,
+        params={"since": revision},
+        headers={"If-None-Match": etag},
+    )
+    assert resp.status == 304
+
+
+async def test_api_list_states_since(hass, mock_api_client):
+    """Test listing the states changed since a revision."""
+    hass.states.async_set("test.entity", "hello")
+    hass.states.async_set("test.other", "hello")
+    revision = hass.states.revision
+
+    hass.states.async_set("test.entity", "world")
+    hass.states.async_remove("test.other")
+    resp = await mock_api_client.get(const.URL_API_STATES, params={"since": revision})
+    assert resp.status == 200
+    data = await resp.json()
+    assert data["revision"] == hass.states.revision
+    assert not data["full"]
+    assert [ha.State.from_dict(item) for item in data["changed"]] == [
+        hass.states.get("test.entity")
+    ]
+    assert data["removed"] == ["test.other"]
+
+    resp = await mock_api_client.get(const.URL_API_STATES, params={"since": 1})
+    data = await resp.json()
+    assert data["full"]
+    assert [ha.State.from_dict(item) for item in data["changed"]] == [
+        hass.states.get("test.entity")
+    ]
+    assert data["removed"] == []
+
+    resp = await mock_api_client.get(const.URL_API_STATES, params={"since": "abc"})
+    assert resp.status == 400
+
+
 async def test_api_get_state(hass, mock_api_client):
     """Test if the debug interface allows us to get a state."""
     hass.states.async_set("hello.world", "nice", {"attr": 1})
@@ -127,6 +127,7 @@ async def test_delete_scene(hass, hass_client):
             ]
         },
     )
+    await hass.async_block_till_done()
 
     assert len(ent_reg.entities) == 2
 
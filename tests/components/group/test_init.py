@@ -512,3 +512,74 @@ async def test_group_order(hass):
     assert hass.states.get("group.group_zero").attributes["order"] == 0
     assert hass.states.get("group.group_one").attributes["order"] == 1
     assert hass.states.get("group.group_two").attributes["order"] == 2
+
+
+async def test_groups_with_entity(hass):
+    """Test looking up the groups that contain an entity."""
+    assert await async_setup_component(
+        hass,
+        "group",
+        {
+            "group": {
+                "kitchen": {"entities": "light.Bowl, light.ceiling"},
+                "living": {"entities": "light.bowl"},
+            }
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert group.groups_with_entity(hass, "light.bowl") == [
+        "group.kitchen",
+        "group.living",
+    ]
+    assert group.groups_with_entity(hass, "light.ceiling") == ["group.kitchen"]
+    assert group.groups_with_entity(hass, "light.other") == []
+
+    common.async_set_group(hass, "kitchen", entity_ids=["light.other"])
+    await hass.async_block_till_done()
+
+    assert group.groups_with_entity(hass, "light.bowl") == ["group.living"]
+    assert group.groups_with_entity(hass, "light.ceiling") == []
+    assert group.groups_with_entity(hass, "light.other") == ["group.kitchen"]
+
+    common.async_remove(hass, "living")
+    await hass.async_block_till_done()
+
+    assert group.groups_with_entity(hass, "light.bowl") == []
+
+
+async def test_member_changes_update_counters(hass):
+    """Test member changes update the group without looking up all members."""
+    entity_ids = [f"light.light_{idx}" for idx in range(5)]
+    for entity_id in entity_ids:
+        hass.states.async_set(entity_id, STATE_OFF)
+
+    assert await async_setup_component(
+        hass, "group", {"group": {"lights": {"entities": entity_ids, "all": True}}},
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get("group.lights").state == STATE_OFF
+
+    with patch.object(
+        hass.states, "get", side_effect=AssertionError("Looked up a member")
+    ):
+        for entity_id in entity_ids:
+            hass.states.async_set(entity_id, STATE_ON, {ATTR_ASSUMED_STATE: True})
+            await hass.async_block_till_done()
+
+        group_state = hass.states._states["group.lights"]
+        assert group_state.state == STATE_ON
+        assert group_state.attributes[ATTR_ASSUMED_STATE]
+
+        hass.states.async_set(entity_ids[0], STATE_UNKNOWN)
+        await hass.async_block_till_done()
+
+        group_state = hass.states._states["group.lights"]
+        assert group_state.state == STATE_OFF
+        assert not group_state.attributes.get(ATTR_ASSUMED_STATE)
+
+        hass.states.async_remove(entity_ids[0])
+        await hass.async_block_till_done()
+
+    assert hass.states.get("group.lights").state == STATE_ON
+    assert hass.states.get("group.lights").attributes[ATTR_ASSUMED_STATE]
@@ -18,7 +18,7 @@ from tests.common import (
     init_recorder_component,
     mock_state_change_event,
 )
-from tests.components.recorder.common import wait_recording_done
+from tests.components.recorder.common import trigger_db_commit, wait_recording_done
 
 
 class TestComponentHistory(unittest.TestCase):
@@ -267,6 +267,107 @@ class TestComponentHistory(unittest.TestCase):
 
         assert states == hist
 
+    def test_get_significant_states_with_resolution(self):
+        """Test numeric states are aggregated per bucket of resolution."""
+        self.test_setup()
+        sensor = "sensor.power"
+        switch = "switch.test"
+        zero = dt_util.utcnow()
+
+        for offset, power, switch_state in (
+            (1, "10", "on"),
+            (2, "20", "off"),
+            (3, "unavailable", "on"),
+            (11, "5", "off"),
+            (12, "7", "on"),
+        ):
+            with patch(
+                "homeassistant.components.recorder.dt_util.utcnow",
+                return_value=zero + timedelta(seconds=offset),
+            ):
+                self.hass.states.set(sensor, power)
+                self.hass.states.set(switch, switch_state)
+                wait_recording_done(self.hass)
+
+        hist = history.get_significant_states(
+            self.hass,
+            zero,
+            zero + timedelta(seconds=20),
+            filters=history.Filters(),
+            resolution=timedelta(seconds=10),
+        )
+
+        assert hist[sensor][0].state == "10"
+        assert hist[sensor][1:] == [
+            {
+                "state": 15.0,
+                "min": 10.0,
+                "max": 20.0,
+                "last_changed": zero.isoformat(),
+            },
+            {
+                "state": (5.0 * 1 + 7.0 * 8) / 9,
+                "min": 5.0,
+                "max": 7.0,
+                "last_changed": (zero + timedelta(seconds=10)).isoformat(),
+            },
+        ]
+        # Non numeric entities keep all their changes
+        assert [state.state for state in hist[switch]] == [
+            "on",
+            "off",
+            "on",
+            "off",
+            "on",
+        ]
+
+    def test_get_significant_states_with_resolution_weighted(self):
+        """Test the mean of a bucket is weighted by how long values lasted."""
+        self.test_setup()
+        sensor = "sensor.power"
+        # The first state must be recorded after the recorder run started
+        zero = dt_util.utcnow() + timedelta(seconds=10)
+
+        for offset, power in ((-5, "10"), (5, "20"), (11, "30"), (35, "40")):
+            with patch(
+                "homeassistant.components.recorder.dt_util.utcnow",
+                return_value=zero + timedelta(seconds=offset),
+            ):
+                self.hass.states.set(sensor, power)
+                wait_recording_done(self.hass)
+
+        hist = history.get_significant_states(
+            self.hass,
+            zero,
+            zero + timedelta(seconds=40),
+            filters=history.Filters(),
+            resolution=timedelta(seconds=10),
+        )
+
+        # The state at the start time counts once, until the first change
+        assert hist[sensor][0].state == "10"
+        assert hist[sensor][1:] == [
+            {
+                "state": 15.0,
+                "min": 10.0,
+                "max": 20.0,
+                "last_changed": zero.isoformat(),
+            },
+            {
+                "state": (20.0 * 1 + 30.0 * 9) / 10,
+                "min": 20.0,
+                "max": 30.0,
+                "last_changed": (zero + timedelta(seconds=10)).isoformat(),
+            },
+            # 30 lasted through the bucket without a change
+            {
+                "state": 35.0,
+                "min": 30.0,
+                "max": 40.0,
+                "last_changed": (zero + timedelta(seconds=30)).isoformat(),
+            },
+        ]
+
     def test_get_significant_states_with_initial(self):
         """Test that only significant states are returned.
 
@@ -792,6 +893,43 @@ async def test_fetch_period_api_with_minimal_response(hass, hass_client):
     assert response.status == 200
 
 
+async def test_fetch_period_api_with_resolution(hass, hass_client):
+    """Test the fetch period view for history with a resolution."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    hass.states.async_set("sensor.power", "10")
+    hass.states.async_set("sensor.power", "30")
+    await hass.async_add_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await hass_client()
+    start = dt_util.utcnow() - timedelta(minutes=1)
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}",
+        params={"filter_entity_id": "sensor.power", "resolution": "3600"},
+    )
+    assert response.status == 200
+    response_json = await response.json()
+    assert response_json[0][0]["state"] == "10"
+    assert response_json[0][1]["min"] == 10.0
+    assert response_json[0][1]["max"] == 30.0
+    # 10 only lasted until 30 was set
+    assert 20.0 < response_json[0][1]["state"] <= 30.0
+
+
+async def test_fetch_period_api_with_invalid_resolution(hass, hass_client):
+    """Test the fetch period view for history with an invalid resolution."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await hass_client()
+    for resolution in ("abc", "0", "-10"):
+        response = await client.get(
+            "/api/history/period", params={"resolution": resolution}
+        )
+        assert response.status == 400
+
+
 async def test_fetch_period_api_with_no_timestamp(hass, hass_client):
     """Test the fetch period view for history with no timestamp."""
     await hass.async_add_executor_job(init_recorder_component, hass)
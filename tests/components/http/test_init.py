@@ -1,14 +1,17 @@
 """The tests for the Home Assistant HTTP component."""
 from ipaddress import ip_network
 import logging
+import threading
 
 import pytest
 
 import homeassistant.components.http as http
+from homeassistant.const import EVENT_HOMEASSISTANT_START
 from homeassistant.setup import async_setup_component
 from homeassistant.util.ssl import server_context_intermediate, server_context_modern
 
 from tests.async_mock import Mock, patch
+from tests.common import mock_coro
 
 
 @pytest.fixture
@@ -61,6 +64,32 @@ async def test_registering_view_while_running(
     hass.http.register_view(TestView)
 
 
+async def test_precompressed_static_path_builds_on_start(hass, tmp_path):
+    """Test compressed variants are scheduled from the event loop on start."""
+    await async_setup_component(hass, http.DOMAIN, {http.DOMAIN: {}})
+    create_task = hass.async_create_task
+    threads = []
+
+    def mock_create_task(target):
+        threads.append(threading.get_ident())
+        return create_task(target)
+
+    with patch(
+        "homeassistant.components.http.PrecompressedStaticResource."
+        "async_build_compressed_variants",
+        return_value=mock_coro(),
+    ) as mock_build, patch.object(
+        hass, "async_create_task", side_effect=mock_create_task
+    ):
+        hass.http.register_static_path("/static", str(tmp_path), precompressed=True)
+        hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+        await hass.async_block_till_done()
+
+    assert len(mock_build.mock_calls) == 1
+    assert threading.get_ident() in threads
+    assert all(thread == threading.get_ident() for thread in threads)
+
+
 def test_api_base_url_with_domain(mock_stack):
     """Test setting API URL with domain."""
     api_config = http.ApiConfig("127.0.0.1", "example.com")
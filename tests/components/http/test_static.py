@@ -0,0 +1,122 @@
+"""The tests for static file handling of the HTTP component."""
+import gzip
+import mimetypes
+
+from aiohttp import web
+from aiohttp.hdrs import (
+    ACCEPT_ENCODING,
+    CACHE_CONTROL,
+    CONTENT_ENCODING,
+    CONTENT_TYPE,
+    ETAG,
+    IF_NONE_MATCH,
+    VARY,
+)
+import pytest
+
+from homeassistant.components.http.static import (
+    CachingStaticResource,
+    PrecompressedStaticResource,
+    build_compressed_variants,
+)
+
+from tests.async_mock import patch
+
+APP_JS = b"console.log('Home Assistant');\n" * 100
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    """Create a directory of static files."""
+    (tmp_path / "app.js").write_bytes(APP_JS)
+    (tmp_path / "small.js").write_bytes(b"1;")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG" * 1000)
+    (tmp_path / "sub").mkdir()
+    return tmp_path
+
+
+def test_build_compressed_variants(static_dir):
+    """Test compressed siblings are built for compressible files only."""
+    assert build_compressed_variants(static_dir) == 1
+    assert gzip.decompress((static_dir / "app.js.gz").read_bytes()) == APP_JS
+    assert not (static_dir / "small.js.gz").exists()
+    assert not (static_dir / "image.png.gz").exists()
+
+    # Up to date siblings are kept
+    assert build_compressed_variants(static_dir) == 0
+
+
+async def test_precompressed_static(hass, aiohttp_client, static_dir):
+    """Test serving precompressed files with ETags."""
+    app = web.Application()
+    resource = PrecompressedStaticResource("/static", str(static_dir))
+    app.router.register_resource(resource)
+    client = await aiohttp_client(app)
+
+    resp = await client.get("/static/app.js", headers={ACCEPT_ENCODING: "identity"})
+    assert resp.status == 200
+    assert await resp.read() == APP_JS
+    assert resp.headers[CONTENT_TYPE] == mimetypes.guess_type("app.js")[0]
+    assert resp.headers[CACHE_CONTROL].startswith("public")
+    assert VARY not in resp.headers
+
+    await resource.async_build_compressed_variants()
+
+    resp = await client.get("/static/app.js", headers={ACCEPT_ENCODING: "identity"})
+    assert resp.status == 200
+    assert await resp.read() == APP_JS
+    assert resp.headers[VARY] == ACCEPT_ENCODING
+    plain_etag = resp.headers[ETAG]
+
+    with patch("pathlib.Path.stat", side_effect=AssertionError("Stat on request")):
+        resp = await client.get(
+            "/static/app.js", headers={ACCEPT_ENCODING: "gzip, deflate"}
+        )
+        assert resp.status == 200
+        assert resp.headers[CONTENT_ENCODING] == "gzip"
+        assert resp.headers[CONTENT_TYPE] == mimetypes.guess_type("app.js")[0]
+        assert await resp.read() == APP_JS
+        gzip_etag = resp.headers[ETAG]
+        assert gzip_etag != plain_etag
+
+        resp = await client.get(
+            "/static/app.js",
+            headers={ACCEPT_ENCODING: "gzip", IF_NONE_MATCH: gzip_etag},
+        )
+        assert resp.status == 304
+        assert resp.headers[ETAG] == gzip_etag
+
+        resp = await client.get(
+            "/static/app.js",
+            headers={ACCEPT_ENCODING: "gzip;q=0", IF_NONE_MATCH: gzip_etag},
+        )
+        assert resp.status == 200
+        assert CONTENT_ENCODING not in resp.headers
+        assert resp.headers[ETAG] == plain_etag
+
+    resp = await client.get("/static/missing.js")
+    assert resp.status == 404
+
+    resp = await client.get("/static/sub")
+    assert resp.status == 403
+
+    resp = await client.get("/static/../app.js")
+    assert resp.status == 404
+
+
+async def test_caching_static(hass, aiohttp_client, static_dir):
+    """Test serving static files with cache headers."""
+    app = web.Application()
+    app.router.register_resource(CachingStaticResource("/static", str(static_dir)))
+    client = await aiohttp_client(app)
+
+    resp = await client.get("/static/app.js")
+    assert resp.status == 200
+    assert await resp.read() == APP_JS
+    assert resp.headers[CACHE_CONTROL].startswith("public")
+
+    resp = await client.get("/static/missing.js")
+    assert resp.status == 404
+
+    resp = await client.get("/static/sub")
+    assert resp.status == 403
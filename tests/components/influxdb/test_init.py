@@ -1,6 +1,8 @@
 """The tests for the InfluxDB component."""
+import asyncio
 from dataclasses import dataclass
 import datetime
+import threading
 
 import pytest
 
@@ -1469,3 +1471,248 @@ async def test_invalid_inputs_error(
             == 1
         )
         sleep.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "mock_client, config_ext, get_write_api, get_mock_call",
+    [
+        (
+            influxdb.DEFAULT_API_VERSION,
+            BASE_V1_CONFIG,
+            _get_write_api_mock_v1,
+            influxdb.DEFAULT_API_VERSION,
+        ),
+        (
+            influxdb.API_VERSION_2,
+            BASE_V2_CONFIG,
+            _get_write_api_mock_v2,
+            influxdb.API_VERSION_2,
+        ),
+    ],
+    indirect=["mock_client", "get_mock_call"],
+)
+async def test_event_listener_queue_full(
+    hass, caplog, mock_client, config_ext, get_write_api, get_mock_call
+):
+    """Test the event listener drops new events while the queue is full."""
+    with patch(f"{INFLUX_PATH}.QUEUE_MAX_SIZE", 1):
+        handler_method = await _setup(hass, mock_client, config_ext, get_write_api)
+
+    state = MagicMock(
+        state=1,
+        domain="fake",
+        entity_id="fake.something",
+        object_id="something",
+        attributes={},
+    )
+    event = MagicMock(data={"new_state": state}, time_fired=12345)
+
+    writing = threading.Event()
+    resume = threading.Event()
+
+    def slow_write(*args, **kwargs):
+        """Block the writer thread until the test resumes it."""
+        writing.set()
+        assert resume.wait(5)
+
+    write_api = get_write_api(mock_client)
+    write_api.side_effect = slow_write
+    instance = hass.data[influxdb.DOMAIN]
+
+    handler_method(event)
+    assert writing.wait(5)
+    handler_method(event)
+    assert instance.queue_depth == 1
+    handler_method(event)
+    handler_method(event)
+    assert instance.dropped == 2
+    assert caplog.text.count("Queue is full") == 1
+
+    resume.set()
+    instance.block_till_done()
+    assert write_api.call_count == 2
+    assert instance.queue_depth == 0
+    assert instance.write_latency is not None
+
+
+async def test_adapt_batch_size(hass):
+    """Test the batch size follows the write latency and the backlog."""
+    instance = influxdb.InfluxThread(hass, Mock(), Mock(), 0)
+    assert instance.batch_size == influxdb.BATCH_BUFFER_SIZE
+
+    # Fast writes without a backlog keep the batch size
+    instance.write_latency = 0.01
+    instance.adapt_batch_size()
+    assert instance.batch_size == influxdb.BATCH_BUFFER_SIZE
+
+    # Fast writes with a backlog grow the batches up to a limit
+    for _ in range(influxdb.BATCH_BUFFER_SIZE_MAX):
+        instance.queue.put_nowait(None)
+    instance.adapt_batch_size()
+    assert instance.batch_size == 2 * influxdb.BATCH_BUFFER_SIZE
+    for _ in range(10):
+        instance.adapt_batch_size()
+    assert instance.batch_size == influxdb.BATCH_BUFFER_SIZE_MAX
+
+    # Slow writes shrink the batches down to a limit
+    instance.write_latency = influxdb.BATCH_WRITE_LATENCY_TARGET * 2
+    instance.adapt_batch_size()
+    assert instance.batch_size == influxdb.BATCH_BUFFER_SIZE_MAX // 2
+    for _ in range(10):
+        instance.adapt_batch_size()
+    assert instance.batch_size == influxdb.BATCH_BUFFER_SIZE_MIN
+
+
+@pytest.mark.parametrize(
+    "mock_client, config_ext, get_write_api, get_mock_call",
+    [
+        (
+            influxdb.DEFAULT_API_VERSION,
+            BASE_V1_CONFIG,
+            _get_write_api_mock_v1,
+            influxdb.DEFAULT_API_VERSION,
+        ),
+        (
+            influxdb.API_VERSION_2,
+            BASE_V2_CONFIG,
+            _get_write_api_mock_v2,
+            influxdb.API_VERSION_2,
+        ),
+    ],
+    indirect=["mock_client", "get_mock_call"],
+)
+async def test_writer_metrics(
+    hass, mock_client, config_ext, get_write_api, get_mock_call
+):
+    """Test the writer thread statistics are exposed as sensors."""
+    config = {"writer_metrics": True}
+    config.update(config_ext)
+    handler_method = await _setup(hass, mock_client, config, get_write_api)
+
+    assert hass.states.get("sensor.influxdb_queue_depth").state == "0"
+    assert hass.states.get("sensor.influxdb_dropped_events").state == "0"
+    latency = hass.states.get("sensor.influxdb_write_latency")
+    assert latency.state == "unknown"
+    assert latency.attributes["unit_of_measurement"] == "s"
+
+    state = MagicMock(
+        state=1,
+        domain="fake",
+        entity_id="fake.something",
+        object_id="something",
+        attributes={},
+    )
+    handler_method(MagicMock(data={"new_state": state}, time_fired=12345))
+    hass.data[influxdb.DOMAIN].block_till_done()
+
+    await hass.helpers.entity_component.async_update_entity(
+        "sensor.influxdb_write_latency"
+    )
+    assert float(hass.states.get("sensor.influxdb_write_latency").state) >= 0
+
+
+@pytest.mark.parametrize(
+    "mock_client, config_ext, get_write_api, get_mock_call",
+    [
+        (
+            influxdb.DEFAULT_API_VERSION,
+            BASE_V1_CONFIG,
+            _get_write_api_mock_v1,
+            influxdb.DEFAULT_API_VERSION,
+        ),
+        (
+            influxdb.API_VERSION_2,
+            BASE_V2_CONFIG,
+            _get_write_api_mock_v2,
+            influxdb.API_VERSION_2,
+        ),
+    ],
+    indirect=["mock_client", "get_mock_call"],
+)
+async def test_failed_write_shrinks_batch(
+    hass, mock_client, config_ext, get_write_api, get_mock_call
+):
+    """Test a failed write shrinks the batches of the retry."""
+    config = {"max_retries": 1}
+    config.update(config_ext)
+    await _setup(hass, mock_client, config, get_write_api)
+    instance = hass.data[influxdb.DOMAIN]
+    instance.batch_size = 40
+
+    write_api = get_write_api(mock_client)
+    write_api.side_effect = [IOError("timeout"), None, None]
+    points = [{"measurement": "test", "fields": {"value": i}} for i in range(40)]
+
+    with patch.object(influxdb.time, "sleep") as mock_sleep:
+        await hass.async_add_executor_job(instance.write_to_influxdb, points)
+
+    assert mock_sleep.call_count == 1
+    assert instance.batch_size == 20
+    assert instance.write_latency is not None
+    assert write_api.call_args_list == [
+        get_mock_call(points),
+        get_mock_call(points[:20]),
+        get_mock_call(points[20:]),
+    ]
+
+
+@pytest.mark.parametrize(
+    "mock_client, config_ext, get_write_api, get_mock_call",
+    [
+        (
+            influxdb.DEFAULT_API_VERSION,
+            BASE_V1_CONFIG,
+            _get_write_api_mock_v1,
+            influxdb.DEFAULT_API_VERSION,
+        )
+    ],
+    indirect=["mock_client", "get_mock_call"],
+)
+async def test_shutdown_with_full_queue(
+    hass, mock_client, config_ext, get_write_api, get_mock_call
+):
+    """Test shutting down does not wait for room in a full queue."""
+    with patch(f"{INFLUX_PATH}.QUEUE_MAX_SIZE", 1), patch.object(
+        hass.bus, "listen_once"
+    ) as mock_listen_once:
+        handler_method = await _setup(hass, mock_client, config_ext, get_write_api)
+    shutdown = mock_listen_once.call_args[0][1]
+
+    state = MagicMock(
+        state=1,
+        domain="fake",
+        entity_id="fake.something",
+        object_id="something",
+        attributes={},
+    )
+    event = MagicMock(data={"new_state": state}, time_fired=12345)
+
+    writing = threading.Event()
+    resume = threading.Event()
+
+    def slow_write(*args, **kwargs):
+        """Block the writer thread until the test resumes it."""
+        writing.set()
+        assert resume.wait(5)
+
+    write_api = get_write_api(mock_client)
+    write_api.side_effect = slow_write
+    instance = hass.data[influxdb.DOMAIN]
+
+    handler_method(event)
+    assert writing.wait(5)
+    handler_method(event)
+    assert instance.queue_depth == 1
+
+    shutdown_thread = threading.Thread(target=shutdown, args=(None,))
+    shutdown_thread.start()
+    for _ in range(50):
+        if instance.shutdown:
+            break
+        await asyncio.sleep(0.1)
+    assert instance.shutdown
+
+    resume.set()
+    shutdown_thread.join(5)
+    assert not shutdown_thread.is_alive()
+    assert not instance.is_alive()
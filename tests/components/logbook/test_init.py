@@ -6,8 +6,10 @@ import json
 import logging
 import unittest
 
+import aiohttp
 import pytest
 import voluptuous as vol
+from yarl import URL
 
 from homeassistant.components import logbook, recorder, sun
 from homeassistant.components.alexa.smart_home import EVENT_ALEXA_SMART_HOME
@@ -90,6 +92,7 @@ class TestComponentLogbook(unittest.TestCase):
         # Logbook entry service call results in firing an event.
         # Our service call will unblock when the event listeners have been
         # scheduled. This means that they may not have been processed yet.
+        trigger_db_commit(self.hass)
         self.hass.block_till_done()
         self.hass.data[recorder.DATA_INSTANCE].block_till_done()
 
@@ -164,6 +167,27 @@ class TestComponentLogbook(unittest.TestCase):
             entries[1], pointC, "bla", domain="sensor", entity_id=entity_id
         )
 
+    def test_humanify_sensor_groups_of_other_hours(self):
+        """Test sensor values in the same minutes of other hours are not grouped."""
+        entity_id = "sensor.bla"
+
+        pointA = dt_util.utcnow().replace(hour=10, minute=2)
+        pointB = pointA + timedelta(hours=1)
+        entity_attr_cache = logbook.EntityAttributeCache(self.hass)
+
+        eventA = self.create_state_changed_event(pointA, entity_id, 10)
+        eventB = self.create_state_changed_event(pointB, entity_id, 20)
+
+        entries = list(logbook.humanify(self.hass, (eventA, eventB), entity_attr_cache))
+
+        assert len(entries) == 2
+        self.assert_entry(
+            entries[0], pointA, "bla", domain="sensor", entity_id=entity_id
+        )
+        self.assert_entry(
+            entries[1], pointB, "bla", domain="sensor", entity_id=entity_id
+        )
+
     def test_exclude_events_entity(self):
         """Test if events are filtered if entity is excluded in config."""
         entity_id = "sensor.bla"
@@ -1328,6 +1352,7 @@ class TestComponentLogbook(unittest.TestCase):
                 "entity_id"
                 "domain"
                 "attributes"
+                "shared_attrs"
                 "state_id",
                 "old_state_id",
             ],
@@ -1335,7 +1360,8 @@ class TestComponentLogbook(unittest.TestCase):
 
         row.event_type = EVENT_STATE_CHANGED
         row.event_data = "{}"
-        row.attributes = attributes_json
+        row.attributes = None
+        row.shared_attrs = attributes_json
         row.time_fired = event_time_fired
         row.state = new_state and new_state.get("state")
         row.entity_id = entity_id
@@ -1466,6 +1492,7 @@ async def test_logbook_describe_event(hass, hass_client):
         return_value=dt_util.utcnow() - timedelta(seconds=5),
     ):
         hass.bus.async_fire("some_event")
+        await hass.async_add_job(trigger_db_commit, hass)
         await hass.async_block_till_done()
         await hass.async_add_executor_job(
             hass.data[recorder.DATA_INSTANCE].block_till_done
@@ -1534,6 +1561,7 @@ async def test_exclude_described_event(hass, hass_client):
         hass.bus.async_fire(
             "some_event", {logbook.ATTR_NAME: name, logbook.ATTR_ENTITY_ID: entity_id3}
         )
+        await hass.async_add_job(trigger_db_commit, hass)
         await hass.async_block_till_done()
         await hass.async_add_executor_job(
             hass.data[recorder.DATA_INSTANCE].block_till_done
@@ -1720,6 +1748,135 @@ async def test_filter_continuous_sensor_values(hass, hass_client):
     assert response_json[1]["entity_id"] == entity_id_third
 
 
+async def test_logbook_view_stream(hass, hass_client):
+    """Test the logbook streams its entries in chunks."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    for state in (STATE_OFF, STATE_ON, STATE_OFF, STATE_ON):
+        hass.states.async_set("switch.test", state)
+
+    await hass.async_add_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+
+    start = dt_util.utcnow().date()
+    start_date = datetime(start.year, start.month, start.day)
+
+    for chunk_size in (1, 2, 3):
+        with patch.object(logbook, "STREAM_CHUNK_SIZE", chunk_size):
+            response = await client.get(f"/api/logbook/{start_date.isoformat()}")
+        assert response.status == 200
+        assert response.headers["Transfer-Encoding"] == "chunked"
+        response_json = await response.json()
+        assert [entry["message"] for entry in response_json] == [
+            "turned on",
+            "turned off",
+            "turned on",
+        ]
+
+
+async def test_logbook_view_stream_error(hass, hass_client, caplog):
+    """Test an error while streaming does not end the response as complete."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+
+    def failing_humanify(*args):
+        """Fail after the first entry."""
+        yield {"message": "turned on"}
+        raise ValueError("broken entry")
+
+    start = dt_util.utcnow().date()
+    start_date = datetime(start.year, start.month, start.day)
+    with patch.object(logbook, "STREAM_CHUNK_SIZE", 1), patch.object(
+        logbook, "humanify", failing_humanify
+    ):
+        response = await client.get(f"/api/logbook/{start_date.isoformat()}")
+        assert response.status == 200
+        with pytest.raises(aiohttp.ClientPayloadError):
+            await response.read()
+
+    assert "Error streaming logbook entries" in caplog.text
+
+
+async def test_logbook_view_pages(hass, hass_client):
+    """Test the logbook pages do not split groups of events."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        days=1
+    )
+    for minute, entity_id, state in (
+        (0, "switch.test", STATE_OFF),
+        (0, "sensor.temperature", "20"),
+        (1, "switch.test", STATE_ON),
+        (2, "sensor.temperature", "21"),
+        (3, "sensor.temperature", "22"),
+        (20, "switch.test", STATE_OFF),
+        (40, "switch.test", STATE_ON),
+    ):
+        with patch(
+            "homeassistant.core.dt_util.utcnow",
+            return_value=start + timedelta(minutes=minute),
+        ):
+            hass.states.async_set(entity_id, state)
+
+    await hass.async_add_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+
+    pages = []
+    url = f"/api/logbook/{start.isoformat()}"
+    params = {"end_time": (start + timedelta(hours=1)).isoformat(), "limit": 1}
+    while url is not None:
+        response = await client.get(url, params=params)
+        assert response.status == 200
+        pages.append(
+            [(entry["entity_id"], entry["message"]) for entry in await response.json()]
+        )
+        url = params = None
+        if "Link" in response.headers:
+            link = response.headers["Link"]
+            assert link.endswith('>; rel="next"')
+            url = str(URL(link[1 : -len('>; rel="next"')]).relative())
+
+    assert pages == [
+        [
+            ("switch.test", "turned on"),
+            # Only the last sensor state of the group
+            ("sensor.temperature", "changed to 22"),
+        ],
+        [("switch.test", "turned off")],
+        [("switch.test", "turned on")],
+    ]
+
+
+async def test_logbook_view_invalid_page(hass, hass_client):
+    """Test the logbook rejects invalid pages."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+
+    response = await client.get("/api/logbook", params={"limit": "0"})
+    assert response.status == 400
+    response = await client.get("/api/logbook", params={"limit": "many"})
+    assert response.status == 400
+    response = await client.get("/api/logbook", params={"after": "yesterday"})
+    assert response.status == 400
+
+
 async def test_exclude_new_entities(hass, hass_client):
     """Test if events are excluded on first update."""
     await hass.async_add_executor_job(init_recorder_component, hass)
@@ -0,0 +1,66 @@
+"""The tests for the MQTT topic trie."""
+import pytest
+
+from homeassistant.components.mqtt.trie import TopicTrie
+
+
+def test_match_exact_and_wildcards():
+    """Test matching topics against plain and wildcard filters."""
+    trie = TopicTrie()
+    trie.add("home/kitchen/temperature", "exact")
+    trie.add("home/+/temperature", "level")
+    trie.add("home/#", "subtree")
+    trie.add("#", "all")
+    trie.add("office/+", "other")
+
+    assert trie.match("home/kitchen/temperature") == [
+        "exact",
+        "level",
+        "subtree",
+        "all",
+    ]
+    assert trie.match("home/bedroom/temperature") == ["level", "subtree", "all"]
+    assert trie.match("home") == ["subtree", "all"]
+    assert trie.match("home/kitchen/humidity") == ["subtree", "all"]
+    assert trie.match("office/desk/lamp") == ["all"]
+    assert trie.match("office/desk") == ["all", "other"]
+
+
+def test_match_sys_topics():
+    """Test wildcards at the root level do not match $ topics."""
+    trie = TopicTrie()
+    trie.add("#", "all")
+    trie.add("+/broker", "level")
+    trie.add("$SYS/#", "sys")
+
+    assert trie.match("$SYS/broker") == ["sys"]
+    assert trie.match("normal/broker") == ["all", "level"]
+
+
+def test_add_remove():
+    """Test adding and removing values for the same filter."""
+    trie = TopicTrie()
+    trie.add("test/+", "one")
+    trie.add("test/+", "two")
+    trie.add("test/topic", "three")
+    assert len(trie) == 3
+    assert list(trie) == ["one", "two", "three"]
+
+    trie.remove("test/+", "one")
+    assert trie.has_filter("test/+")
+    assert trie.match("test/topic") == ["two", "three"]
+
+    trie.remove("test/+", "two")
+    assert not trie.has_filter("test/+")
+    assert trie.match("test/topic") == ["three"]
+
+    trie.remove("test/topic", "three")
+    assert len(trie) == 0
+    assert trie.match("test/topic") == []
+    assert not trie.has_filter("test")
+
+    with pytest.raises(KeyError):
+        trie.remove("test/topic", "three")
+
+    with pytest.raises(KeyError):
+        trie.remove("unknown/topic", "three")
@@ -31,9 +31,11 @@ class FilterTest:
     should_pass: bool
 
 
-async def prometheus_client(hass, hass_client):
+async def prometheus_client(hass, hass_client, config=None):
     """Initialize an hass_client with Prometheus component."""
-    await async_setup_component(hass, prometheus.DOMAIN, {prometheus.DOMAIN: {}})
+    await async_setup_component(
+        hass, prometheus.DOMAIN, {prometheus.DOMAIN: config or {}}
+    )
 
     await async_setup_component(hass, sensor.DOMAIN, {"sensor": [{"platform": "demo"}]})
 
@@ -91,9 +93,10 @@ async def prometheus_client(hass, hass_client):
     return await hass_client()
 
 
-async def test_view(hass, hass_client):
+@pytest.mark.parametrize("config", [{}, {"collect_on_scrape": True}])
+async def test_view(hass, hass_client, config):
     """Test prometheus metrics view."""
-    client = await prometheus_client(hass, hass_client)
+    client = await prometheus_client(hass, hass_client, config)
     resp = await client.get(prometheus.API_ENDPOINT)
 
     assert resp.status == 200
@@ -201,6 +204,37 @@ async def test_view(hass, hass_client):
     )
 
 
+async def test_view_gzip_and_cache(hass, hass_client):
+    """Test the metrics are gzipped and cached for concurrent scrapers."""
+    client = await prometheus_client(
+        hass,
+        hass_client,
+        {"collect_on_scrape": True, "gzip": True, "cache_time": 3600},
+    )
+    hass.states.async_set("sensor.power", "5", {"unit_of_measurement": "W"})
+
+    resp = await client.get(prometheus.API_ENDPOINT)
+    assert resp.status == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    body = await resp.text()
+    assert (
+        'sensor_unit_w{domain="sensor",entity="sensor.power",friendly_name="None"} 5.0'
+        in body
+    )
+    assert (
+        'state_change_total{domain="sensor",entity="sensor.power",'
+        'friendly_name="None"} 1.0' in body
+    )
+
+    hass.states.async_set("sensor.power", "6", {"unit_of_measurement": "W"})
+
+    resp = await client.get(
+        prometheus.API_ENDPOINT, headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in resp.headers
+    assert await resp.text() == body
+
+
 @pytest.fixture(name="mock_client")
 def mock_client_fixture():
     """Mock the prometheus client."""
@@ -4,19 +4,31 @@ from datetime import datetime, timedelta
 import unittest
 
 import pytest
+from sqlalchemy import event as sqlalchemy_event
 
 from homeassistant.components.recorder import (
     CONFIG_SCHEMA,
     DOMAIN,
     Recorder,
+    TimerTick,
     run_information,
     run_information_from_instance,
     run_information_with_session,
 )
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
-from homeassistant.components.recorder.util import session_scope
-from homeassistant.const import MATCH_ALL, STATE_LOCKED, STATE_UNLOCKED
+from homeassistant.components.recorder.models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+)
+from homeassistant.components.recorder.util import execute, session_scope
+from homeassistant.const import (
+    EVENT_TIME_CHANGED,
+    MATCH_ALL,
+    STATE_LOCKED,
+    STATE_UNLOCKED,
+)
 from homeassistant.core import Context, callback
 from homeassistant.setup import async_setup_component
 from homeassistant.util import dt as dt_util
@@ -131,6 +143,7 @@ def _add_entities(hass, entity_ids):
 
 
 def _add_events(hass, events):
+    wait_recording_done(hass)
     with session_scope(hass=hass) as session:
         session.query(Events).delete(synchronize_session=False)
     for event_type in events:
@@ -382,6 +395,197 @@ def test_saving_sets_old_state(hass_recorder):
         assert states[3].old_state_id == states[1].state_id
 
 
+def test_saving_sets_old_state_in_same_commit(hass_recorder):
+    """Test saving sets old state for states written in the same commit."""
+    hass = hass_recorder({"commit_interval": 30})
+
+    hass.states.set("test.one", "on", {})
+    hass.states.set("test.one", "off", {})
+    hass.states.set("test.one", "on", {})
+    hass.states.remove("test.one")
+    hass.states.set("test.one", "off", {})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States).order_by(States.last_updated))
+        assert len(states) == 5
+        assert all(state.event_id for state in states)
+
+        assert states[0].old_state_id is None
+        assert states[1].old_state_id == states[0].state_id
+        assert states[2].old_state_id == states[1].state_id
+        assert states[3].old_state_id == states[2].state_id
+        assert states[3].state is None
+        assert states[4].old_state_id is None
+
+    hass.states.set("test.one", "on", {})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States).order_by(States.last_updated))
+        assert len(states) == 6
+        assert states[5].old_state_id == states[4].state_id
+
+
+def test_saving_states_inserts_in_batches(hass_recorder):
+    """Test the rows of a commit are inserted with one statement per table."""
+    hass = hass_recorder()
+    hass.states.set("test.one", "on", {})
+    wait_recording_done(hass)
+
+    statements = []
+
+    def count_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            statements.append((statement.split(" ")[2], executemany))
+
+    engine = hass.data[DATA_INSTANCE].engine
+    sqlalchemy_event.listen(engine, "before_cursor_execute", count_insert)
+    try:
+        for value in range(5):
+            hass.states.set("test.one", value, {"value": value})
+            hass.states.set("test.two", value, {"value": value})
+        wait_recording_done(hass)
+    finally:
+        sqlalchemy_event.remove(engine, "before_cursor_execute", count_insert)
+
+    assert sorted(statements) == [
+        ("events", True),
+        ("state_attributes", True),
+        ("states", True),
+    ]
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States).order_by(States.state_id))
+        assert len(states) == 11
+        assert all(state.event_id for state in states)
+        assert states[1].old_state_id == states[0].state_id
+        assert states[3].old_state_id == states[1].state_id
+        assert states[10].old_state_id == states[8].state_id
+        assert states[10].to_native().attributes == {"value": 4}
+
+
+def test_saving_states_without_explicit_ids(hass_recorder):
+    """Test states are linked on databases that generate all ids."""
+    with patch("homeassistant.components.recorder.EXPLICIT_ID_DIALECTS", ()):
+        hass = hass_recorder({"commit_interval": 30})
+
+    hass.states.set("test.one", "on", {"value": 1})
+    hass.states.set("test.one", "off", {"value": 1})
+    wait_recording_done(hass)
+    hass.states.set("test.one", "on", {})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States).order_by(States.state_id))
+        assert len(states) == 3
+        assert all(state.event_id for state in states)
+        assert states[1].old_state_id == states[0].state_id
+        assert states[2].old_state_id == states[1].state_id
+        assert states[1].attributes_id == states[0].attributes_id
+        assert states[2].to_native().attributes == {}
+
+
+def test_saving_state_deduplicates_attributes(hass_recorder):
+    """Test states with the same attributes share one attributes row."""
+    hass = hass_recorder()
+    attributes = {"brightness": 255, "friendly_name": "Kitchen"}
+
+    hass.states.set("light.kitchen", "on", attributes)
+    hass.states.set("light.kitchen", "off", attributes)
+    hass.states.set("light.hallway", "on", attributes)
+    wait_recording_done(hass)
+
+    hass.states.set("light.kitchen", "on", attributes)
+    hass.states.set("light.kitchen", "on", {"brightness": 10})
+    wait_recording_done(hass)
+
+    # Attributes that are no longer cached are looked up in the database
+    hass.data[DATA_INSTANCE].state_attributes_ids.clear()
+    hass.states.set("light.hallway", "off", attributes)
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States).order_by(States.state_id))
+        assert len(states) == 6
+        assert all(state.attributes is None for state in states)
+        assert states[0].attributes_id is not None
+        assert states[4].attributes_id != states[0].attributes_id
+        assert {state.attributes_id for state in states} == {
+            states[0].attributes_id,
+            states[4].attributes_id,
+        }
+        assert session.query(StateAttributes).count() == 2
+        assert states[0].to_native().attributes == attributes
+        assert states[4].to_native().attributes == {"brightness": 10}
+
+
+def test_saving_state_attributes_of_other_types(hass_recorder):
+    """Test attributes equal to the previous ones but of other types are saved."""
+    hass = hass_recorder()
+
+    hass.states.set("sensor.power", "on", {"value": 1})
+    hass.states.set("sensor.power", "off", {"value": True})
+    hass.states.set("sensor.power", "on", {"value": 1.0})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States).order_by(States.state_id))
+        assert [state.to_native().attributes for state in states] == [
+            {"value": 1},
+            {"value": True},
+            {"value": 1.0},
+        ]
+        assert [type(state.to_native().attributes["value"]) for state in states] == [
+            int,
+            bool,
+            float,
+        ]
+
+
+def test_states_to_native_loads_attributes_with_states(hass_recorder):
+    """Test converting queried states does not query attributes per row."""
+    hass = hass_recorder()
+    for brightness in range(5):
+        hass.states.set("light.kitchen", "on", {"brightness": brightness})
+    wait_recording_done(hass)
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = hass.data[DATA_INSTANCE].engine
+    sqlalchemy_event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        with session_scope(hass=hass) as session:
+            query = session.query(States).filter(States.entity_id == "light.kitchen")
+            states = execute(query, to_native=True)
+    finally:
+        sqlalchemy_event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert [state.attributes["brightness"] for state in states] == list(range(5))
+    assert len(statements) == 1
+
+
+def test_saving_state_has_unit_of_measurement(hass_recorder):
+    """Test states with a unit of measurement are flagged."""
+    hass = hass_recorder()
+
+    hass.states.set("sensor.power", "10", {"unit_of_measurement": "W"})
+    hass.states.set("sensor.text", "on", {})
+    hass.states.remove("sensor.power")
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States).order_by(States.state_id))
+        assert [state.has_unit_of_measurement for state in states] == [
+            True,
+            False,
+            False,
+        ]
+
+
 def test_saving_state_with_serializable_data(hass_recorder, caplog):
     """Test saving data that cannot be serialized does not crash."""
     hass = hass_recorder()
@@ -438,3 +642,24 @@ def test_run_information(hass_recorder):
 
 class CannotSerializeMe:
     """A class that the JSONEncoder cannot serialize."""
+
+
+def test_timer_tick_without_time_changed_events(hass_recorder):
+    """Test the recorder ticks itself unless time changed events are fired."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+    now = dt_util.utcnow()
+
+    with patch.object(instance.queue, "put") as mock_put:
+        hass.add_job(instance.async_timer_tick, now)
+        hass.block_till_done()
+        assert mock_put.mock_calls[0][1][0] == TimerTick(now)
+
+        unsub = hass.bus.listen(EVENT_TIME_CHANGED, lambda event: None)
+        mock_put.reset_mock()
+        hass.add_job(instance.async_timer_tick, now)
+        hass.block_till_done()
+        assert not any(
+            isinstance(call[1][0], TimerTick) for call in mock_put.mock_calls
+        )
+        unsub()
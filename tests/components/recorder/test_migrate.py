@@ -78,3 +78,26 @@ def test_forgiving_add_index():
     engine = create_engine("sqlite://", poolclass=StaticPool)
     models.Base.metadata.create_all(engine)
     migration._create_index(engine, "states", "ix_states_context_id")
+
+
+def test_backfill_has_unit_of_measurement():
+    """Test existing states with a unit of measurement are flagged."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    engine.execute(
+        "INSERT INTO state_attributes (attributes_id, shared_attrs) VALUES "
+        """(1, '{"unit_of_measurement": "W"}'), (2, '{"friendly_name": "W"}')"""
+    )
+    engine.execute(
+        "INSERT INTO states (state_id, attributes, attributes_id) VALUES "
+        """(1, '{"unit_of_measurement": "°C"}', NULL), (2, '{}', NULL), """
+        "(3, NULL, 1), (4, NULL, 2)"
+    )
+
+    migration._backfill_has_unit_of_measurement(engine)
+
+    assert list(
+        engine.execute(
+            "SELECT state_id, has_unit_of_measurement FROM states ORDER BY state_id"
+        )
+    ) == [(1, True), (2, None), (3, True), (4, None)]
@@ -1,13 +1,25 @@
 """Test data purging."""
 from datetime import datetime, timedelta
 import json
+import threading
+import time
 import unittest
 
 from homeassistant.components import recorder
-from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.const import (
+    DATA_INSTANCE,
+    EVENT_RECORDER_PURGE_PROGRESS,
+)
+from homeassistant.components.recorder.models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+)
 from homeassistant.components.recorder.purge import purge_old_data
 from homeassistant.components.recorder.util import session_scope
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import callback
 from homeassistant.util import dt as dt_util
 
 from tests.async_mock import patch
@@ -130,15 +142,11 @@ class TestRecorderPurge(unittest.TestCase):
             assert states.count() == 6
 
             # run purge_old_data()
-            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
-            assert not finished
-            assert states.count() == 4
-
-            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4)
             assert not finished
             assert states.count() == 2
 
-            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4)
             assert finished
             assert states.count() == 2
 
@@ -151,16 +159,12 @@ class TestRecorderPurge(unittest.TestCase):
             assert events.count() == 6
 
             # run purge_old_data()
-            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
-            assert not finished
-            assert events.count() == 4
-
-            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4)
             assert not finished
             assert events.count() == 2
 
             # we should only have 2 events left
-            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+            finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4)
             assert finished
             assert events.count() == 2
 
@@ -223,7 +227,191 @@ class TestRecorderPurge(unittest.TestCase):
                 self.hass.services.call("recorder", "purge", service_data=service_data)
                 self.hass.block_till_done()
                 self.hass.data[DATA_INSTANCE].block_till_done()
-                assert (
-                    mock_logger.debug.mock_calls[5][1][0]
-                    == "Vacuuming SQL DB to free space"
+                assert "Vacuuming SQL DB to free space" in (
+                    call[1][0] for call in mock_logger.debug.mock_calls
+                )
+
+    def test_purge_unused_state_attributes(self):
+        """Test deleting attributes no remaining state uses."""
+        now = dt_util.utcnow()
+        eleven_days_ago = now - timedelta(days=11)
+
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with recorder.session_scope(hass=self.hass) as session:
+            purged = StateAttributes(shared_attrs='{"purge": true}')
+            kept = StateAttributes(shared_attrs='{"purge": false}')
+            for timestamp, state_attributes in (
+                (eleven_days_ago, purged),
+                (eleven_days_ago, purged),
+                (eleven_days_ago, kept),
+                (now, kept),
+            ):
+                session.add(
+                    States(
+                        entity_id="test.recorder2",
+                        domain="sensor",
+                        state="on",
+                        state_attributes=state_attributes,
+                        last_changed=timestamp,
+                        last_updated=timestamp,
+                    )
+                )
+
+        with session_scope(hass=self.hass) as session:
+            finished = False
+            while not finished:
+                finished = purge_old_data(self.hass.data[DATA_INSTANCE], 4)
+
+            assert session.query(States).count() == 1
+            assert [
+                state_attributes.shared_attrs
+                for state_attributes in session.query(StateAttributes)
+            ] == ['{"purge": false}']
+
+    def test_purge_in_batches(self):
+        """Test purging in batches reports progress."""
+        self._add_test_states()
+        self._add_test_events()
+        instance = self.hass.data[DATA_INSTANCE]
+
+        progress = []
+
+        @callback
+        def event_listener(event):
+            """Record the purge progress."""
+            progress.append(event.data)
+
+        self.hass.bus.listen(EVENT_RECORDER_PURGE_PROGRESS, event_listener)
+
+        with patch(
+            "homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 1
+        ), session_scope(hass=self.hass) as session:
+            states = session.query(States)
+            events = session.query(Events).filter(Events.event_type.like("EVENT_TEST%"))
+
+            finished = purge_old_data(instance, 4)
+            assert not finished
+            assert states.count() == 5
+            assert events.count() == 6
+
+            while not finished:
+                finished = purge_old_data(instance, 4)
+
+            assert states.count() == 2
+            assert events.count() == 2
+            assert instance.purge_progress is None
+
+        self.hass.block_till_done()
+        assert len(progress) == 9
+        assert progress[0]["states_deleted"] == 1
+        assert progress[0]["states_remaining"] == 3
+        assert progress[0]["events_remaining"] == 4
+        assert not progress[0]["finished"]
+        assert progress[-1]["finished"]
+        assert progress[-1]["states_deleted"] == 4
+        assert progress[-1]["events_deleted"] == 4
+        assert progress[-1]["states_remaining"] == 0
+        assert progress[-1]["events_remaining"] == 0
+
+    def test_purge_counts_states_of_purged_events(self):
+        """Test states deleted with their events are part of the progress."""
+        now = dt_util.utcnow()
+        eleven_days_ago = now - timedelta(days=11)
+        instance = self.hass.data[DATA_INSTANCE]
+
+        progress = []
+
+        @callback
+        def event_listener(event):
+            """Record the purge progress."""
+            progress.append(event.data)
+
+        self.hass.bus.listen(EVENT_RECORDER_PURGE_PROGRESS, event_listener)
+        self.hass.block_till_done()
+        instance.block_till_done()
+
+        with recorder.session_scope(hass=self.hass) as session:
+            event = Events(
+                event_type="EVENT_TEST_PURGE",
+                event_data="{}",
+                origin="LOCAL",
+                created=eleven_days_ago,
+                time_fired=eleven_days_ago,
+            )
+            session.add(event)
+            session.flush()
+            session.add(
+                States(
+                    entity_id="test.recorder2",
+                    domain="sensor",
+                    state="on",
+                    last_changed=now,
+                    last_updated=now,
+                    event_id=event.event_id,
+                )
+            )
+
+        with session_scope(hass=self.hass) as session:
+            finished = False
+            while not finished:
+                finished = purge_old_data(instance, 4)
+            assert session.query(States).count() == 0
+
+        self.hass.block_till_done()
+        assert progress[0]["states_remaining"] == 0
+        assert progress[-1]["finished"]
+        assert progress[-1]["states_deleted"] == 1
+        assert progress[-1]["events_deleted"] == 1
+
+    def test_purge_skips_repack_when_stopping(self):
+        """Test repacking the database is skipped while stopping."""
+        instance = self.hass.data[DATA_INSTANCE]
+        self.hass.block_till_done()
+        instance.block_till_done()
+
+        with patch(
+            "homeassistant.components.recorder.purge.repack_database"
+        ) as repack_database:
+            self.hass.services.call(
+                "recorder", "purge", service_data={"keep_days": 4, "repack": True}
+            )
+            self.hass.block_till_done()
+            instance.block_till_done()
+            assert len(repack_database.mock_calls) == 1
+
+            # Block the recorder so the repack is still queued when stopping
+            blocked = threading.Event()
+            resume = threading.Event()
+            original_purge = purge_old_data
+
+            def slow_purge(*args):
+                """Block the recorder thread during the purge."""
+                blocked.set()
+                resume.wait(5)
+                return original_purge(*args)
+
+            with patch(
+                "homeassistant.components.recorder.purge.purge_old_data",
+                side_effect=slow_purge,
+            ):
+                self.hass.services.call(
+                    "recorder", "purge", service_data={"keep_days": 4, "repack": True}
+                )
+                self.hass.block_till_done()
+                assert blocked.wait(5)
+                stop = threading.Thread(
+                    target=self.hass.bus.fire, args=(EVENT_HOMEASSISTANT_STOP,)
                 )
+                stop.start()
+                for _ in range(50):
+                    if instance._stop_requested:
+                        break
+                    time.sleep(0.1)
+                resume.set()
+                instance.join(5)
+                stop.join(5)
+
+            assert not instance.is_alive()
+            assert len(repack_database.mock_calls) == 1
@@ -0,0 +1,202 @@
+"""The tests for the recorder statistics."""
+from datetime import timedelta
+
+import pytest
+
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.models import Statistics, StatisticsShortTerm
+from homeassistant.components.recorder.statistics import (
+    PERIOD_5MINUTE,
+    PERIOD_HOUR,
+    StatisticsCompiler,
+    statistics_during_period,
+)
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import Event, State
+import homeassistant.util.dt as dt_util
+
+from .common import wait_recording_done
+
+from tests.common import (
+    fire_time_changed,
+    get_test_home_assistant,
+    init_recorder_component,
+)
+
+
+@pytest.fixture
+def hass_recorder():
+    """Home Assistant fixture with in-memory recorder."""
+    hass = get_test_home_assistant()
+
+    def setup_recorder(config=None):
+        """Set up with params."""
+        init_recorder_component(hass, config)
+        hass.start()
+        hass.block_till_done()
+        hass.data[DATA_INSTANCE].block_till_done()
+        return hass
+
+    yield setup_recorder
+    hass.stop()
+
+
+class MockSession:
+    """Collect the rows added to a session."""
+
+    def __init__(self):
+        """Initialize the session."""
+        self.rows = []
+
+    def add(self, row):
+        """Add a row."""
+        self.rows.append(row)
+
+
+def _state_changed(entity_id, state, last_updated):
+    """Return a state_changed event."""
+    new_state = None
+    if state is not None:
+        new_state = State(entity_id, state, last_updated=last_updated)
+    return Event("state_changed", {"entity_id": entity_id, "new_state": new_state})
+
+
+def test_compile_statistics():
+    """Test numeric states are rolled up when a period closes."""
+    session = MockSession()
+    compiler = StatisticsCompiler()
+    start = dt_util.utc_from_timestamp(3600 * 1000)
+
+    for offset, power, text in (
+        (0, "10", "on"),
+        (60, "20", "off"),
+        (120, "unavailable", "on"),
+    ):
+        time = start + timedelta(seconds=offset)
+        compiler.add_event(session, _state_changed("sensor.power", power, time))
+        compiler.add_event(session, _state_changed("switch.test", text, time))
+
+    compiler.compile(session, start + timedelta(minutes=4))
+    assert session.rows == []
+
+    compiler.compile(session, start + timedelta(minutes=5))
+    assert len(session.rows) == 1
+    row = session.rows[0]
+    assert isinstance(row, StatisticsShortTerm)
+    assert row.entity_id == "sensor.power"
+    assert row.start == start
+    assert (row.min, row.max, row.mean, row.sum, row.count) == (10, 20, 15, 30, 2)
+
+    # The unavailable state stopped the value from carrying forward
+    compiler.compile(session, start + timedelta(minutes=10))
+    assert len(session.rows) == 1
+
+    compiler.add_event(
+        session, _state_changed("sensor.power", "40", start + timedelta(minutes=11))
+    )
+    compiler.compile(session, start + timedelta(minutes=15))
+    assert session.rows[1].start == start + timedelta(minutes=10)
+    assert session.rows[1].mean == 40
+
+    # Carried forward into the next period without new states
+    compiler.compile(session, start + timedelta(minutes=20))
+    assert session.rows[2].start == start + timedelta(minutes=15)
+    assert session.rows[2].mean == 40
+    assert session.rows[2].count == 1
+
+    compiler.add_event(session, _state_changed("sensor.power", None, None))
+    compiler.compile(session, start + timedelta(hours=1))
+    hourly = [row for row in session.rows if isinstance(row, Statistics)]
+    assert len(hourly) == 1
+    assert hourly[0].start == start
+    assert (hourly[0].min, hourly[0].max, hourly[0].count) == (10, 40, 3)
+
+
+def test_compile_statistics_carries_values_over_gaps():
+    """Test periods without any compile are written with the carried values."""
+    session = MockSession()
+    compiler = StatisticsCompiler()
+    start = dt_util.utc_from_timestamp(3600 * 1000)
+
+    compiler.add_event(session, _state_changed("sensor.power", "10", start))
+    compiler.compile(session, start + timedelta(minutes=17))
+
+    assert [(row.start, row.mean, row.count) for row in session.rows] == [
+        (start, 10, 1),
+        (start + timedelta(minutes=5), 10, 1),
+        (start + timedelta(minutes=10), 10, 1),
+    ]
+
+
+def test_compile_statistics_late_states(hass_recorder):
+    """Test states recorded after their period was compiled are folded into it."""
+    hass = hass_recorder()
+    compiler = StatisticsCompiler()
+    start = dt_util.utc_from_timestamp(3600 * 1000)
+
+    with session_scope(hass=hass) as session:
+        compiler.add_event(session, _state_changed("sensor.power", "10", start))
+        compiler.add_event(
+            session, _state_changed("sensor.power", "20", start + timedelta(minutes=1)),
+        )
+        compiler.compile(session, start + timedelta(minutes=5))
+
+        compiler.add_event(
+            session, _state_changed("sensor.power", "60", start + timedelta(minutes=2)),
+        )
+        compiler.add_event(
+            session, _state_changed("sensor.late", "5", start + timedelta(minutes=3))
+        )
+        compiler.compile(session, start + timedelta(minutes=10))
+
+    stats = statistics_during_period(hass, start, period=PERIOD_5MINUTE)
+    assert stats["sensor.power"] == [
+        {"start": start, "mean": 30.0, "min": 10.0, "max": 60.0, "sum": 90.0},
+        # The late state did not replace the newer value carried forward
+        {
+            "start": start + timedelta(minutes=5),
+            "mean": 20.0,
+            "min": 20.0,
+            "max": 20.0,
+            "sum": 20.0,
+        },
+    ]
+    assert stats["sensor.late"] == [
+        {"start": start, "mean": 5.0, "min": 5.0, "max": 5.0, "sum": 5.0}
+    ]
+
+
+def test_statistics_during_period(hass_recorder):
+    """Test statistics are recorded and queried."""
+    hass = hass_recorder()
+    now = dt_util.utcnow()
+
+    hass.states.set("sensor.power", "10")
+    hass.states.set("sensor.power", "30")
+    hass.states.set("sensor.other", "5")
+    hass.states.set("light.kitchen", "on")
+    wait_recording_done(hass)
+
+    fire_time_changed(hass, now + timedelta(hours=1, minutes=5))
+    wait_recording_done(hass)
+
+    hour_start = now.replace(minute=0, second=0, microsecond=0)
+    # The next hour may have closed too, it only has the carried value
+    stats = statistics_during_period(
+        hass,
+        hour_start,
+        hour_start + timedelta(hours=1),
+        entity_ids=["sensor.power"],
+        period=PERIOD_HOUR,
+    )
+    assert stats == {
+        "sensor.power": [
+            {"start": hour_start, "mean": 20.0, "min": 10.0, "max": 30.0, "sum": 40.0}
+        ]
+    }
+
+    stats = statistics_during_period(hass, hour_start, period=PERIOD_5MINUTE)
+    assert set(stats) == {"sensor.power", "sensor.other"}
+    assert stats["sensor.other"][0]["mean"] == 5.0
+
+    assert statistics_during_period(hass, now + timedelta(hours=2)) == {}
@@ -0,0 +1,67 @@
+"""Tests for WebSocket API messages."""
+import gc
+import json
+import weakref
+
+from homeassistant.components.websocket_api import messages
+from homeassistant.core import Event, State
+
+
+def test_cached_event_message():
+    """Test the event is serialized once and shared between subscriptions."""
+    event = Event(
+        "state_changed",
+        {"entity_id": "light.kitchen", "new_state": State("light.kitchen", "on")},
+    )
+
+    first = messages.cached_event_message(1, event)
+    second = messages.cached_event_message(2, event)
+
+    first_msg = json.loads(first)
+    second_msg = json.loads(second)
+    assert first_msg["id"] == 1
+    assert second_msg["id"] == 2
+    assert first_msg["type"] == "event"
+    assert first_msg["event"] == second_msg["event"]
+    assert first_msg["event"]["data"]["new_state"]["state"] == "on"
+    assert first[first.index(",") :] == second[second.index(",") :]
+
+
+def test_cached_event_message_cache_size():
+    """Test the event message cache is bounded."""
+    events = [
+        Event("test_event", {"index": idx})
+        for idx in range(messages.EVENT_MESSAGE_CACHE_SIZE + 10)
+    ]
+
+    for idx, event in enumerate(events):
+        msg = json.loads(messages.cached_event_message(idx, event))
+        assert msg["event"]["data"] == {"index": idx}
+
+    # pylint: disable=protected-access
+    assert len(messages._EVENT_MESSAGE_CACHE) == messages.EVENT_MESSAGE_CACHE_SIZE
+
+
+def test_cached_event_message_not_serializable():
+    """Test an event that can not be serialized is returned as a dict."""
+    event = Event("test_event", {"bad": object()})
+
+    msg = messages.cached_event_message(5, event)
+    assert msg == {"id": 5, "type": "event", "event": event}
+
+
+def test_cached_event_message_does_not_keep_events():
+    """Test cached events can be garbage collected and their id reused."""
+    event = Event("test_event", {"index": 1})
+    messages.cached_event_message(1, event)
+    event_ref = weakref.ref(event)
+    del event
+    gc.collect()
+    assert event_ref() is None
+
+    # A new event with the id of a cached one is serialized again
+    event = Event("test_event", {"index": 2})
+    # pylint: disable=protected-access
+    messages._EVENT_MESSAGE_CACHE[id(event)] = (event_ref, "{stale}")
+    msg = json.loads(messages.cached_event_message(2, event))
+    assert msg["event"]["data"] == {"index": 2}
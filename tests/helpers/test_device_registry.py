@@ -839,3 +839,36 @@ async def test_restore_simple_device(hass, registry, update_events):
     assert update_events[2]["device_id"] == entry2.id
     assert update_events[3]["action"] == "create"
     assert update_events[3]["device_id"] == entry3.id
+
+
+async def test_entries_for_area_and_config_entry(registry):
+    """Test looking up devices by area and config entry follows updates."""
+    entry1 = registry.async_get_or_create(
+        config_entry_id="1234", identifiers={("bridgeid", "0123")}
+    )
+    entry2 = registry.async_get_or_create(
+        config_entry_id="1234", identifiers={("bridgeid", "4567")}
+    )
+    entry1 = registry.async_update_device(entry1.id, area_id="area-1")
+
+    assert device_registry.async_entries_for_area(registry, "area-1") == [entry1]
+    assert device_registry.async_entries_for_config_entry(registry, "1234") == [
+        entry1,
+        entry2,
+    ]
+
+    entry2 = registry.async_get_or_create(
+        config_entry_id="5678", identifiers={("bridgeid", "4567")}
+    )
+    registry.async_clear_area_id("area-1")
+
+    assert device_registry.async_entries_for_area(registry, "area-1") == []
+    assert device_registry.async_entries_for_config_entry(registry, "5678") == [entry2]
+
+    registry.async_clear_config_entry("1234")
+
+    assert device_registry.async_entries_for_config_entry(registry, "1234") == []
+    assert device_registry.async_entries_for_config_entry(registry, "5678") == [
+        registry.async_get(entry2.id)
+    ]
+    assert registry.async_get(entry1.id) is None
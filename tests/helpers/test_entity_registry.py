@@ -659,3 +659,43 @@ async def test_async_get_device_class_lookup(hass):
             ("sensor", "battery"): "sensor.vacuum_battery",
         },
     }
+
+
+async def test_entries_for_device_and_config_entry(registry):
+    """Test looking up entries by device and config entry follows updates."""
+    config_entry = MockConfigEntry(domain="light", entry_id="mock-id-1")
+    entry1 = registry.async_get_or_create(
+        "light", "hue", "1234", config_entry=config_entry, device_id="device-1"
+    )
+    entry2 = registry.async_get_or_create(
+        "light", "hue", "5678", config_entry=config_entry, device_id="device-1"
+    )
+
+    assert entity_registry.async_entries_for_device(registry, "device-1") == [
+        entry1,
+        entry2,
+    ]
+    assert entity_registry.async_entries_for_config_entry(registry, "mock-id-1") == [
+        entry1,
+        entry2,
+    ]
+
+    entry1 = registry.async_update_entity(
+        entry1.entity_id, new_entity_id="light.renamed"
+    )
+    entry2 = registry._async_update_entity(entry2.entity_id, device_id="device-2")
+
+    assert entity_registry.async_entries_for_device(registry, "device-1") == [entry1]
+    assert entity_registry.async_entries_for_device(registry, "device-2") == [entry2]
+    # Renamed entries move to the end like in the registry
+    assert entity_registry.async_entries_for_config_entry(registry, "mock-id-1") == [
+        entry2,
+        entry1,
+    ]
+
+    registry.async_remove(entry1.entity_id)
+
+    assert entity_registry.async_entries_for_device(registry, "device-1") == []
+    assert entity_registry.async_entries_for_config_entry(registry, "mock-id-1") == [
+        entry2
+    ]
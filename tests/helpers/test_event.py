@@ -408,6 +408,97 @@ async def test_track_template(hass):
     assert len(wildercard_runs) == 2
 
 
+async def test_track_template_follows_render_info(hass):
+    """Test the entities a template accesses decide which changes render it."""
+    runs = []
+    template = Template(
+        "{{ is_state('input_boolean.enable', 'on') "
+        "and is_state('switch.test', 'on') }}",
+        hass,
+    )
+    hass.states.async_set("input_boolean.enable", "off")
+    hass.states.async_set("switch.test", "off")
+
+    @ha.callback
+    def run_callback(entity_id, old_state, new_state):
+        runs.append(entity_id)
+
+    with patch.object(
+        Template, "async_render_to_info", wraps=template.async_render_to_info
+    ) as mock_render:
+        unsub = async_track_template(hass, template, run_callback)
+        assert mock_render.call_count == 1
+
+        # switch.test was not accessed, the and short circuited
+        hass.states.async_set("switch.test", "on")
+        hass.states.async_set("sensor.unrelated", "1")
+        await hass.async_block_till_done()
+        assert mock_render.call_count == 1
+
+        hass.states.async_set("input_boolean.enable", "on")
+        await hass.async_block_till_done()
+        assert mock_render.call_count == 2
+        assert runs == ["input_boolean.enable"]
+
+        # Now switch.test is accessed too
+        hass.states.async_set("switch.test", "off")
+        await hass.async_block_till_done()
+        assert mock_render.call_count == 3
+
+        unsub()
+        hass.states.async_set("switch.test", "on")
+        await hass.async_block_till_done()
+        assert mock_render.call_count == 3
+        assert runs == ["input_boolean.enable"]
+
+
+async def test_track_template_rate_limit_all_states(hass):
+    """Test templates iterating all states are rate limited."""
+    runs = []
+    template = Template(
+        "{{ states | selectattr('state', 'eq', 'on') | list | count > 1 }}", hass
+    )
+
+    @ha.callback
+    def run_callback(entity_id, old_state, new_state):
+        runs.append(entity_id)
+
+    async_track_template(hass, template, run_callback)
+
+    hass.states.async_set("light.one", "on")
+    await hass.async_block_till_done()
+    assert runs == []
+
+    # Rendered again within the rate limit
+    hass.states.async_set("light.two", "on")
+    await hass.async_block_till_done()
+    assert runs == []
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=2))
+    await hass.async_block_till_done()
+    assert runs == ["light.two"]
+
+
+async def test_track_template_domain_tracks_new_entities(hass):
+    """Test templates iterating a domain render when entities are added."""
+    runs = []
+    template = Template("{{ states.light | count == 1 }}", hass)
+
+    @ha.callback
+    def run_callback(entity_id, old_state, new_state):
+        runs.append(entity_id)
+
+    async_track_template(hass, template, run_callback)
+
+    hass.states.async_set("switch.one", "on")
+    await hass.async_block_till_done()
+    assert runs == []
+
+    hass.states.async_set("light.one", "on")
+    await hass.async_block_till_done()
+    assert runs == ["light.one"]
+
+
 async def test_track_same_state_simple_trigger(hass):
     """Test track_same_change with trigger simple."""
     thread_runs = []
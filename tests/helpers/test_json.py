@@ -1,8 +1,11 @@
 """Test Home Assistant remote methods and classes."""
+import json
+import math
+
 import pytest
 
 from homeassistant import core
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import JSONEncoder, json_bytes
 from homeassistant.util import dt as dt_util
 
 
@@ -19,3 +22,39 @@ def test_json_encoder(hass):
 
     now = dt_util.utcnow()
     assert ha_json_enc.default(now) == now.isoformat()
+
+
+def test_json_bytes_reuses_state_json():
+    """Test states are serialized once and spliced in."""
+    state = core.State("test.test", "hello", {"happy": True, "list": [1, 2]})
+    event = core.Event(
+        "state_changed", {"entity_id": state.entity_id, "new_state": state}
+    )
+    data = {"states": [state, state], "event": event, "text": "\x00:0\x00"}
+
+    dumped = json_bytes(data, sort_keys=True)
+
+    assert json.loads(dumped) == json.loads(json.dumps(data, cls=JSONEncoder))
+    assert state.as_json() is state.as_json()
+    assert state.as_dict() is state.as_dict()
+    assert core.State.from_dict(json.loads(state.as_json())) == state
+    assert json.loads(json_bytes(state)) == json.loads(state.as_json())
+
+    with pytest.raises(ValueError):
+        json_bytes([core.State("test.test", "hello", {"value": math.nan})])
+
+
+def test_json_bytes_sorts_keys_of_states():
+    """Test the keys of states are sorted when the document sorts its keys."""
+    state = core.State("test.test", "hello", {"zebra": 1, "apple": {"b": 2, "a": 1}})
+
+    def assert_sorted(pairs):
+        """Assert the keys of an object are sorted."""
+        keys = [key for key, _ in pairs]
+        assert keys == sorted(keys)
+        return dict(pairs)
+
+    json.loads(
+        json_bytes({"state": state, "list": [state]}, sort_keys=True),
+        object_pairs_hook=assert_sorted,
+    )
@@ -2,6 +2,7 @@
 import asyncio
 from datetime import timedelta
 import json
+import os
 
 import pytest
 
@@ -16,6 +17,9 @@ from homeassistant.util import dt
 from tests.async_mock import Mock, patch
 from tests.common import async_fire_time_changed
 
+# The hass fixture mocks writing the data, keep the real method for the journal
+REAL_WRITE_DATA = storage.Store._write_data
+
 MOCK_VERSION = 1
 MOCK_KEY = "storage-test"
 MOCK_DATA = {"hello": "world"}
@@ -236,3 +240,149 @@ async def test_migrator_transforming_config(hass, store, hass_storage):
         "version": MOCK_VERSION,
         "data": data,
     }
+
+
+async def test_journal(hass, hass_storage, tmp_path):
+    """Test changed items are appended to the journal and replayed on load."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / storage.STORAGE_DIR).mkdir()
+    items = {"a": {"id": "a", "value": 1}, "b": {"id": "b", "value": 2}}
+    (tmp_path / storage.STORAGE_DIR / MOCK_KEY).write_text(
+        json.dumps({"version": MOCK_VERSION, "data": {"items": list(items.values())}})
+    )
+
+    def data_func():
+        return {"items": list(items.values())}
+
+    def item_func(collection, key):
+        assert collection == "items"
+        return items.get(key)
+
+    store = storage.Store(hass, MOCK_VERSION, MOCK_KEY, journal={"items": "id"})
+    data = await hass.async_add_executor_job(store._load_data)
+    assert data["data"] == data_func()
+
+    items["b"]["value"] = 3
+    items["c"] = {"id": "c", "value": 4}
+    del items["a"]
+    store.async_delay_save_changes(
+        data_func, item_func, [("items", "b"), ("items", "a")], 1
+    )
+    store.async_delay_save_changes(data_func, item_func, [("items", "c")], 1)
+    async_fire_time_changed(hass, dt.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+
+    # Only the journal is written
+    assert MOCK_KEY not in hass_storage
+    journal = (tmp_path / storage.STORAGE_DIR / f"{MOCK_KEY}.journal").read_text()
+    assert len(journal.splitlines()) == 3
+
+    # An interrupted write is ignored
+    with open(store.journal_path, "a") as fdesc:
+        fdesc.write('{"collection":"items","key":')
+
+    store = storage.Store(hass, MOCK_VERSION, MOCK_KEY, journal={"items": "id"})
+    data = await hass.async_add_executor_job(store._load_data)
+    assert data["data"] == data_func()
+
+    # The data is written to the snapshot once the journal is too large
+    items["d"] = {"id": "d", "value": 5}
+    with patch("homeassistant.helpers.storage.JOURNAL_COMPACT_SIZE", 0):
+        store.async_delay_save_changes(data_func, item_func, [("items", "d")])
+        await hass.async_block_till_done()
+
+    assert hass_storage[MOCK_KEY]["data"] == data_func()
+
+
+async def test_journal_left_behind(hass, tmp_path):
+    """Test a journal left behind by a snapshot write is not replayed on it."""
+    hass.config.config_dir = str(tmp_path)
+    items = {"a": {"id": "a", "value": 1}}
+
+    def data_func():
+        return {"items": list(items.values())}
+
+    def item_func(collection, key):
+        return items.get(key)
+
+    store = storage.Store(hass, MOCK_VERSION, MOCK_KEY, journal={"items": "id"})
+    with patch.object(storage.Store, "_write_data", REAL_WRITE_DATA):
+        await store.async_save(data_func())
+
+        items["a"]["value"] = 2
+        store.async_delay_save_changes(data_func, item_func, [("items", "a")], 1)
+        async_fire_time_changed(hass, dt.utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+
+        # Removing the journal after writing the snapshot does not happen
+        items["a"]["value"] = 3
+        with patch("homeassistant.helpers.storage.os.unlink"):
+            await store.async_save(data_func())
+
+        journal = (tmp_path / storage.STORAGE_DIR / f"{MOCK_KEY}.journal").read_text()
+        assert '"value":2' in journal
+
+        store = storage.Store(hass, MOCK_VERSION, MOCK_KEY, journal={"items": "id"})
+        data = await hass.async_add_executor_job(store._load_data)
+        assert data["data"] == {"items": [{"id": "a", "value": 3}]}
+
+        # Changes journaled after the snapshot are replayed
+        items["b"] = {"id": "b", "value": 4}
+        store.async_delay_save_changes(data_func, item_func, [("items", "b")], 1)
+        async_fire_time_changed(hass, dt.utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+
+    store = storage.Store(hass, MOCK_VERSION, MOCK_KEY, journal={"items": "id"})
+    data = await hass.async_add_executor_job(store._load_data)
+    assert data["data"] == data_func()
+
+
+async def test_journal_interrupted_write(hass, tmp_path):
+    """Test a snapshot is written before appending to a torn journal."""
+    hass.config.config_dir = str(tmp_path)
+    items = {"a": {"id": "a", "value": 1}}
+
+    def data_func():
+        return {"items": list(items.values())}
+
+    def item_func(collection, key):
+        return items.get(key)
+
+    store = storage.Store(hass, MOCK_VERSION, MOCK_KEY, journal={"items": "id"})
+    with patch.object(storage.Store, "_write_data", REAL_WRITE_DATA):
+        await store.async_save(data_func())
+
+        items["a"]["value"] = 2
+        store.async_delay_save_changes(data_func, item_func, [("items", "a")], 1)
+        async_fire_time_changed(hass, dt.utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+
+        with open(store.journal_path, "a") as fdesc:
+            fdesc.write('{"collection":"items","key":')
+
+        store = storage.Store(hass, MOCK_VERSION, MOCK_KEY, journal={"items": "id"})
+        data = await hass.async_add_executor_job(store._load_data)
+        assert data["data"] == data_func()
+
+        items["b"] = {"id": "b", "value": 3}
+        store.async_delay_save_changes(data_func, item_func, [("items", "b")], 1)
+        async_fire_time_changed(hass, dt.utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done()
+
+    assert not os.path.exists(store.journal_path)
+    store = storage.Store(hass, MOCK_VERSION, MOCK_KEY, journal={"items": "id"})
+    data = await hass.async_add_executor_job(store._load_data)
+    assert data["data"] == data_func()
+
+
+async def test_journal_pending_snapshot(hass, hass_storage):
+    """Test a pending snapshot is not replaced by changed items."""
+    store = storage.Store(hass, MOCK_VERSION, MOCK_KEY, journal={"items": "id"})
+    store.async_delay_save(lambda: {"items": []}, 1)
+    store.async_delay_save_changes(
+        lambda: {"items": [{"id": "a"}]}, Mock(), [("items", "a")], 1
+    )
+    async_fire_time_changed(hass, dt.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+
+    assert hass_storage[MOCK_KEY]["data"] == {"items": [{"id": "a"}]}
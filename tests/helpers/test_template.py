@@ -8,6 +8,7 @@ import pytz
 
 from homeassistant.components import group
 from homeassistant.const import (
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
     LENGTH_METERS,
     MASS_GRAMS,
     MATCH_ALL,
@@ -150,6 +151,7 @@ def test_iterating_all_states(hass):
     assert_result_info(
         info, "10happy", entities=["test.object", "sensor.temperature"], all_states=True
     )
+    assert info.rate_limit == template.ALL_STATES_RATE_LIMIT
 
 
 def test_iterating_domain_states(hass):
@@ -170,6 +172,18 @@ def test_iterating_domain_states(hass):
         entities=["sensor.back_door", "sensor.temperature"],
         domains=["sensor"],
     )
+    assert info.rate_limit == template.DOMAIN_STATES_RATE_LIMIT
+
+
+def test_render_info_static_and_rate_limit(hass):
+    """Test templates without Jinja are static and entities are not limited."""
+    info = render_to_info(hass, "just a string")
+    assert info.is_static
+    assert info.rate_limit is None
+
+    info = render_to_info(hass, "{{ states('sensor.temperature') }}")
+    assert not info.is_static
+    assert info.rate_limit is None
 
 
 def test_float(hass):
@@ -737,6 +751,57 @@ def test_render_with_possible_json_value_non_string_value(hass):
     assert tpl.async_render_with_possible_json_value(value) == expected
 
 
+def test_render_with_possible_json_value_parses_json_when_used(hass):
+    """Test the value is only parsed when the template uses value_json."""
+    tpl = template.Template("{{ value | upper }}", hass)
+    with patch("homeassistant.helpers.template.json.loads") as mock_loads:
+        assert tpl.async_render_with_possible_json_value('{"hello": "world"}') == (
+            '{"HELLO": "WORLD"}'
+        )
+    assert not mock_loads.called
+
+    tpl = template.Template("{{ value_json.hello | upper }}", hass)
+    assert tpl.async_render_with_possible_json_value('{"hello": "world"}') == "WORLD"
+
+
+@pytest.mark.parametrize(
+    "template_string,value",
+    [
+        ("{{ value }}", " padded "),
+        ("{{value}}", "42"),
+        ("{{ value_json }}", '{"hello": "world"}'),
+        ("{{ value_json.hello }}", '{"hello": "world"}'),
+        ("{{ value_json['hello'] }}", '{"hello": "world"}'),
+        ('{{ value_json["a"].b[1] }}', '{"a": {"b": [1, 2.5]}}'),
+        ("{{ value_json.0 }}", '["first"]'),
+        ("{{ value_json.on }}", '{"on": true}'),
+        ("{{ value_json.off }}", '{"off": null}'),
+        # Rendered by Jinja
+        ("{{ value_json.missing }}", '{"hello": "world"}'),
+        ("{{ value_json['items'] }}", '{"items": 1}'),
+        ("{{ value_json.hello }}", "not json"),
+    ],
+)
+def test_render_trivial_value_template(hass, template_string, value):
+    """Test trivial value templates render the same as with Jinja."""
+    tpl = template.Template(template_string, hass)
+    jinja_tpl = template.Template(template_string, hass)
+    jinja_tpl._uses_value_json = True
+
+    assert tpl.async_render_with_possible_json_value(
+        value, "error"
+    ) == jinja_tpl.async_render_with_possible_json_value(value, "error")
+    assert tpl._trivial_value_path is not None
+
+
+def test_render_trivial_value_template_attribute(hass):
+    """Test attributes of the value are left to Jinja."""
+    tpl = template.Template("{{ value_json.items }}", hass)
+    assert tpl.async_render_with_possible_json_value('{"items": 1}').startswith(
+        "<built-in method items"
+    )
+
+
 def test_if_state_exists(hass):
     """Test if state exists works."""
     hass.states.async_set("test.object", "available")
@@ -1956,6 +2021,94 @@ async def test_cache_garbage_collection():
         template_string
     )  # pylint: disable=protected-access
     del tpl2
+    # The shared compile cache still holds the compiled template
+    assert template._NO_HASS_ENV.template_cache.get(
+        template_string
+    )  # pylint: disable=protected-access
+    template._COMPILE_CACHE.pop(template_string)
     assert not template._NO_HASS_ENV.template_cache.get(
         template_string
     )  # pylint: disable=protected-access
+
+
+async def test_compile_cache_shared_and_bounded(hass):
+    """Test compiled templates are shared between environments and bounded."""
+    template_string = "{{ 'shared' ~ 'compile' ~ 'cache' }}"
+    stats = template.COMPILE_STATS
+    misses = stats.misses
+
+    code = template.TemplateEnvironment(hass).compile(template_string)
+    assert stats.misses == misses + 1
+
+    hits = stats.hits
+    assert template.TemplateEnvironment(None).compile(template_string) is code
+    assert stats.hits == hits + 1
+    assert stats.misses == misses + 1
+    assert stats.time_saved > 0
+
+    with patch.object(template, "COMPILE_CACHE_SIZE", 1):
+        template.TemplateEnvironment(None).compile("{{ 'evicts' ~ 'the' ~ 'other' }}")
+    assert template_string not in template._COMPILE_CACHE
+
+
+async def test_bytecode_cache(hass, hass_storage):
+    """Test compiled templates are stored and loaded from disk."""
+    template_string = "{{ 'bytecode' ~ 'cache' ~ 'test' }}"
+    # Templates compiled by other tests would be stored as well
+    template._COMPILE_CACHE.clear()
+
+    await template.async_setup_bytecode_cache(hass)
+    assert template.Template(template_string, hass).async_render() == (
+        "bytecodecachetest"
+    )
+    await hass.async_block_till_done()
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    stored = hass_storage[template.BYTECODE_CACHE_STORAGE_KEY]["data"]
+    assert len(stored) == 1
+
+    # A new run loads the compiled template instead of compiling it
+    template._COMPILE_CACHE.pop(template_string)
+    del hass.data[template._ENVIRONMENT]
+    bytecode_hits = template.COMPILE_STATS.bytecode_hits
+    misses = template.COMPILE_STATS.misses
+
+    await template.async_setup_bytecode_cache(hass)
+    assert template.Template(template_string, hass).async_render() == (
+        "bytecodecachetest"
+    )
+    assert template.COMPILE_STATS.bytecode_hits == bytecode_hits + 1
+    assert template.COMPILE_STATS.misses == misses
+
+
+async def test_bytecode_cache_stores_templates_cached_in_memory(hass, hass_storage):
+    """Test templates served from the memory caches are stored once."""
+    before_setup = "{{ 'compiled' ~ 'before' ~ 'setup' }}"
+    other_env = "{{ 'compiled' ~ 'in' ~ 'other' ~ 'env' }}"
+    for template_string in (before_setup, other_env):
+        template._COMPILE_CACHE.pop(template_string, None)
+
+    template.Template(before_setup, hass).async_render()
+    await template.async_setup_bytecode_cache(hass)
+    template.TemplateEnvironment(None).compile(other_env)
+    misses = template.COMPILE_STATS.misses
+    assert template.Template(other_env, hass).async_render() == "compiledinotherenv"
+    assert template.COMPILE_STATS.misses == misses
+    await hass.async_block_till_done()
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    stored = hass_storage[template.BYTECODE_CACHE_STORAGE_KEY]["data"]
+
+    # A new run loads both templates instead of compiling them
+    for template_string in (before_setup, other_env):
+        template._COMPILE_CACHE.pop(template_string)
+    del hass.data[template._ENVIRONMENT]
+    hass_storage[template.BYTECODE_CACHE_STORAGE_KEY]["data"] = stored
+    misses = template.COMPILE_STATS.misses
+
+    await template.async_setup_bytecode_cache(hass)
+    template.Template(before_setup, hass).async_render()
+    template.Template(other_env, hass).async_render()
+    assert template.COMPILE_STATS.misses == misses
@@ -604,3 +604,28 @@ async def test_setup_safe_mode_if_no_frontend(
     assert hass.config.skip_pip
     assert hass.config.internal_url == "http://192.168.1.100:8123"
     assert hass.config.external_url == "https://abcdef.ui.nabu.casa"
+
+
+@patch("homeassistant.bootstrap.async_enable_logging", Mock())
+async def test_setup_imports_ahead_without_requirements(hass):
+    """Test only integrations without requirements to install are imported ahead."""
+    mock_integration(hass, MockModule(domain="plain"))
+    mock_integration(hass, MockModule(domain="with_reqs", requirements=["lib==1.0"]))
+    mock_integration(
+        hass, MockModule(domain="dep_with_reqs", dependencies=["with_reqs"])
+    )
+
+    with patch(
+        "homeassistant.bootstrap._async_import_integrations"
+    ) as mock_import, patch(
+        "homeassistant.requirements.async_process_requirements",
+        return_value=mock_coro(),
+    ):
+        await bootstrap._async_set_up_integrations(
+            hass, {"plain": {}, "with_reqs": {}, "dep_with_reqs": {}}
+        )
+
+    imported = {integration.domain for integration in mock_import.mock_calls[0][1][1]}
+    assert "plain" in imported
+    assert "with_reqs" not in imported
+    assert "dep_with_reqs" not in imported
@@ -5,9 +5,12 @@ from datetime import datetime, timedelta
 import functools
 import logging
 import os
+import sys
 from tempfile import TemporaryDirectory
 import unittest
+import uuid
 
+import attr
 import pytest
 import pytz
 import voluptuous as vol
@@ -112,6 +115,57 @@ def test_async_add_job_add_threaded_job_to_pool():
     assert len(hass.loop.run_in_executor.mock_calls) == 1
 
 
+def test_async_add_hass_job_schedule_callback():
+    """Test that we schedule callback jobs without checking the target."""
+    hass = MagicMock()
+    job = MagicMock()
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(ha.callback(job)))
+    assert len(hass.loop.call_soon.mock_calls) == 1
+    assert len(hass.loop.create_task.mock_calls) == 0
+    assert len(hass.loop.run_in_executor.mock_calls) == 0
+
+
+def test_async_add_hass_job_schedule_partial_coroutinefunction(loop):
+    """Test that we schedule partial coroutine function jobs."""
+    hass = MagicMock(loop=MagicMock(wraps=loop))
+
+    async def job():
+        pass
+
+    hassjob = ha.HassJob(functools.partial(job))
+    assert hassjob.job_type == ha.HassJobType.Coroutinefunction
+
+    ha.HomeAssistant.async_add_hass_job(hass, hassjob)
+    assert len(hass.loop.call_soon.mock_calls) == 0
+    assert len(hass.loop.create_task.mock_calls) == 1
+
+
+def test_async_add_hass_job_add_threaded_job_to_pool():
+    """Test that we run executor jobs in the pool."""
+    hass = MagicMock()
+
+    def job():
+        pass
+
+    ha.HomeAssistant.async_add_hass_job(hass, ha.HassJob(job))
+    assert len(hass.loop.call_soon.mock_calls) == 0
+    assert len(hass.loop.create_task.mock_calls) == 0
+    assert len(hass.loop.run_in_executor.mock_calls) == 1
+
+
+def test_hass_job_rejects_coroutine():
+    """Test that a coroutine object can not be a job."""
+
+    async def job():
+        pass
+
+    coro = job()
+    with pytest.raises(ValueError):
+        ha.HassJob(coro)
+    coro.close()
+
+
 def test_async_create_task_schedule_coroutine(loop):
     """Test that we schedule coroutines and add jobs to the job pool."""
     hass = MagicMock(loop=MagicMock(wraps=loop))
@@ -622,6 +676,52 @@ class TestStateMachine(unittest.TestCase):
         self.hass.block_till_done()
         assert len(events) == 1
 
+    def test_changed_since(self):
+        """Test looking up the changes since a revision."""
+        revision = self.states.revision
+        assert self.states.async_changed_since(revision) == ([], [])
+
+        self.states.set("switch.ac", "on")
+        self.states.set("light.bowl", "on")
+        assert self.states.revision == revision + 1
+        self.states.set("light.kitchen", "on")
+        assert self.states.revision == revision + 2
+
+        changed, removed = self.states.async_changed_since(revision)
+        assert [state.entity_id for state in changed] == ["switch.ac", "light.kitchen"]
+        assert removed == []
+
+        self.states.remove("switch.ac")
+        assert self.states.async_changed_since(revision) == (
+            [self.states.get("light.kitchen")],
+            ["switch.ac"],
+        )
+        assert self.states.async_changed_since(revision + 1) == (
+            [self.states.get("light.kitchen")],
+            ["switch.ac"],
+        )
+        assert self.states.async_changed_since(revision + 3) == ([], [])
+
+        self.states.set("switch.ac", "off")
+        changed, removed = self.states.async_changed_since(revision)
+        assert [state.entity_id for state in changed] == ["light.kitchen", "switch.ac"]
+        assert removed == []
+
+        assert self.states.async_changed_since(revision - 1000) is None
+        assert self.states.async_changed_since(self.states.revision + 1) is None
+
+    def test_changed_since_removed_history(self):
+        """Test changes since a revision are unknown once removals are forgotten."""
+        revision = self.states.revision
+
+        with patch("homeassistant.core.STATE_REMOVED_HISTORY", 1):
+            self.states.remove("light.bowl")
+            assert self.states.async_changed_since(revision) == ([], ["light.bowl"])
+
+            self.states.remove("switch.ac")
+            assert self.states.async_changed_since(revision) is None
+            assert self.states.async_changed_since(revision + 1) == ([], ["switch.ac"])
+
     def test_case_insensitivty(self):
         """Test insensitivty."""
         runs = []
@@ -1015,6 +1115,7 @@ async def test_bad_timezone_raises_value_error(hass):
 def test_create_timer(mock_monotonic, loop):
     """Test create timer."""
     hass = MagicMock()
+    hass.bus._listeners = {EVENT_TIME_CHANGED: [MagicMock()]}
     funcs = []
     orig_callback = ha.callback
 
@@ -1067,6 +1168,7 @@ def test_create_timer(mock_monotonic, loop):
 def test_timer_out_of_sync(mock_monotonic, loop):
     """Test create timer."""
     hass = MagicMock()
+    hass.bus._listeners = {EVENT_TIME_CHANGED: [MagicMock()]}
     funcs = []
     orig_callback = ha.callback
 
@@ -1116,6 +1218,38 @@ def test_timer_out_of_sync(mock_monotonic, loop):
     assert abs(target - 14.2) < 0.001
 
 
+@patch("homeassistant.core.monotonic")
+def test_timer_without_time_changed_listeners(mock_monotonic, loop):
+    """Test the timer does not fire time changed events nobody listens to."""
+    hass = MagicMock()
+    hass.bus._listeners = {MATCH_ALL: [MagicMock()]}
+    funcs = []
+    orig_callback = ha.callback
+
+    def mock_callback(func):
+        funcs.append(func)
+        return orig_callback(func)
+
+    mock_monotonic.side_effect = 10.2, 10.8, 11.3
+
+    with patch.object(ha, "callback", mock_callback), patch(
+        "homeassistant.core.dt_util.utcnow",
+        return_value=datetime(2018, 12, 31, 3, 4, 5, 333333),
+    ):
+        ha._async_create_timer(hass)
+
+    delay, callback, target = hass.loop.call_later.mock_calls[0][1]
+
+    with patch(
+        "homeassistant.core.dt_util.utcnow",
+        return_value=datetime(2018, 12, 31, 3, 4, 6, 100000),
+    ):
+        callback(target)
+
+    assert len(hass.bus.async_fire.mock_calls) == 0
+    assert len(hass.loop.call_later.mock_calls) == 2
+
+
 async def test_hass_start_starts_the_timer(loop):
     """Test when hass starts, it starts the timer."""
     hass = ha.HomeAssistant()
@@ -1236,6 +1370,62 @@ def test_context():
     assert c.id is not None
 
 
+def test_context_id_lazy():
+    """Test the context id is generated once when used."""
+    with patch("homeassistant.core.uuid.uuid1", wraps=uuid.uuid1) as mock_uuid:
+        context = ha.Context()
+        assert mock_uuid.call_count == 0
+        context_id = context.id
+        assert context.id == context_id
+        assert mock_uuid.call_count == 1
+
+    assert ha.Context(id=None).id is None
+    assert ha.Context(id="abc") == ha.Context(id="abc")
+    assert ha.Context(id="abc") != ha.Context(id="abc", user_id="user")
+    assert ha.Context() != ha.Context()
+    assert len({ha.Context(id="abc"), ha.Context(id="abc")}) == 1
+
+
+def test_context_immutable():
+    """Test the attributes of a context can't be changed."""
+    context = ha.Context(user_id="user")
+    context_id = context.id
+
+    for name in ("id", "user_id", "parent_id", "_id", "other"):
+        with pytest.raises(attr.exceptions.FrozenInstanceError):
+            setattr(context, name, "changed")
+        with pytest.raises(attr.exceptions.FrozenInstanceError):
+            delattr(context, name)
+
+    assert context.id == context_id
+    assert context.user_id == "user"
+
+
+def test_states_share_strings_and_attributes(hass):
+    """Test states of an entity share their strings and unchanged attributes."""
+    hass.states.async_set("light.Kitchen", "on", {"brightness": 100})
+    state = hass.states.get("light.kitchen")
+    hass.states.async_set("Light.kitchen", "off", {"brightness": 100})
+    new_state = hass.states.get("light.kitchen")
+
+    assert new_state.entity_id is state.entity_id
+    assert new_state.domain is state.domain
+    assert new_state.attributes is state.attributes
+    assert new_state.state is ha.State("light.other", "off").state
+
+    # Equal attributes of other types are not shared
+    hass.states.async_set("light.kitchen", "on", {"brightness": 100.0})
+    assert hass.states.get("light.kitchen").attributes["brightness"] == 100.0
+    assert type(hass.states.get("light.kitchen").attributes["brightness"]) is float
+    hass.states.async_set("light.kitchen", "off", {"brightness": [True]})
+    hass.states.async_set("light.kitchen", "on", {"brightness": [1]})
+    assert type(hass.states.get("light.kitchen").attributes["brightness"][0]) is int
+
+    # Other values are not interned, they would rarely be shared
+    reading = ha.State("sensor.temperature", "".join(["21.", "37"])).state
+    assert sys.intern("".join(["21.", "37"])) is not reading
+
+
 async def test_async_functions_with_callback(hass):
     """Test we deal with async functions accidentally marked as callback."""
     runs = []
@@ -1478,3 +1668,66 @@ async def test_chained_logging_misses_log_timeout(hass, caplog):
     await hass.async_block_till_done()
 
     assert "_task_chain_" not in caplog.text
+
+
+async def test_bus_dispatch_follows_listeners(hass):
+    """Test the cached listeners of an event type are updated."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        calls.append(("listener", event.event_type))
+
+    @ha.callback
+    def match_all_listener(event):
+        calls.append(("match_all", event.event_type))
+
+    unsub = hass.bus.async_listen("test_event", listener)
+    hass.bus.async_fire("test_event")
+    hass.bus.async_fire("other_event")
+    await hass.async_block_till_done()
+    assert calls == [("listener", "test_event")]
+
+    calls.clear()
+    unsub_match_all = hass.bus.async_listen(MATCH_ALL, match_all_listener)
+    hass.bus.async_fire("test_event")
+    hass.bus.async_fire("other_event")
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+    assert calls == [
+        ("match_all", "test_event"),
+        ("listener", "test_event"),
+        ("match_all", "other_event"),
+    ]
+
+    calls.clear()
+    unsub()
+    hass.bus.async_fire("test_event")
+    await hass.async_block_till_done()
+    assert calls == [("match_all", "test_event")]
+
+    calls.clear()
+    unsub_match_all()
+    hass.bus.async_fire("test_event")
+    hass.bus.async_fire("other_event")
+    await hass.async_block_till_done()
+    assert calls == []
+
+
+async def test_bus_match_all_not_sent_close_from_cache(hass):
+    """Test close does not reach MATCH_ALL through the cached jobs."""
+    calls = []
+
+    @ha.callback
+    def match_all_listener(event):
+        calls.append(event.event_type)
+
+    # A bus without close listeners of its own
+    bus = ha.EventBus(hass)
+    bus.async_listen(MATCH_ALL, match_all_listener)
+    # Caches the jobs of event types without listeners of their own
+    bus.async_fire("foo")
+    bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+    assert calls == ["foo"]
@@ -157,6 +157,61 @@ async def test_get_integration_custom_component(hass):
     assert integration.name == "Test Package"
 
 
+async def test_async_get_component_and_platform(hass):
+    """Test importing an integration and platform in the executor."""
+    integration = await loader.async_get_integration(hass, "hue")
+    assert await integration.async_get_component() is hue
+    assert await integration.async_get_platform("light") is hue_light
+
+    import_times = hass.data[loader.DATA_IMPORT_TIMES]
+    assert import_times["hue"] >= 0
+    assert import_times["hue.light"] >= 0
+    assert hass.data[loader.DATA_IMPORTS_IN_PROGRESS] == {}
+
+
+async def test_async_get_component_imports_once(hass):
+    """Test concurrent imports of the same module share one executor job."""
+    integration = await loader.async_get_integration(hass, "test_package")
+
+    with patch.object(
+        integration, "get_component", wraps=integration.get_component
+    ) as mock_get_component:
+        comp_1 = hass.async_create_task(integration.async_get_component())
+        comp_2 = hass.async_create_task(integration.async_get_component())
+
+        assert await comp_1 is await comp_2
+
+    assert len(mock_get_component.mock_calls) == 1
+    assert (await integration.async_get_component()).DOMAIN == "test_package"
+
+
+async def test_async_get_component_import_error(hass):
+    """Test a failed import is not cached."""
+    integration = await loader.async_get_integration(hass, "test_package")
+
+    with patch.object(
+        integration, "get_component", side_effect=ImportError
+    ), pytest.raises(ImportError):
+        await integration.async_get_component()
+
+    assert "test_package" not in hass.data[loader.DATA_IMPORTS_IN_PROGRESS]
+    assert (await integration.async_get_component()).DOMAIN == "test_package"
+
+
+async def test_async_get_component_falls_back_to_event_loop(hass):
+    """Test modules that can only be imported in the event loop thread."""
+    integration = await loader.async_get_integration(hass, "test_package")
+    module = integration.get_component()
+    hass.data[loader.DATA_COMPONENTS].pop("test_package")
+
+    with patch.object(
+        integration,
+        "get_component",
+        side_effect=[RuntimeError("There is no current event loop"), module],
+    ):
+        assert await integration.async_get_component() is module
+
+
 def test_integration_properties(hass):
     """Test integration properties."""
     integration = loader.Integration(
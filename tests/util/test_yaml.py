@@ -461,3 +461,39 @@ def test_duplicate_key(caplog):
     with patch_yaml_files(files):
         load_yaml_config_file(YAML_CONFIG_FILE)
     assert "contains duplicate key" in caplog.text
+
+
+def test_load_yaml_cache(tmp_path):
+    """Test files are only parsed again when they changed."""
+    fname = str(tmp_path / "automations.yaml")
+    with open(fname, "w") as fdesc:
+        fdesc.write("automation:\n  - alias: Test\n")
+
+    first = yaml_loader.load_yaml(fname)
+    assert first["automation"].__config_file__ == fname
+    assert first["automation"].__line__ == 1
+
+    first["automation"].append("changed")
+    with patch.object(
+        yaml_loader, "LOADER", side_effect=AssertionError("Parsed again")
+    ):
+        second = yaml_loader.load_yaml(fname)
+    assert second == {"automation": [{"alias": "Test"}]}
+    assert second["automation"].__config_file__ == fname
+    assert second["automation"].__line__ == 1
+
+    with open(fname, "w") as fdesc:
+        fdesc.write("automation:\n  - alias: Changed\n")
+    assert yaml_loader.load_yaml(fname) == {"automation": [{"alias": "Changed"}]}
+
+
+def test_load_yaml_cache_env_var(tmp_path):
+    """Test files that depend on the environment are not cached."""
+    fname = str(tmp_path / "env.yaml")
+    with open(fname, "w") as fdesc:
+        fdesc.write("password: !env_var PASSWORD\n")
+
+    with patch.dict(os.environ, {"PASSWORD": "secret"}):
+        assert yaml_loader.load_yaml(fname) == {"password": "secret"}
+    with patch.dict(os.environ, {"PASSWORD": "changed"}):
+        assert yaml_loader.load_yaml(fname) == {"password": "changed"}